@@ -5,16 +5,20 @@ Dashboard API - 대시보드용 통합 엔드포인트
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta, timezone
-from sqlalchemy import func
+from datetime import datetime, timezone
+from sqlalchemy.orm import defer
 
-from models import db, Incident, StreamSession
+from config import Config
+from models import Incident, StreamSession
+from utils.counters import incident_stats, incident_summary
+from utils.cache import cached_response
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
 
 @dashboard_bp.route("/stats", methods=["GET"])
 # @jwt_required()
+@cached_response
 def get_dashboard_stats():
     """
     대시보드 통계 조회
@@ -30,29 +34,13 @@ def get_dashboard_stats():
     try:
         # current_user_id = get_jwt_identity()
         current_user_id = "1"
-        today_start = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-
-        # 통계 집계
-        stats_query = (
-            db.session.query(
-                func.count(Incident.id).label("total"),
-                func.sum(db.case((Incident.is_checked == True, 1), else_=0)).label(
-                    "checked"
-                ),
-                func.sum(
-                    db.case((Incident.detected_at >= today_start, 1), else_=0)
-                ).label("today"),
-            )
-            .filter(Incident.user_id == current_user_id)
-            .first()
-        )
 
-        total = stats_query.total or 0
-        checked = stats_query.checked or 0
-        today = stats_query.today or 0
-        unchecked = total - checked
+        # 통계 집계 (incident_counters, 사고 수와 무관하게 일정한 비용)
+        stats = incident_stats(current_user_id)
+        total = stats["total"]
+        checked = stats["checked"]
+        today = stats["today"]
+        unchecked = stats["unchecked"]
         check_rate = (checked / total * 100) if total > 0 else 0
 
         # 시스템 상태 확인
@@ -95,6 +83,7 @@ def get_dashboard_stats():
 
 @dashboard_bp.route("/recent-videos", methods=["GET"])
 # @jwt_required()
+@cached_response
 def get_recent_videos():
     """
     최근 영상 목록 조회
@@ -144,45 +133,46 @@ def get_incidents_summary():
     """
     사고 요약 정보
 
+    유형/날짜별 집계는 utils.counters.incident_summary가 SQL(또는 일별 롤업)로 계산하고,
+    최근 10개는 별도 LIMIT 쿼리로 조회한다.
+
     Query Parameters:
-        - days: 조회 기간 (일 단위, 기본: 7)
+        - days: 조회 기간 (오늘 포함 달력 일수, 기본: 7)
+        - tz: 날짜 버킷 시간대 (IANA 이름, 기본: STATS_TIMEZONE)
     """
     try:
         # current_user_id = get_jwt_identity()
         current_user_id = "1"
         days = request.args.get("days", 7, type=int)
+        tz = request.args.get("tz") or None
 
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
+        if days is None or not 1 <= days <= Config.SUMMARY_MAX_DAYS:
+            return jsonify({"success": False, "error": f"days must be 1..{Config.SUMMARY_MAX_DAYS}"}), 400
 
-        # 기간별 사고 통계
-        incidents = Incident.query.filter(
-            Incident.user_id == current_user_id, Incident.detected_at >= start_date
-        ).all()
+        try:
+            summary = incident_summary(current_user_id, days, tz)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
 
-        # 타입별 집계
-        by_type = {}
-        by_date = {}
-
-        for incident in incidents:
-            # 타입별
-            incident_type = incident.incident_type
-            by_type[incident_type] = by_type.get(incident_type, 0) + 1
-
-            # 날짜별
-            date_key = incident.detected_at.strftime("%Y-%m-%d")
-            by_date[date_key] = by_date.get(date_key, 0) + 1
+        # 최근 10개 (BLOB 컬럼 제외)
+        latest = (
+            Incident.query.options(defer(Incident.video_blob), defer(Incident.thumbnail_blob))
+            .filter(Incident.user_id == current_user_id, Incident.detected_at >= summary["since"])
+            .order_by(Incident.detected_at.desc())
+            .limit(10)
+            .all()
+        )
 
         return (
             jsonify(
                 {
                     "success": True,
                     "period_days": days,
-                    "total_incidents": len(incidents),
-                    "by_type": by_type,
-                    "by_date": by_date,
-                    "incidents": [
-                        incident.to_dict() for incident in incidents[:10]
-                    ],  # 최근 10개
+                    "timezone": summary["timezone"],
+                    "total_incidents": summary["total"],
+                    "by_type": summary["by_type"],
+                    "by_date": summary["by_date"],
+                    "incidents": [incident.to_dict() for incident in latest],  # 최근 10개
                 }
             ),
             200,
@@ -0,0 +1,203 @@
+"""
+Debug API - 운영 중 프로파일링 / 메모리 추적
+PROFILING_ENABLED=True일 때만 사용 가능하며, PROFILING_TOKEN이 설정되어 있으면
+모든 요청에 X-Debug-Token 헤더가 필요하다.
+"""
+
+import linecache
+import tracemalloc
+
+from flask import Blueprint, current_app, jsonify, request, send_file
+
+debug_bp = Blueprint("debug", __name__)
+
+# tracemalloc 기준 스냅샷 (diff 비교용)
+memory_baseline = None
+
+
+def _snapshot_stats(stats, limit):
+    """tracemalloc 통계를 JSON 직렬화 가능한 형태로 변환"""
+    result = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        entry = {
+            "file": frame.filename,
+            "line": frame.lineno,
+            "code": linecache.getline(frame.filename, frame.lineno).strip(),
+            "size": stat.size,
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            entry["size_diff"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        result.append(entry)
+    return result
+
+
+def _filtered_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        )
+    )
+
+
+@debug_bp.before_request
+def require_profiling():
+    """프로파일링 비활성화 시 404, 토큰 불일치 시 401"""
+    profiler = current_app.extensions.get("profiler")
+    if profiler is None:
+        return jsonify({"error": "Not Found", "message": "Profiling is disabled"}), 404
+    if not profiler.is_authorized():
+        return jsonify({"error": "Unauthorized", "message": "Invalid X-Debug-Token"}), 401
+    return None
+
+
+@debug_bp.route("/profile", methods=["GET"])
+def profile_status():
+    """현재 프로파일 대기 중인 라우트"""
+    return jsonify({"armed": current_app.extensions["profiler"].status()}), 200
+
+
+@debug_bp.route("/profile", methods=["POST"])
+def arm_profile():
+    """
+    라우트 프로파일 예약
+
+    Request Body:
+        {
+            "route": "/api/stream/upload",   # URL 규칙 (예: /api/incidents/<int:incident_id>)
+            "count": 20,                      # 프로파일할 요청 수 (기본 10)
+            "format": "speedscope"            # speedscope / pstats
+        }
+    """
+    data = request.get_json(silent=True) or {}
+    route = data.get("route")
+    if not route:
+        return jsonify({"error": "route is required"}), 400
+
+    rules = {rule.rule for rule in current_app.url_map.iter_rules()}
+    if route not in rules:
+        return jsonify({"error": "Unknown route", "route": route}), 404
+
+    try:
+        count = int(data.get("count", 10))
+        if not 1 <= count <= 1000:
+            raise ValueError("count must be between 1 and 1000")
+        current_app.extensions["profiler"].arm(route, count, data.get("format"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"status": "armed", "route": route, "count": count}), 200
+
+
+@debug_bp.route("/profile", methods=["DELETE"])
+def disarm_profile():
+    """라우트 프로파일 예약 취소 (?route=...)"""
+    route = request.args.get("route", "")
+    if not current_app.extensions["profiler"].disarm(route):
+        return jsonify({"error": "Route is not armed", "route": route}), 404
+    return jsonify({"status": "disarmed", "route": route}), 200
+
+
+@debug_bp.route("/profiles", methods=["GET"])
+def list_profiles():
+    """저장된 프로파일 목록 (최신순)"""
+    profiles = current_app.extensions["profiler"].store.list()
+    return jsonify({"profiles": profiles, "count": len(profiles)}), 200
+
+
+@debug_bp.route("/profiles/<name>", methods=["GET"])
+def download_profile(name):
+    """프로파일 파일 다운로드"""
+    path = current_app.extensions["profiler"].store.path(name)
+    if path is None:
+        return jsonify({"error": "Profile not found", "name": name}), 404
+
+    mimetype = "application/json" if name.endswith(".json") else "application/octet-stream"
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=name)
+
+
+@debug_bp.route("/memory", methods=["GET"])
+def memory_status():
+    """tracemalloc 상태"""
+    if not tracemalloc.is_tracing():
+        return jsonify({"tracing": False}), 200
+
+    current, peak = tracemalloc.get_traced_memory()
+    return jsonify(
+        {
+            "tracing": True,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "has_baseline": memory_baseline is not None,
+        }
+    ), 200
+
+
+@debug_bp.route("/memory/start", methods=["POST"])
+def memory_start():
+    """tracemalloc 시작 (?frames=스택 깊이, 기본 1)"""
+    frames = request.args.get("frames", 1, type=int)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, min(frames, 25)))
+    return jsonify({"tracing": True}), 200
+
+
+@debug_bp.route("/memory/stop", methods=["POST"])
+def memory_stop():
+    """tracemalloc 중지 및 기준 스냅샷 삭제"""
+    global memory_baseline
+    memory_baseline = None
+    tracemalloc.stop()
+    return jsonify({"tracing": False}), 200
+
+
+@debug_bp.route("/memory/snapshot", methods=["POST"])
+def memory_snapshot():
+    """
+    현재 스냅샷을 기준으로 저장하고 상위 할당 위치 반환
+
+    Query Parameters:
+        - limit: 반환할 항목 수 (기본 20)
+    """
+    global memory_baseline
+
+    if not tracemalloc.is_tracing():
+        return jsonify({"error": "tracemalloc is not running"}), 409
+
+    limit = request.args.get("limit", 20, type=int)
+    memory_baseline = _filtered_snapshot()
+    stats = memory_baseline.statistics("lineno")
+
+    return jsonify(
+        {
+            "total_bytes": sum(stat.size for stat in stats),
+            "top": _snapshot_stats(stats, limit),
+        }
+    ), 200
+
+
+@debug_bp.route("/memory/diff", methods=["GET"])
+def memory_diff():
+    """
+    기준 스냅샷 대비 증가한 할당 위치 (버퍼 메모리 증가 추적용)
+
+    Query Parameters:
+        - limit: 반환할 항목 수 (기본 20)
+    """
+    if not tracemalloc.is_tracing():
+        return jsonify({"error": "tracemalloc is not running"}), 409
+    if memory_baseline is None:
+        return jsonify({"error": "No baseline snapshot; POST /api/debug/memory/snapshot first"}), 409
+
+    limit = request.args.get("limit", 20, type=int)
+    stats = _filtered_snapshot().compare_to(memory_baseline, "lineno")
+
+    return jsonify(
+        {
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": _snapshot_stats(stats, limit),
+        }
+    ), 200
@@ -1,15 +1,30 @@
 from flask import Blueprint, request, jsonify, send_file, Response, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta, timezone
+import logging
 import os
 import threading
 import time
 
+from sqlalchemy.orm import defer
+
 from models import db, Incident, User
 from utils.video import frames_to_video, create_thumbnail, get_video_info
+from utils.log import get_logger
+from utils.tracing import PipelineTrace
+from utils.media import record_media
+from utils.counters import incident_stats
+from utils.sync import changes_since, current_version
+from utils.cache import cached_response
+from utils.serialize import parse_fields, parse_aliases, incident_array, json_response
+from utils.events import publish_incident_created, publish_incident_checked, publish_incident_deleted
+from utils.bulk import build_criteria, set_checked, delete_incidents
+from utils.filters import FILTER_KEYS, incident_criteria
+from utils.archive import parse_archived, incident_model
 from config import Config
 
 incidents_bp = Blueprint("incidents", __name__)
+log = get_logger("api.incidents")
 
 # 사고 처리 락
 incident_lock = threading.Lock()
@@ -182,45 +197,62 @@ def report_incident():
         else:
             detected_at = datetime.now(timezone.utc)
 
-        print(f"🚨 사고 신호 수신: {incident_type} at {detected_at}")
+        log.info(
+            "incident reported",
+            extra={"incident_type": incident_type, "detected_at": detected_at.isoformat()},
+        )
 
         # PERFORMANCE & SECURITY: Use try-except-finally to ensure proper cleanup
         with incident_lock:
             video_path = None
             thumbnail_path = None
+            committed = False
+            trace = PipelineTrace(
+                f"{incident_type}@{detected_at.isoformat()}",
+                slow_stage_ms=Config.TRACE_SLOW_STAGE_MS,
+            )
 
             try:
                 # 버퍼에서 영상 추출
-                from api.streaming import get_video_buffer
+                from api.streaming import get_video_buffer, to_server_time
 
                 video_buffer = get_video_buffer()
 
+                # detected_at은 디바이스 시계 기준 → 버퍼(서버 시계) 기준으로 보정
+                buffer_time = to_server_time(data.get("device_id", "unknown"), detected_at)
+
                 # 사고 전후 15초씩 추출
-                before_time = detected_at - timedelta(seconds=15)
-                after_time = detected_at + timedelta(seconds=15)
+                before_time = buffer_time - timedelta(seconds=15)
+                after_time = buffer_time + timedelta(seconds=15)
 
-                all_frames = video_buffer.get_all_frames()
+                with trace.span("buffer_snapshot") as span:
+                    all_frames = video_buffer.get_all_frames()
+                    span["frames"] = len(all_frames)
 
                 # 사고 전후 30초 구간의 프레임만 필터링
-                incident_frames = [
-                    frame
-                    for frame in all_frames
-                    if before_time <= frame["timestamp"] <= after_time
-                ]
+                with trace.span("filter") as span:
+                    incident_frames = [
+                        frame
+                        for frame in all_frames
+                        if before_time <= frame["timestamp"] <= after_time
+                    ]
+                    span["frames"] = len(incident_frames)
 
                 # 프레임이 부족한 경우 가능한 만큼 사용
                 if len(incident_frames) == 0:
-                    print("⚠️ 사고 시점 프레임 없음, 최신 프레임 사용")
+                    log.warning("no frames at incident time, using whole buffer")
                     # 버퍼의 모든 프레임 사용
                     incident_frames = all_frames
 
-                print(f"📦 버퍼에서 {len(incident_frames)} 프레임 추출")
                 if incident_frames:
                     time_span = (
                         incident_frames[-1]["timestamp"]
                         - incident_frames[0]["timestamp"]
                     ).total_seconds()
-                    print(f"   시간 범위: {time_span:.2f}초")
+                    log.debug(
+                        "incident frames extracted",
+                        extra={"frames": len(incident_frames), "span_seconds": round(time_span, 2)},
+                    )
 
                 # 영상 파일 저장
                 timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
@@ -228,7 +260,9 @@ def report_incident():
                 video_path = os.path.join(Config.VIDEOS_DIR, filename)
 
                 # 프레임을 비디오로 변환 (FPS 자동 계산)
-                success = frames_to_video(incident_frames, video_path, fps=None)
+                success = frames_to_video(
+                    incident_frames, video_path, fps=None, trace=trace
+                )
 
                 if not success:
                     return jsonify({"error": "Failed to save video"}), 500
@@ -242,16 +276,16 @@ def report_incident():
 
                 # 썸네일 생성 (중간 프레임 사용)
                 thumbnail_success = create_thumbnail(
-                    video_path, thumbnail_path, time_offset=0
+                    video_path, thumbnail_path, time_offset=0, trace=trace
                 )
 
                 if not thumbnail_success:
-                    print("⚠️ 썸네일 생성 실패, None으로 저장")
+                    log.warning("thumbnail creation failed", extra={"video": filename})
                     thumbnail_filename = None
                     thumbnail_path = None  # Reset path if creation failed
 
                 # 비디오 정보
-                video_info = get_video_info(video_path)
+                video_info = get_video_info(video_path, trace=trace)
 
                 # CRITICAL: Verify user exists before creating incident
                 from models import User
@@ -267,6 +301,7 @@ def report_incident():
                 incident = Incident(
                     user_id=user_id,
                     incident_type=incident_type,
+                    device_id=data.get("device_id", "unknown"),
                     detected_at=detected_at,
                     video_path=filename,
                     thumbnail_path=thumbnail_filename,
@@ -279,12 +314,36 @@ def report_incident():
                     },
                 )
 
-                db.session.add(incident)
-                db.session.commit()
+                # 파일 크기/해시 기록 (목록 API가 파일시스템을 조회하지 않도록)
+                with trace.span("media_fingerprint") as span:
+                    record_media(incident, video_path)
+                    span["bytes"] = incident.video_size
+
+                # 트레이스는 INSERT에 포함해 한 번만 커밋 (저장본에는 db_commit 단계가 없고,
+                # db_commit 소요 시간은 단계 히스토그램/느린 단계 경고와 아래 로그에 남음)
+                incident.extra_data = {**incident.extra_data, "trace": trace.to_dict()}
+                with trace.span("db_commit"):
+                    db.session.add(incident)
+                    db.session.commit()
+                committed = True
+
+                summary = trace.to_dict()
+                log.info(
+                    "incident pipeline traced",
+                    extra={
+                        "incident_id": incident.id,
+                        "total_ms": summary["total_ms"],
+                        "slowest_stage": summary["slowest_stage"],
+                    },
+                )
 
-                print(f"✅ 사고 영상 저장 완료: {filename}")
-                if thumbnail_filename:
-                    print(f"✅ 썸네일 저장 완료: {thumbnail_filename}")
+                # 구독자(SSE/롱폴링)에게 알림 - 커밋 이후에만 발행
+                publish_incident_created(incident)
+
+                log.info(
+                    "incident saved",
+                    extra={"incident_id": incident.id, "video": filename, "thumbnail": thumbnail_filename},
+                )
 
                 return (
                     jsonify(
@@ -298,75 +357,150 @@ def report_incident():
                 )
 
             except Exception as e:
+                log.warning(
+                    "incident pipeline failed", extra={"trace": trace.to_dict()}
+                )
+
+                # 커밋 이후 실패(알림 발행 등)면 사고 행이 파일을 가리키므로 지우지 않음
+                if committed:
+                    raise e
+
                 # SECURITY: Clean up created files before rollback to prevent orphaned files
                 if video_path and os.path.exists(video_path):
                     try:
                         os.remove(video_path)
-                        print(f"🗑️ Cleaned up video file: {video_path}")
                     except Exception as cleanup_error:
-                        print(f"⚠️ Failed to cleanup video file: {cleanup_error}")
+                        log.warning(
+                            "failed to clean up video file",
+                            extra={"path": video_path, "error": str(cleanup_error)},
+                        )
 
                 if thumbnail_path and os.path.exists(thumbnail_path):
                     try:
                         os.remove(thumbnail_path)
-                        print(f"🗑️ Cleaned up thumbnail file: {thumbnail_path}")
                     except Exception as cleanup_error:
-                        print(f"⚠️ Failed to cleanup thumbnail file: {cleanup_error}")
+                        log.warning(
+                            "failed to clean up thumbnail file",
+                            extra={"path": thumbnail_path, "error": str(cleanup_error)},
+                        )
 
                 # SECURITY: Rollback database transaction on failure
                 db.session.rollback()
                 raise e
 
     except Exception as e:
-        print(f"❌ 사고 처리 실패: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception("incident report failed")
         return jsonify({"error": str(e)}), 500
 
 
 @incidents_bp.route("/list", methods=["GET"])
 # @jwt_required()
 def list_incidents():
-    """사고 목록 조회"""
+    """
+    사고 목록 조회
+
+    Query Parameters:
+        - page, per_page: 페이지네이션
+        - type, is_checked: 필터
+        - device_id: 장치 ID (쉼표로 여러 개)
+        - from, to: 감지 시각 범위 (ISO 8601, to는 미포함)
+        - min_confidence, max_confidence: 신뢰도 범위 (0~1)
+        - fields: 포함할 필드 (쉼표 구분, 기본 전체) 예: fields=id,video_path,detected_at,is_checked
+        - aliases: 1이면 프론트엔드 호환 별칭 필드(filename, createdAt, isChecked, processed, type)와
+          "videos" 키를 함께 반환 (이전 응답 형식)
+        - archived: 1이면 보관된 사고(incidents_archive) 조회 (기본은 최근 사고만)
+
+    응답의 version은 목록 조회 전에 읽은 델타 동기화 순번이므로 /changes의 since로 그대로 쓸 수 있다.
+    """
     # current_user_id = get_jwt_identity()
     current_user_id = "1"
 
     # 쿼리 파라미터
+    archived = parse_archived(request.args.get("archived"))
+    model = incident_model(archived)
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
-    incident_type = request.args.get("type")
-    is_checked = request.args.get("is_checked")
-
-    # 쿼리 빌드
-    query = Incident.query.filter_by(user_id=current_user_id)
+    aliases = parse_aliases(request.args.get("aliases"))
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        criteria = incident_criteria({key: request.args.get(key) for key in FILTER_KEYS}, model=model)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if incident_type:
-        query = query.filter_by(incident_type=incident_type)
+    # 목록보다 먼저 읽어야 조회 도중 바뀐 행이 다음 /changes에서 빠지지 않음
+    version = current_version()
 
-    if is_checked is not None:
-        is_checked_bool = is_checked.lower() == "true"
-        query = query.filter_by(is_checked=is_checked_bool)
+    # 쿼리 빌드 (목록에 BLOB 컬럼은 필요 없음)
+    query = model.query.options(
+        defer(model.video_blob), defer(model.thumbnail_blob)
+    ).filter(model.user_id == current_user_id, *criteria)
 
     # 최신순 정렬
-    query = query.order_by(Incident.detected_at.desc())
+    query = query.order_by(model.detected_at.desc())
 
     # 페이지네이션
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    return (
-        jsonify(
-            {
-                "success": True,
-                "videos": [incident.to_dict() for incident in pagination.items],
-                "incidents": [incident.to_dict() for incident in pagination.items],
-                "count": pagination.total,
-                "total": pagination.total,
-                "page": page,
-                "per_page": per_page,
-                "pages": pagination.pages,
-            }
-        ),
+    # 행마다 한 번만 직렬화 (캐시된 JSON 조각 재사용)
+    incidents = incident_array(pagination.items, fields, aliases)
+    payload = {"success": True, "incidents": incidents, "archived": archived, "version": version}
+    if aliases:
+        payload["videos"] = incidents
+    payload.update(
+        {
+            "count": pagination.total,
+            "total": pagination.total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pagination.pages,
+        }
+    )
+    return json_response(payload, 200)
+
+
+@incidents_bp.route("/changes", methods=["GET"])
+# @jwt_required()
+def list_incident_changes():
+    """
+    델타 동기화: since 이후 추가/수정/삭제된 사고
+
+    Query Parameters:
+        - since: 마지막으로 받은 version (기본 0 = 전체 동기화)
+        - limit: 최대 변경 수 (기본 500, 최대 SYNC_PAGE_MAX)
+        - fields, aliases: /list와 동일
+
+    Returns:
+        - version: 다음 요청의 since
+        - has_more: true면 바로 이어서 다시 요청
+        - reset: true면 캐시를 비우고 since=0부터 다시 동기화
+        - upserted: 추가/수정된 사고
+        - deleted: 삭제된 사고 id
+    """
+    # current_user_id = get_jwt_identity()
+    current_user_id = "1"
+
+    since = request.args.get("since", 0, type=int)
+    limit = request.args.get("limit", 500, type=int)
+    if since is None or since < 0 or not 1 <= limit <= Config.SYNC_PAGE_MAX:
+        return jsonify({"error": f"since must be >= 0 and limit 1..{Config.SYNC_PAGE_MAX}"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    changes = changes_since(current_user_id, since, limit)
+
+    return json_response(
+        {
+            "success": True,
+            "version": changes["version"],
+            "has_more": changes["has_more"],
+            "reset": changes["reset"],
+            "upserted": incident_array(
+                changes["upserted"], fields, parse_aliases(request.args.get("aliases"))
+            ),
+            "deleted": changes["deleted"],
+        },
         200,
     )
 
@@ -374,11 +508,12 @@ def list_incidents():
 @incidents_bp.route("/<int:incident_id>", methods=["GET"])
 # @jwt_required()
 def get_incident(incident_id):
-    """사고 상세 조회"""
+    """사고 상세 조회 (archived=1이면 보관된 사고)"""
     #current_user_id = get_jwt_identity()
     current_user_id = "1"
 
-    incident = Incident.query.filter_by(id=incident_id, user_id=current_user_id).first()
+    model = incident_model(parse_archived(request.args.get("archived")))
+    incident = model.query.filter_by(id=incident_id, user_id=current_user_id).first()
 
     if not incident:
         return jsonify({"error": "Incident not found"}), 404
@@ -386,61 +521,89 @@ def get_incident(incident_id):
     return jsonify(incident.to_dict()), 200
 
 
+@incidents_bp.route("/<int:incident_id>/trace", methods=["GET"])
+def get_incident_trace(incident_id):
+    """
+    사고 영상 파이프라인 트레이스 (디버그용)
+
+    단계별(buffer_snapshot, filter, decode, video_writer, ffmpeg, thumbnail,
+    probe, media_fingerprint) 시작 오프셋, 소요 시간, 프레임 수/바이트
+    (트레이스는 사고 INSERT와 함께 저장되므로 db_commit 단계는 메트릭/로그에만 있음)
+    """
+    incident = Incident.query.filter_by(id=incident_id).first()
+
+    if not incident:
+        return jsonify({"error": "Incident not found"}), 404
+
+    trace = (incident.extra_data or {}).get("trace")
+    if trace is None:
+        return (
+            jsonify({"error": "No trace recorded for this incident", "incident_id": incident_id}),
+            404,
+        )
+
+    return jsonify({"incident_id": incident_id, "trace": trace}), 200
+
+
 @incidents_bp.route("/<int:incident_id>/video", methods=["GET"])
 def get_video(incident_id):
     """
     사고 영상 스트리밍 - 단순화된 Range 요청 지원
 
     JWT 인증 제거하여 HTML video 태그에서 직접 사용 가능
+    archived=1이면 보관된 사고의 영상
+    요청 상세 로그는 DEBUG 레벨 (LOG_DEBUG_LOGGERS=api.incidents)
     """
     try:
-        print(f"\n{'='*80}")
-        print(f"🎬 [VIDEO REQUEST] Incident ID: {incident_id}")
-        print(f"   Method: {request.method}")
-        print(f"   URL: {request.url}")
-        print(f"   Remote Addr: {request.remote_addr}")
-
-        # 헤더 출력
-        print(f"📋 [VIDEO REQUEST] Headers:")
-        for key, value in request.headers:
-            print(f"   {key}: {value}")
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug(
+                "video request",
+                extra={
+                    "route": request.path,
+                    "incident_id": incident_id,
+                    "remote_addr": request.remote_addr,
+                    "headers": {
+                        key: value
+                        for key, value in request.headers
+                        if key not in ("Authorization", "Cookie")
+                    },
+                },
+            )
 
         # 사고 조회
-        incident = Incident.query.filter_by(id=incident_id).first()
+        model = incident_model(parse_archived(request.args.get("archived")))
+        incident = model.query.filter_by(id=incident_id).first()
 
         if not incident:
-            print(f"❌ [VIDEO REQUEST] Incident {incident_id} not found in database")
+            log.info("video request: incident not found", extra={"incident_id": incident_id})
             return (
                 jsonify({"error": "Incident not found", "incident_id": incident_id}),
                 404,
             )
 
-        print(f"✅ [VIDEO REQUEST] Found incident:")
-        print(f"   video_path (DB): {incident.video_path}")
-        print(f"   user_id: {incident.user_id}")
-        print(f"   detected_at: {incident.detected_at}")
-
-        # 경로 정보 출력
-        print(f"📁 [VIDEO REQUEST] Path info:")
-        print(f"   Config.VIDEOS_DIR: {Config.VIDEOS_DIR}")
-
         # 파일 경로 검증
         try:
             video_path = safe_path_join(Config.VIDEOS_DIR, incident.video_path)
-            print(f"   Full path: {video_path}")
         except ValueError as e:
-            print(f"❌ [VIDEO REQUEST] Invalid path: {e}")
+            log.warning(
+                "video request: invalid path",
+                extra={"incident_id": incident_id, "error": str(e)},
+            )
             return jsonify({"error": "Invalid file path", "message": str(e)}), 400
 
         # 파일 존재 확인
         if not os.path.exists(video_path):
-            print(f"❌ [VIDEO REQUEST] File not found!")
-            print(f"   Expected path: {video_path}")
-            print(f"   Directory exists: {os.path.exists(Config.VIDEOS_DIR)}")
-            if os.path.exists(Config.VIDEOS_DIR):
-                print(f"   Files in directory:")
-                for f in os.listdir(Config.VIDEOS_DIR):
-                    print(f"     - {f}")
+            log.warning(
+                "video request: file not found",
+                extra={"incident_id": incident_id, "path": video_path},
+            )
+            if debug and os.path.exists(Config.VIDEOS_DIR):
+                # 디렉토리 목록은 DEBUG에서만 (파일 수에 비례하는 비용)
+                log.debug(
+                    "videos directory listing",
+                    extra={"files": sorted(os.listdir(Config.VIDEOS_DIR))},
+                )
             return (
                 jsonify(
                     {
@@ -452,18 +615,13 @@ def get_video(incident_id):
                 404,
             )
 
-        # 파일 정보 출력
         file_size = os.path.getsize(video_path)
-        print(f"✅ [VIDEO REQUEST] File found!")
-        print(f"   Size: {file_size:,} bytes ({file_size / 1024 / 1024:.2f} MB)")
 
         # Range 헤더 확인
         range_header = request.headers.get("Range")
-        print(f"📊 [VIDEO REQUEST] Range header: {range_header}")
 
         # Range 요청이 없으면 전체 파일 전송
         if not range_header:
-            print(f"✅ [VIDEO REQUEST] Sending full file (no Range header)")
             try:
                 response = send_file(
                     video_path, mimetype="video/mp4", as_attachment=False
@@ -473,17 +631,13 @@ def get_video(incident_id):
                 response.headers["Content-Length"] = str(file_size)
                 response.headers["Cache-Control"] = "no-cache"
 
-                print(f"✅ [VIDEO REQUEST] Full file response prepared")
-                print(f"   Content-Type: {response.headers.get('Content-Type')}")
-                print(f"   Content-Length: {response.headers.get('Content-Length')}")
-                print(f"   Accept-Ranges: {response.headers.get('Accept-Ranges')}")
-                print(f"{'='*80}\n")
+                log.debug(
+                    "video full response",
+                    extra={"route": request.path, "incident_id": incident_id, "bytes": file_size},
+                )
                 return response
             except Exception as e:
-                print(f"❌ [VIDEO REQUEST] send_file error: {e}")
-                import traceback
-
-                traceback.print_exc()
+                log.exception("video send_file error", extra={"incident_id": incident_id})
                 return jsonify({"error": f"Failed to send file: {str(e)}"}), 500
 
         # Range 요청 파싱
@@ -497,8 +651,9 @@ def get_video(incident_id):
 
             # 범위 검증
             if byte_start < 0 or byte_end >= file_size or byte_start > byte_end:
-                print(
-                    f"❌ [VIDEO REQUEST] Invalid range: {byte_start}-{byte_end} (file size: {file_size})"
+                log.info(
+                    "video request: range not satisfiable",
+                    extra={"incident_id": incident_id, "range": range_header, "file_size": file_size},
                 )
                 return Response(
                     "Requested Range Not Satisfiable",
@@ -506,14 +661,14 @@ def get_video(incident_id):
                     headers={"Content-Range": f"bytes */{file_size}"},
                 )
 
-            print(f"✅ [VIDEO REQUEST] Valid range: {byte_start}-{byte_end}")
-
         except (ValueError, IndexError) as e:
-            print(f"⚠️ [VIDEO REQUEST] Invalid Range format: {range_header}, error: {e}")
+            log.info(
+                "video request: invalid range format, sending full file",
+                extra={"incident_id": incident_id, "range": range_header, "error": str(e)},
+            )
             # Range 형식이 잘못되면 전체 파일 전송
             response = send_file(video_path, mimetype="video/mp4", as_attachment=False)
             response.headers["Accept-Ranges"] = "bytes"
-            print(f"{'='*80}\n")
             return response
 
         # 부분 콘텐츠 읽기
@@ -524,8 +679,6 @@ def get_video(incident_id):
                 f.seek(byte_start)
                 data = f.read(length)
 
-            print(f"✅ [VIDEO REQUEST] Read {len(data):,} bytes from file")
-
             # 206 Partial Content 응답
             response = Response(
                 data, status=206, mimetype="video/mp4", direct_passthrough=True
@@ -539,27 +692,23 @@ def get_video(incident_id):
             response.headers["Content-Length"] = str(length)
             response.headers["Cache-Control"] = "no-cache"
 
-            print(f"✅ [VIDEO REQUEST] Sending 206 Partial Content")
-            print(f"   Content-Range: bytes {byte_start}-{byte_end}/{file_size}")
-            print(f"   Content-Length: {length}")
-            print(f"{'='*80}\n")
+            log.debug(
+                "video partial response",
+                extra={
+                    "route": request.path,
+                    "incident_id": incident_id,
+                    "content_range": f"bytes {byte_start}-{byte_end}/{file_size}",
+                },
+            )
 
             return response
 
         except Exception as e:
-            print(f"❌ [VIDEO REQUEST] Error reading file: {e}")
-            import traceback
-
-            traceback.print_exc()
-            print(f"{'='*80}\n")
+            log.exception("video read error", extra={"incident_id": incident_id})
             return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
 
     except Exception as e:
-        print(f"❌ [VIDEO REQUEST] Unexpected error: {e}")
-        import traceback
-
-        traceback.print_exc()
-        print(f"{'='*80}\n")
+        log.exception("video request failed", extra={"incident_id": incident_id})
         return jsonify({"error": str(e)}), 500
 
 
@@ -567,12 +716,13 @@ def get_video(incident_id):
 # @jwt_required()  # ✅ JWT 인증 제거
 def get_thumbnail(incident_id):
     """
-    사고 썸네일
+    사고 썸네일 (archived=1이면 보관된 사고)
     """
     # current_user_id = get_jwt_identity()  # ✅ 주석 처리
 
     # Verify user owns this incident
-    incident = Incident.query.filter_by(
+    model = incident_model(parse_archived(request.args.get("archived")))
+    incident = model.query.filter_by(
         id=incident_id
         # user_id=current_user_id  # ✅ 사용자 검증 제거
     ).first()
@@ -625,6 +775,7 @@ def check_incident(incident_id):
     incident.is_checked = True
     incident.checked_at = datetime.now(timezone.utc)
     db.session.commit()
+    publish_incident_checked(incident)
 
     print(f"✅ [CHECK INCIDENT] Incident {incident_id} marked as checked successfully")
 
@@ -682,62 +833,95 @@ def delete_incident(incident_id):
             500,
         )
 
+    publish_incident_deleted(incident_id, current_user_id)
+
     return jsonify({"status": "success", "message": "Incident deleted"}), 200
 
 
-@incidents_bp.route("/stats", methods=["GET"])
+@incidents_bp.route("/bulk/check", methods=["POST"])
 # @jwt_required()
-def get_stats():
+def bulk_check_incidents():
     """
-    통계
+    사고 일괄 확인/확인 취소 (UPDATE 한 번)
 
-    PERFORMANCE: Optimized to use a single aggregated query instead of multiple
-    separate queries (N+1 problem fix). This reduces database load significantly.
+    Expected JSON:
+    {
+        "ids": [1, 2, 3],                    (ids와 filter 중 하나 이상 필수)
+        "filter": {"type": "fall", "from": "2025-01-10T00:00:00Z", "to": "2025-01-11T00:00:00Z",
+                   "device_id": "pi-01", "is_checked": false},
+        "checked": true                      (기본 true, false면 확인 취소)
+    }
     """
-    from sqlalchemy import func, case
+    # current_user_id = get_jwt_identity()
+    current_user_id = "1"
+    data = request.get_json(silent=True) or {}
 
+    checked = data.get("checked", True)
+    if not isinstance(checked, bool):
+        return jsonify({"error": "checked must be a boolean"}), 400
+    try:
+        criteria = build_criteria(current_user_id, data, ALLOWED_INCIDENT_TYPES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        ids = set_checked(current_user_id, criteria, checked)
+    except Exception as e:
+        log.exception("bulk check failed", extra={"route": request.path})
+        return jsonify({"error": "Failed to update incidents", "message": str(e)}), 500
+
+    return jsonify({"status": "success", "updated": len(ids), "ids": ids, "checked": checked}), 200
+
+
+@incidents_bp.route("/bulk/delete", methods=["POST"])
+# @jwt_required()
+def bulk_delete_incidents():
+    """
+    사고 일괄 삭제 (DELETE 한 번, 영상/썸네일 파일은 백그라운드에서 삭제)
+
+    Expected JSON: {"ids": [...], "filter": {...}} - /bulk/check와 같은 형식
+    """
     # current_user_id = get_jwt_identity()
     current_user_id = "1"
+    data = request.get_json(silent=True) or {}
 
-    # PERFORMANCE: Single optimized query with aggregations
-    today_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
+    try:
+        criteria = build_criteria(current_user_id, data, ALLOWED_INCIDENT_TYPES)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Aggregate all statistics in one query
-    stats_query = (
-        db.session.query(
-            func.count(Incident.id).label("total"),
-            func.sum(case((Incident.is_checked == True, 1), else_=0)).label("checked"),
-            func.sum(case((Incident.detected_at >= today_start, 1), else_=0)).label(
-                "today"
-            ),
-        )
-        .filter(Incident.user_id == current_user_id)
-        .first()
-    )
+    try:
+        ids, files = delete_incidents(current_user_id, criteria)
+    except Exception as e:
+        log.exception("bulk delete failed", extra={"route": request.path})
+        return jsonify({"error": "Failed to delete incidents", "message": str(e)}), 500
 
-    total = stats_query.total or 0
-    checked = stats_query.checked or 0
-    today = stats_query.today or 0
-    unchecked = total - checked
-
-    # 유형별 통계 (separate query but necessary for grouping)
-    type_stats = (
-        db.session.query(Incident.incident_type, func.count(Incident.id))
-        .filter_by(user_id=current_user_id)
-        .group_by(Incident.incident_type)
-        .all()
-    )
+    return jsonify({"status": "success", "deleted": len(ids), "ids": ids, "files_scheduled": files}), 200
+
+
+@incidents_bp.route("/stats", methods=["GET"])
+# @jwt_required()
+@cached_response
+def get_stats():
+    """
+    통계
+
+    PERFORMANCE: incident_counters 테이블의 (전체 누적, 오늘) 행만 읽는다.
+    카운터는 사고 추가/확인/삭제와 같은 트랜잭션에서 갱신된다 (utils/counters.py).
+    """
+    # current_user_id = get_jwt_identity()
+    current_user_id = "1"
+
+    stats = incident_stats(current_user_id)
 
     return (
         jsonify(
             {
-                "total": total,
-                "checked": checked,
-                "unchecked": unchecked,
-                "today": today,
-                "by_type": {t: c for t, c in type_stats},
+                "total": stats["total"],
+                "checked": stats["checked"],
+                "unchecked": stats["unchecked"],
+                "today": stats["today"],
+                "by_type": stats["by_type"],
             }
         ),
         200,
@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from datetime import datetime, timedelta, timezone
+import json
 
+from config import Config
 from models import db, Incident
+from utils.events import incident_events, EVENT_SUBSCRIBERS
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -15,8 +18,12 @@ def get_latest_notifications():
     to poll for notifications without requiring JWT authentication.
     Consider implementing API key authentication if security is a concern.
 
+    For live updates prefer /stream (SSE) or /events (long-poll), which push
+    incident events instead of re-running this query on every poll.
+
     Query Parameters:
         hours (int): Number of hours to look back (default: 24, max: 168)
+        limit (int): Maximum notifications returned, newest first (default: 50, max: 500)
 
     Returns:
         JSON response with notification count and list of notifications:
@@ -35,8 +42,8 @@ def get_latest_notifications():
             ]
         }
 
-    PERFORMANCE: Uses indexed query on user_id, is_checked, and detected_at
-    to efficiently fetch recent unchecked incidents.
+    PERFORMANCE: Bounded by LIMIT; the query filters on is_checked and detected_at
+    across all users, so it cannot use the (user_id, ...) composite index.
     """
     try:
         # SECURITY: Input validation - hours parameter with reasonable limits
@@ -47,15 +54,21 @@ def get_latest_notifications():
                 'message': 'hours must be between 1 and 168'
             }), 400
 
+        limit = request.args.get('limit', 50, type=int)
+        if limit < 1 or limit > 500:
+            return jsonify({
+                'error': 'Invalid limit parameter',
+                'message': 'limit must be between 1 and 500'
+            }), 400
+
         # Calculate time threshold using timezone-aware datetime
         time_threshold = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        # PERFORMANCE: Query uses composite index (idx_user_checked) for optimal performance
-        # Query unchecked incidents from the last specified hours
+        # Query unchecked incidents from the last specified hours (newest first, bounded)
         incidents = Incident.query.filter(
             Incident.is_checked == False,
             Incident.detected_at >= time_threshold
-        ).order_by(Incident.detected_at.desc()).all()
+        ).order_by(Incident.detected_at.desc()).limit(limit).all()
 
         # Transform incidents to notification format
         notifications = []
@@ -93,6 +106,136 @@ def get_latest_notifications():
         }), 500
 
 
+
+@notifications_bp.route('/stream', methods=['GET'])
+def stream_notifications():
+    """
+    Server-Sent Events stream of incident events.
+
+    Events are pushed from the in-process bus (utils/events.py) as incidents are
+    reported, checked or deleted - an idle connection costs no database queries.
+
+    Event types:
+        incident.created  - data is the same notification object as /latest
+        incident.checked  - {"id", "user_id", "isChecked", "checkedAt"}
+        incident.deleted  - {"id", "user_id"}
+        incidents.checked - bulk check/uncheck: {"ids", "user_id", "isChecked", "checkedAt"}
+        incidents.deleted - bulk delete: {"ids", "user_id"}
+        reset             - the resume cursor is unknown or too old; refetch
+                            /latest, then keep consuming this stream
+
+    Resume: browsers send the Last-Event-ID header automatically on reconnect
+    (or pass ?lastEventId=...). Without a cursor the stream starts at "now".
+
+    Query Parameters:
+        user_id (str): Only deliver events for this user (optional)
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    user_id = request.args.get('user_id')
+    cursor, resumable = incident_events.cursor(last_event_id)
+    heartbeat = Config.SSE_HEARTBEAT_SECONDS
+
+    def generate():
+        nonlocal cursor
+        EVENT_SUBSCRIBERS.inc()
+        try:
+            yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+            if not resumable:
+                yield _sse_reset(cursor)
+
+            while True:
+                events, complete, latest = incident_events.wait(cursor, heartbeat)
+                if not complete:
+                    # 끊긴 동안 보관 범위를 넘는 이벤트가 발생함
+                    cursor = latest
+                    yield _sse_reset(cursor)
+                    continue
+                if not events:
+                    # 주석 줄: 프록시/로드밸런서 유휴 연결 종료 방지
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    if not user_id or event['data'].get('user_id') == user_id:
+                        yield _sse_event(event)
+                cursor = latest
+        finally:
+            # 클라이언트 연결 종료 시 GeneratorExit로 도달
+            EVENT_SUBSCRIBERS.dec()
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 비활성화
+    return response
+
+
+@notifications_bp.route('/events', methods=['GET'])
+def poll_notification_events():
+    """
+    Long-poll alternative to /stream for clients that cannot use EventSource.
+
+    Blocks until an event newer than the cursor exists or the timeout expires.
+
+    Query Parameters:
+        after (str): Cursor from the previous response (omit to start at "now")
+        timeout (int): Seconds to wait (default: 25, max: LONGPOLL_MAX_TIMEOUT)
+        user_id (str): Only deliver events for this user (optional)
+
+    Returns:
+        {"cursor": "...", "reset": false, "events": [{"id", "type", "data"}, ...]}
+        reset=true means the cursor could not be resumed; refetch /latest.
+    """
+    timeout = request.args.get('timeout', 25, type=int)
+    if timeout < 0 or timeout > Config.LONGPOLL_MAX_TIMEOUT:
+        return jsonify({
+            'error': 'Invalid timeout parameter',
+            'message': f'timeout must be between 0 and {Config.LONGPOLL_MAX_TIMEOUT}'
+        }), 400
+
+    user_id = request.args.get('user_id')
+    cursor, resumable = incident_events.cursor(request.args.get('after'))
+
+    EVENT_SUBSCRIBERS.inc()
+    try:
+        events, complete, latest = incident_events.wait(cursor, timeout) if resumable else ([], False, cursor)
+    finally:
+        EVENT_SUBSCRIBERS.dec()
+
+    return jsonify({
+        'cursor': incident_events.event_id(latest),
+        'reset': not complete,
+        'events': [
+            {'id': event['id'], 'type': event['type'], 'data': _event_data(event)}
+            for event in events
+            if complete and (not user_id or event['data'].get('user_id') == user_id)
+        ],
+    }), 200
+
+
+def _event_data(event):
+    """Event payload as sent to clients (created events use the /latest notification shape)."""
+    data = event['data']
+    if event['type'] != 'incident.created':
+        return data
+    return {
+        'id': data['id'],
+        'user_id': data['user_id'],
+        'title': _get_notification_title(data['type']),
+        'message': _format_message(datetime.fromisoformat(data['createdAt']), data['confidence']),
+        'severity': _get_severity_level(data['type']),
+        'type': data['type'],
+        'filename': data['filename'],
+        'createdAt': data['createdAt'],
+    }
+
+
+def _sse_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(_event_data(event))}\n\n"
+
+
+def _sse_reset(cursor):
+    # reset 자체에 현재 커서를 붙여 재연결 시 여기서부터 이어가도록 함
+    return f"id: {incident_events.event_id(cursor)}\nevent: reset\ndata: {{}}\n\n"
+
 def _get_notification_title(incident_type):
     """
     Generate notification title based on incident type.
@@ -123,13 +266,18 @@ def _get_notification_message(incident):
     Returns:
         str: Formatted notification message
     """
+    return _format_message(incident.detected_at, incident.confidence)
+
+
+def _format_message(detected_at, confidence):
+    """Notification message from detection time and confidence."""
     # Format datetime in a user-friendly way
-    detected_time = incident.detected_at.strftime('%Y-%m-%d %H:%M')
+    detected_time = detected_at.strftime('%Y-%m-%d %H:%M')
     message = f"Incident at {detected_time}"
 
     # Add confidence level if available
-    if incident.confidence:
-        confidence_percent = int(incident.confidence * 100)
+    if confidence:
+        confidence_percent = int(confidence * 100)
         message += f" (Confidence: {confidence_percent}%)"
 
     return message
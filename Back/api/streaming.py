@@ -1,15 +1,23 @@
-from flask import Blueprint, request, jsonify, Response, send_file
+from flask import Blueprint, request, jsonify, Response, send_file, current_app
 from datetime import datetime, timezone  # ← timezone 추가
 import cv2
 import numpy as np
 import os
+import struct
 import threading
+import time
+
+from werkzeug.exceptions import ClientDisconnected
 
 from models import db, StreamSession
-from utils.buffer import CircularVideoBuffer, HLSSegmentManager
+from utils.buffer import CircularVideoBuffer, HLSSegmentManager, DeviceTimeline
+from utils.ingest import MJPEGStreamParser, IngestStats, FFmpegIngestWorker, parse_ingest_sources
+from utils.metrics import registry, INGEST_FRAMES, INGEST_BYTES, MJPEG_VIEWERS
+from utils.log import get_logger
 from config import Config
 
 streaming_bp = Blueprint('streaming', __name__)
+log = get_logger('api.streaming')
 
 # 전역 변수
 video_buffer = CircularVideoBuffer(duration=30, fps=30)  # 30초로 증가
@@ -21,6 +29,191 @@ stream_lock = threading.Lock()
 latest_frame = None
 frame_lock = threading.Lock()
 
+# 배치 업로드 포맷 (big-endian): 프레임마다 [seq:u32][capture_ts:f64][length:u32] + JPEG 바이트
+# capture_ts는 디바이스 캡처 시각 (Unix epoch 초), 0이면 서버 수신 시각 사용
+BATCH_FRAME_HEADER = struct.Struct('>IdI')
+MAX_BATCH_FRAMES = 256
+MAX_FRAME_SIZE = 10 * 1024 * 1024  # 10MB
+
+# 디바이스별 캡처 시각 보정 + 재정렬 버퍼 (device_id → DeviceTimeline)
+device_timelines = {}
+timeline_lock = threading.Lock()
+
+# 장기 연결 스트리밍 수집 (stream_id → IngestStats, 재연결 시 이어서 누적)
+ingest_streams = {}
+ingest_lock = threading.Lock()
+INGEST_READ_SIZE = 64 * 1024
+
+# Pull 방식 수집 워커 (소스 이름 → FFmpegIngestWorker)
+ingest_workers = {}
+ingest_workers_started = False
+
+
+def _get_device_timeline(device_id):
+    """디바이스 타임라인 반환 (없으면 생성)"""
+    timeline = device_timelines.get(device_id)
+    if timeline is None:
+        with timeline_lock:
+            timeline = device_timelines.get(device_id)
+            if timeline is None:
+                timeline = DeviceTimeline(
+                    device_id,
+                    reorder_window=Config.REORDER_WINDOW_MS / 1000,
+                    reorder_max_frames=Config.REORDER_MAX_FRAMES
+                )
+                device_timelines[device_id] = timeline
+    return timeline
+
+
+def to_server_time(device_id, device_time):
+    """
+    디바이스 시계 기준 시각을 서버 시계(버퍼 타임스탬프 기준)로 보정
+
+    캡처 타임스탬프를 보낸 적 없는 디바이스는 그대로 반환한다.
+    """
+    timeline = device_timelines.get(device_id)
+    if timeline is None:
+        return device_time
+    return timeline.to_server_time(device_time)
+
+
+def _store_frames(device_id, frames):
+    """
+    수신한 프레임들을 최신 프레임 슬롯과 순환 버퍼에 저장하고 세션 통계 갱신
+
+    모든 수집 경로(단일/raw/배치/장기 연결/ffmpeg)가 공유하는 경로.
+    캡처 시각은 디바이스별 시계 오프셋으로 보정되고, 시퀀스 번호가 있으면
+    재정렬 버퍼를 거쳐 캡처 순서대로 순환 버퍼에 들어간다.
+    세션 DB 커밋은 프레임 수와 관계없이 호출당 한 번만 수행한다.
+
+    Args:
+        device_id: 디바이스 ID
+        frames: (frame_bytes, capture_ts, seq) 튜플 리스트
+            - capture_ts: 디바이스 캡처 시각 (epoch 초), None이면 서버 수신 시각
+            - seq: 디바이스 시퀀스 번호, None이면 재정렬 없이 바로 추가
+    """
+    global latest_frame, current_stream_session
+
+    if not frames:
+        return
+
+    timeline = _get_device_timeline(device_id)
+    newest = timeline.ingest(frames, time.time(), video_buffer.add_frame)
+
+    INGEST_FRAMES.inc(len(frames), device=device_id)
+    INGEST_BYTES.inc(sum(len(frame[0]) for frame in frames), device=device_id)
+
+    # 최신 프레임 저장 (MJPEG 스트리밍용) - 늦게 도착한 프레임으로 되돌아가지 않음
+    if newest is not None:
+        with frame_lock:
+            latest_frame = newest
+
+    # FIX #5: Auto-create StreamSession if none exists
+    with stream_lock:
+        if current_stream_session is None or not current_stream_session.is_active:
+            session = StreamSession(
+                device_id=device_id,
+                is_active=True
+            )
+            db.session.add(session)
+            db.session.commit()
+            current_stream_session = session
+            log.info("stream session auto-created", extra={'device_id': device_id, 'session_id': session.id})
+
+        # 스트림 세션 업데이트
+        if current_stream_session and current_stream_session.is_active:
+            frames_before = current_stream_session.total_frames or 0
+            current_stream_session.total_frames = frames_before + len(frames)
+            db.session.commit()
+
+            # FIX #1: Log session statistics every 100 frames
+            if frames_before // 100 != current_stream_session.total_frames // 100:
+                log.debug("session stats", extra={
+                    'device_id': device_id,
+                    'total_frames': current_stream_session.total_frames
+                })
+
+
+def _parse_capture_ts(value):
+    """
+    캡처 시각 값(Unix epoch 초) 파싱
+
+    Returns:
+        float or None: 값이 없거나 0이면 None (서버 수신 시각 사용)
+
+    Raises:
+        ValueError: 유한한 양수가 아닌 경우
+    """
+    if not value:
+        return None
+    try:
+        capture_ts = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid capture timestamp: {value}') from None
+    if not 0 <= capture_ts < 1e11:
+        raise ValueError(f'Invalid capture timestamp: {value}')
+    return capture_ts or None
+
+
+def _parse_seq(value):
+    """
+    시퀀스 번호 파싱 (32비트 부호 없는 정수)
+
+    Raises:
+        ValueError: 정수가 아니거나 범위를 벗어난 경우
+    """
+    if value is None or value == '':
+        return None
+    try:
+        seq = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid sequence number: {value}') from None
+    if not 0 <= seq < 2 ** 32:
+        raise ValueError(f'Invalid sequence number: {value}')
+    return seq
+
+
+def _parse_frame_batch(body):
+    """
+    길이 접두 바이너리 배치 본문을 프레임 리스트로 분해
+
+    Args:
+        body: 요청 본문 (bytes)
+
+    Returns:
+        list: (seq, capture_ts, frame_bytes) 튜플 리스트
+
+    Raises:
+        ValueError: 본문 형식이 잘못된 경우
+    """
+    frames = []
+    view = memoryview(body)
+    offset = 0
+    total = len(body)
+    header_size = BATCH_FRAME_HEADER.size
+
+    while offset < total:
+        if total - offset < header_size:
+            raise ValueError(f'Truncated frame header at offset {offset}')
+
+        seq, capture_ts, length = BATCH_FRAME_HEADER.unpack_from(view, offset)
+        offset += header_size
+
+        if length == 0:
+            raise ValueError(f'Empty frame data (seq={seq})')
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f'Frame too large: {length} bytes (seq={seq})')
+        if total - offset < length:
+            raise ValueError(f'Truncated frame data (seq={seq})')
+
+        frames.append((seq, capture_ts, bytes(view[offset:offset + length])))
+        offset += length
+
+        if len(frames) > MAX_BATCH_FRAMES:
+            raise ValueError(f'Too many frames in batch (max {MAX_BATCH_FRAMES})')
+
+    return frames
+
 
 @streaming_bp.route('/upload', methods=['POST'])
 def upload_frame():
@@ -31,20 +224,17 @@ def upload_frame():
         - multipart/form-data
         - file: frame (JPEG)
         - device_id: 디바이스 ID
+        - capture_ts: 캡처 시각 (Unix epoch 초, 선택)
+        - seq: 프레임 시퀀스 번호 (선택, 동시 업로드 재정렬용)
     """
-    global latest_frame, current_stream_session
-
     try:
-        # FIX #1: Enhanced logging - Log incoming request
-        print(f"📥 Received frame upload request from device: {request.form.get('device_id', 'unknown')}")
-        print(f"   Content-Type: {request.content_type}")
-        print(f"   Content-Length: {request.content_length}")
-
         # 파일 확인
         if 'frame' not in request.files:
-            print(f"❌ Frame validation failed: No 'frame' field in request")
-            print(f"   Available fields: {list(request.files.keys())}")
-            print(f"   Form data: {list(request.form.keys())}")
+            log.warning("frame validation failed: no 'frame' field", extra={
+                'route': request.path,
+                'files': list(request.files.keys()),
+                'form': list(request.form.keys())
+            })
             return jsonify({'error': 'No frame provided'}), 400
 
         frame_file = request.files['frame']
@@ -54,66 +244,334 @@ def upload_frame():
         frame_bytes = frame_file.read()
         frame_size = len(frame_bytes)
 
-        # FIX #1: Log frame size and device_id
-        print(f"✅ Frame received: {frame_size} bytes from {device_id}")
+        # FIX #1: Log frame size and device_id (DEBUG, 라우트별 샘플링)
+        log.debug("frame received", extra={'route': request.path, 'device_id': device_id, 'bytes': frame_size})
 
         # FIX #1: Frame validation
         if frame_size == 0:
-            print(f"❌ Frame validation failed: Empty frame data from {device_id}")
+            log.warning("frame validation failed: empty frame", extra={'device_id': device_id})
             return jsonify({'error': 'Empty frame data'}), 400
 
-        if frame_size > 10 * 1024 * 1024:  # 10MB limit
-            print(f"⚠️ Frame validation warning: Large frame {frame_size} bytes from {device_id}")
+        if frame_size > MAX_FRAME_SIZE:  # 10MB limit
+            log.warning("large frame", extra={'device_id': device_id, 'bytes': frame_size})
 
-        # 최신 프레임 저장 (MJPEG 스트리밍용)
-        with frame_lock:
-            latest_frame = frame_bytes
+        try:
+            capture_ts = _parse_capture_ts(request.form.get('capture_ts'))
+            seq = _parse_seq(request.form.get('seq'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        # 순환 버퍼에 추가 - datetime.utcnow() → datetime.now(timezone.utc)로 수정
-        video_buffer.add_frame(frame_bytes, datetime.now(timezone.utc))
+        # 최신 프레임 슬롯 + 순환 버퍼 저장 (capture_ts가 없으면 서버 수신 시각)
+        _store_frames(device_id, [(frame_bytes, capture_ts, seq)])
 
-        # FIX #5: Auto-create StreamSession if none exists
-        with stream_lock:
-            if current_stream_session is None or not current_stream_session.is_active:
-                print(f"🔄 Auto-creating StreamSession for device: {device_id}")
-                session = StreamSession(
-                    device_id=device_id,
-                    is_active=True
-                )
-                db.session.add(session)
-                db.session.commit()
-                current_stream_session = session
-                print(f"✅ StreamSession auto-created: {session.id}")
+        return jsonify({
+            'status': 'success',
+            'buffer_status': video_buffer.get_status()
+        }), 200
+
+    except Exception as e:
+        # FIX #1: Enhanced error logging with traceback
+        log.exception("frame upload failed", extra={
+            'device_id': request.form.get('device_id', 'unknown'),
+            'content_type': request.content_type,
+            'content_length': request.content_length
+        })
+        return jsonify({'error': str(e)}), 500
+
+
+@streaming_bp.route('/upload/batch', methods=['POST'])
+def upload_frame_batch():
+    """
+    라즈베리파이로부터 여러 프레임을 한 번에 수신
 
-            # 스트림 세션 업데이트
-            if current_stream_session and current_stream_session.is_active:
-                current_stream_session.total_frames += 1
-                db.session.commit()
+    프레임당 HTTP 요청/multipart 파싱/세션 커밋 비용을 배치 단위로 분산한다.
 
-                # FIX #1: Log session statistics every 100 frames
-                if current_stream_session.total_frames % 100 == 0:
-                    print(f"📊 Session stats: {current_stream_session.total_frames} frames processed for {device_id}")
+    Expected:
+        - application/octet-stream
+        - body: 프레임마다 [seq:u32][capture_ts:f64][length:u32] 헤더 + JPEG 바이트 (big-endian)
+        - device_id: X-Device-Id 헤더 또는 ?device_id= 쿼리 파라미터
+    """
+    device_id = request.headers.get('X-Device-Id') or request.args.get('device_id', 'unknown')
+
+    try:
+        body = request.get_data(cache=False)
+        if not body:
+            return jsonify({'error': 'Empty batch'}), 400
+
+        try:
+            batch = _parse_frame_batch(body)
+        except ValueError as e:
+            log.warning("batch validation failed", extra={'device_id': device_id, 'error': str(e)})
+            return jsonify({'error': 'Invalid batch', 'message': str(e)}), 400
+
+        _store_frames(device_id, [
+            (frame_bytes, capture_ts if capture_ts > 0 else None, seq)
+            for seq, capture_ts, frame_bytes in batch
+        ])
 
         return jsonify({
             'status': 'success',
+            'accepted': len(batch),
+            'last_seq': batch[-1][0],
             'buffer_status': video_buffer.get_status()
         }), 200
 
     except Exception as e:
-        # FIX #1: Enhanced error logging with traceback
-        print(f"❌ Frame upload failed: {e}")
-        print(f"   Device: {request.form.get('device_id', 'unknown')}")
-        print(f"   Content-Type: {request.content_type}")
-        print(f"   Content-Length: {request.content_length}")
+        log.exception("batch upload failed", extra={'device_id': device_id})
+        return jsonify({'error': str(e)}), 500
 
-        # Print full traceback for debugging
-        import traceback
-        print("🔍 Full traceback:")
-        traceback.print_exc()
 
+@streaming_bp.route('/upload/raw', methods=['POST'])
+def upload_frame_raw():
+    """
+    라즈베리파이로부터 프레임 수신 (multipart 파싱 없이 요청 본문 그대로 사용)
+
+    werkzeug 폼 파서/임시 파일 스풀링을 거치지 않고 본문을 한 번만 읽어
+    프레임 저장소에 넣는다.
+
+    Expected:
+        - image/jpeg 또는 application/octet-stream
+        - body: JPEG 바이트
+        - X-Device-Id: 디바이스 ID
+        - X-Capture-Timestamp: 캡처 시각 (Unix epoch 초, 선택)
+        - X-Sequence: 프레임 시퀀스 번호 (선택, 동시 업로드 재정렬용)
+    """
+    device_id = request.headers.get('X-Device-Id', 'unknown')
+
+    try:
+        if request.mimetype not in ('image/jpeg', 'application/octet-stream'):
+            return jsonify({
+                'error': 'Unsupported Content-Type',
+                'message': 'Use image/jpeg or application/octet-stream'
+            }), 415
+
+        if request.content_length and request.content_length > MAX_FRAME_SIZE:
+            return jsonify({'error': f'Frame too large: {request.content_length} bytes'}), 413
+
+        frame_bytes = request.get_data(cache=False)
+        if not frame_bytes:
+            return jsonify({'error': 'Empty frame data'}), 400
+
+        try:
+            capture_ts = _parse_capture_ts(request.headers.get('X-Capture-Timestamp'))
+            seq = _parse_seq(request.headers.get('X-Sequence'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        _store_frames(device_id, [(frame_bytes, capture_ts, seq)])
+
+        return jsonify({
+            'status': 'success',
+            'buffer_status': video_buffer.get_status()
+        }), 200
+
+    except Exception as e:
+        log.exception("raw frame upload failed", extra={'device_id': device_id})
         return jsonify({'error': str(e)}), 500
 
 
+def _get_ingest_stats(stream_id, device_id):
+    """stream_id별 통계 객체 반환 (없으면 생성)"""
+    with ingest_lock:
+        stats = ingest_streams.get(stream_id)
+        if stats is None:
+            stats = IngestStats(stream_id, device_id)
+            ingest_streams[stream_id] = stats
+        return stats
+
+
+def _open_ingest_stream():
+    """
+    요청 본문 스트림 반환
+
+    chunked 요청은 서버가 스트림 종료를 보장(wsgi.input_terminated)하므로
+    MAX_CONTENT_LENGTH 제한 없이 원본 입력을 읽는다. 장시간 연결이 누적
+    500MB에서 끊기지 않도록 하기 위함. 프레임 크기는 파서가 제한한다.
+    """
+    if request.content_length is None and request.environ.get('wsgi.input_terminated'):
+        return request.environ['wsgi.input']
+    return request.stream
+
+
+@streaming_bp.route('/ingest', methods=['POST'])
+def ingest_stream():
+    """
+    장기 연결 스트리밍 수집 (하나의 chunked POST로 연속 프레임 수신)
+
+    프레임마다 요청을 보내는 대신 연결 하나로 MJPEG 바이트 스트림을 받아
+    프레임 경계를 증분 파싱하고 버퍼에 넣는다. 연결이 끊기면 클라이언트는
+    같은 X-Stream-Id로 재연결하고, 이미 받은 X-Sequence 프레임은 중복으로 버려진다.
+
+    Expected:
+        - multipart/x-mixed-replace; boundary=<boundary>
+          파트 헤더: Content-Length, X-Sequence, X-Capture-Timestamp (선택)
+        - 또는 image/jpeg / application/octet-stream: 연속된 JPEG 바이트
+        - X-Device-Id: 디바이스 ID
+        - X-Stream-Id: 재연결 간 유지되는 스트림 ID (기본값: device_id)
+    """
+    device_id = request.headers.get('X-Device-Id') or request.args.get('device_id', 'unknown')
+    stream_id = request.headers.get('X-Stream-Id') or device_id
+
+    boundary = None
+    if request.mimetype.startswith('multipart/'):
+        boundary = request.mimetype_params.get('boundary')
+        if not boundary:
+            return jsonify({'error': 'Multipart stream requires a boundary'}), 400
+
+    parser = MJPEGStreamParser(boundary=boundary, max_frame_size=MAX_FRAME_SIZE)
+    stats = _get_ingest_stats(stream_id, device_id)
+    stats.connection_opened()
+    log.info("ingest stream connected", extra={
+        'stream_id': stream_id, 'device_id': device_id, 'connection': stats.connections
+    })
+
+    stream = _open_ingest_stream()
+    error = None
+    try:
+        while True:
+            chunk = stream.read(INGEST_READ_SIZE)
+            if not chunk:
+                break
+
+            frames = []
+            pending_seq = None
+            for frame_bytes, headers in parser.feed(chunk):
+                seq = _parse_seq(headers.get('x-sequence'))
+                if stats.is_duplicate(seq, pending_seq):
+                    continue
+                if seq is not None:
+                    pending_seq = seq
+                capture_ts = _parse_capture_ts(headers.get('x-capture-timestamp'))
+                frames.append((frame_bytes, capture_ts, seq))
+
+            # 읽기 단위로 묶어서 저장 (세션 커밋도 묶음당 한 번)
+            _store_frames(device_id, frames)
+
+            # 저장된 프레임만 수신 기록 - 저장 실패 시 재전송이 중복으로 버려지지 않도록
+            for frame_bytes, _, seq in frames:
+                stats.record_frame(len(frame_bytes), seq)
+
+    except ValueError as e:
+        error = e
+        log.warning("ingest stream rejected", extra={'stream_id': stream_id, 'error': str(e)})
+    except (ClientDisconnected, OSError) as e:
+        # 클라이언트 연결 끊김 - 통계만 남기고 재연결을 기다림
+        error = e
+        log.warning("ingest stream interrupted", extra={'stream_id': stream_id, 'error': str(e)})
+    except Exception as e:
+        # 서버 측 실패 (저장/DB 오류 등) - 클라이언트가 재전송하도록 5xx 반환
+        error = e
+        log.exception("ingest stream failed", extra={'stream_id': stream_id})
+    finally:
+        stats.connection_closed(error)
+
+    summary = stats.to_dict()
+    log.info("ingest stream closed", extra={
+        'stream_id': stream_id,
+        'frames': summary['connection']['frames'],
+        'fps': summary['connection']['fps']
+    })
+
+    if isinstance(error, ValueError):
+        return jsonify({'status': 'error', 'error': str(error), 'stream': summary}), 400
+    if error is not None and not isinstance(error, (ClientDisconnected, OSError)):
+        return jsonify({'status': 'error', 'error': str(error), 'stream': summary}), 500
+
+    return jsonify({'status': 'closed', 'stream': summary}), 200
+
+
+@streaming_bp.route('/ingest/stats', methods=['GET'])
+def ingest_stats():
+    """장기 연결 수집 스트림별 처리량 통계"""
+    with ingest_lock:
+        streams = list(ingest_streams.values())
+
+    return jsonify({
+        'streams': [stats.to_dict() for stats in streams],
+        'count': len(streams)
+    }), 200
+
+
+@streaming_bp.route('/ingest/<stream_id>', methods=['GET'])
+def ingest_stream_status(stream_id):
+    """
+    스트림 재개 정보 (마지막으로 받은 시퀀스 번호 등)
+    """
+    with ingest_lock:
+        stats = ingest_streams.get(stream_id)
+
+    if stats is None:
+        return jsonify({'error': 'Unknown stream', 'stream_id': stream_id}), 404
+
+    return jsonify(stats.to_dict()), 200
+
+
+@streaming_bp.before_app_request
+def _start_ingest_workers():
+    """
+    설정된 pull 수집 소스(INGEST_SOURCES) 워커를 첫 요청 시 시작
+
+    create_app()에서 바로 시작하지 않는 이유: migrate_db.py 같은 스크립트나
+    디버그 리로더의 부모 프로세스에서 ffmpeg가 실행되지 않도록 하기 위함.
+    """
+    global ingest_workers_started
+
+    if ingest_workers_started:
+        return
+
+    with ingest_lock:
+        if ingest_workers_started:
+            return
+        ingest_workers_started = True
+
+        app = current_app._get_current_object()
+        try:
+            sources = parse_ingest_sources(app.config.get('INGEST_SOURCES'))
+        except ValueError as e:
+            log.warning("invalid INGEST_SOURCES", extra={'error': str(e)})
+            return
+
+        for name, url in sources:
+            worker = FFmpegIngestWorker(
+                name=name,
+                url=url,
+                device_id=name,
+                on_frames=_store_frames,
+                ffmpeg_path=app.config.get('INGEST_FFMPEG_PATH', 'ffmpeg'),
+                fps=app.config.get('INGEST_FPS'),
+                jpeg_quality=app.config.get('INGEST_JPEG_QUALITY', 5),
+                loop_files=app.config.get('INGEST_LOOP_FILES', True),
+                app=app,
+            )
+            ingest_workers[name] = worker
+            worker.start()
+
+
+@streaming_bp.route('/sources', methods=['GET'])
+def list_ingest_sources():
+    """Pull 수집 소스 목록 및 소스별 통계 (프레임 수, fps, 재시작 횟수 등)"""
+    with ingest_lock:
+        workers = list(ingest_workers.values())
+
+    return jsonify({
+        'sources': [worker.to_dict() for worker in workers],
+        'count': len(workers)
+    }), 200
+
+
+@streaming_bp.route('/sources/<name>/restart', methods=['POST'])
+def restart_ingest_source(name):
+    """Pull 수집 소스의 ffmpeg 프로세스 재시작"""
+    with ingest_lock:
+        worker = ingest_workers.get(name)
+
+    if worker is None:
+        return jsonify({'error': 'Unknown source', 'name': name}), 404
+
+    worker.restart()
+    return jsonify({'status': 'restarting', 'source': worker.to_dict()}), 200
+
+
 @streaming_bp.route('/mjpeg')
 def mjpeg_stream():
     """
@@ -123,22 +581,26 @@ def mjpeg_stream():
     CORS 헤더를 명시적으로 포함하여 네트워크 환경에서 스트리밍 지원
     """
     def generate():
-        while True:
-            with frame_lock:
-                if latest_frame is None:
-                    # 대기 프레임 (검은 화면)
-                    dummy = np.zeros((480, 640, 3), dtype=np.uint8)
-                    _, buffer = cv2.imencode('.jpg', dummy)
-                    frame = buffer.tobytes()
-                else:
-                    frame = latest_frame
-
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-
-            # FPS 제어 (30fps)
-            import time
-            time.sleep(1/30)
+        MJPEG_VIEWERS.inc()
+        try:
+            while True:
+                with frame_lock:
+                    if latest_frame is None:
+                        # 대기 프레임 (검은 화면)
+                        dummy = np.zeros((480, 640, 3), dtype=np.uint8)
+                        _, buffer = cv2.imencode('.jpg', dummy)
+                        frame = buffer.tobytes()
+                    else:
+                        frame = latest_frame
+
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+
+                # FPS 제어 (30fps)
+                time.sleep(1/30)
+        finally:
+            # 클라이언트 연결 종료 시 GeneratorExit로 도달
+            MJPEG_VIEWERS.dec()
 
     # CORS 헤더 명시적 포함
     response = Response(
@@ -287,12 +749,63 @@ def get_latest_frame():
         return jsonify({'error': 'Failed to retrieve frame'}), 500
 
 
+def _collect_stream_metrics():
+    """/metrics 스크랩 시점에 계산하는 스트리밍 메트릭"""
+    buffer_status = video_buffer.get_status()
+
+    with timeline_lock:
+        timelines = list(device_timelines.values())
+    now = time.time()
+    rates = [(timeline.device_id,) + timeline.get_rates(now) for timeline in timelines]
+
+    with ingest_lock:
+        connections = sum(1 for stats in ingest_streams.values() if stats.active)
+
+    return [
+        ('safefall_buffer_frames', 'gauge', 'Frames held in the circular buffer',
+         [({}, buffer_status['frame_count'])]),
+        ('safefall_buffer_capacity_frames', 'gauge', 'Circular buffer capacity',
+         [({}, buffer_status['max_frames'])]),
+        ('safefall_buffer_bytes', 'gauge', 'JPEG bytes held in the circular buffer',
+         [({}, buffer_status['total_bytes'])]),
+        ('safefall_ingest_fps', 'gauge', 'Per-device ingest rate over the last 5 seconds',
+         [({'device': device_id}, round(fps, 3)) for device_id, fps, _ in rates]),
+        ('safefall_ingest_bytes_per_second', 'gauge', 'Per-device ingest bandwidth over the last 5 seconds',
+         [({'device': device_id}, round(bps, 1)) for device_id, _, bps in rates]),
+        ('safefall_ingest_connections', 'gauge', 'Open long-lived ingest connections',
+         [({}, connections)]),
+        ('safefall_ingest_sources_running', 'gauge', 'Pull ingest sources with a running ffmpeg process',
+         [({'source': name}, 1 if worker.stats.active else 0) for name, worker in ingest_workers.items()]),
+    ]
+
+
+registry.register_collector(_collect_stream_metrics)
+
+
 # 버퍼 접근 함수 (incidents.py에서 사용)
 def get_video_buffer():
-    """버퍼 인스턴스 반환"""
+    """버퍼 인스턴스 반환 (재정렬 대기 중 만료된 프레임을 먼저 반영)"""
+    with timeline_lock:
+        timelines = list(device_timelines.values())
+    for timeline in timelines:
+        timeline.flush(video_buffer.add_frame)
     return video_buffer
 
 
+@streaming_bp.route('/devices', methods=['GET'])
+def device_timeline_status():
+    """
+    디바이스별 시계 오프셋, 재정렬 통계, 프레임 지연(캡처→수신) 분포
+    """
+    with timeline_lock:
+        timelines = list(device_timelines.values())
+
+    return jsonify({
+        'devices': [timeline.get_status() for timeline in timelines],
+        'count': len(timelines)
+    }), 200
+
+
 @streaming_bp.route('/live', methods=['GET'])
 def get_live_stream():
     """
@@ -351,10 +864,66 @@ def list_endpoints():
                 'content_type': 'multipart/form-data',
                 'parameters': {
                     'frame': 'file (JPEG image)',
-                    'device_id': 'string (device identifier)'
+                    'device_id': 'string (device identifier)',
+                    'capture_ts': 'float (capture time, epoch seconds, optional)',
+                    'seq': 'int (frame sequence number, optional)'
                 },
                 'example_curl': 'curl -X POST http://localhost:5000/api/stream/upload -F "frame=@frame.jpg" -F "device_id=pi-01"'
             },
+            {
+                'path': '/api/stream/upload/batch',
+                'method': 'POST',
+                'description': 'Upload multiple frames with capture timestamps in one request',
+                'content_type': 'application/octet-stream',
+                'parameters': {
+                    'body': 'repeated [seq:u32][capture_ts:f64][length:u32][JPEG bytes] (big-endian)',
+                    'X-Device-Id': 'header (device identifier)'
+                }
+            },
+            {
+                'path': '/api/stream/upload/raw',
+                'method': 'POST',
+                'description': 'Upload a single frame as the raw request body (no multipart parsing)',
+                'content_type': 'image/jpeg',
+                'parameters': {
+                    'body': 'JPEG bytes',
+                    'X-Device-Id': 'header (device identifier)',
+                    'X-Capture-Timestamp': 'header (capture time, Unix epoch seconds, optional)'
+                },
+                'example_curl': 'curl -X POST http://localhost:5000/api/stream/upload/raw -H "Content-Type: image/jpeg" -H "X-Device-Id: pi-01" --data-binary @frame.jpg'
+            },
+            {
+                'path': '/api/stream/ingest',
+                'method': 'POST',
+                'description': 'Long-lived chunked MJPEG stream upload (one connection, many frames)',
+                'content_type': 'multipart/x-mixed-replace; boundary=frame',
+                'parameters': {
+                    'part headers': 'Content-Length, X-Sequence, X-Capture-Timestamp',
+                    'X-Device-Id': 'header (device identifier)',
+                    'X-Stream-Id': 'header (stable across reconnects, for resume/dedup)'
+                }
+            },
+            {
+                'path': '/api/stream/ingest/stats',
+                'method': 'GET',
+                'description': 'Per-stream ingest throughput statistics',
+                'content_type': 'application/json',
+                'parameters': None
+            },
+            {
+                'path': '/api/stream/sources',
+                'method': 'GET',
+                'description': 'Pull ingest sources (ffmpeg: RTSP/HTTP/file) and per-source stats',
+                'content_type': 'application/json',
+                'parameters': None
+            },
+            {
+                'path': '/api/stream/devices',
+                'method': 'GET',
+                'description': 'Per-device clock offset, reorder stats and capture-to-arrival latency',
+                'content_type': 'application/json',
+                'parameters': None
+            },
             {
                 'path': '/api/stream/mjpeg',
                 'method': 'GET',
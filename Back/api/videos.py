@@ -8,8 +8,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timezone
 import os
 
+from sqlalchemy.orm import defer
+
 from models import db, Incident
 from config import Config
+from utils.bulk import build_criteria, set_checked
+from utils.cache import cached_response
+from utils import media
+from utils.media import directory_scanner
+from utils.archive import parse_archived, incident_model
 
 videos_bp = Blueprint("videos", __name__)
 
@@ -39,66 +46,70 @@ def safe_path_join(base_dir, filename):
 
 @videos_bp.route("/saved", methods=["GET"])
 @jwt_required()
+@cached_response
 def get_saved_videos():
     """
     저장된 비디오 목록 조회
 
+    파일 크기/존재 여부는 Incident에 저장된 값(utils/media.py)을 사용하며
+    요청 중 파일시스템을 조회하지 않는다. 파일이 없는 것으로 확인된 영상은 제외.
+
     Query Parameters:
         - trigger_type: 필터 (fall, manual 등)
         - limit: 조회 수 (기본: 50)
+        - archived: 1이면 보관된 영상 (기본은 최근 영상만)
     """
     try:
         # current_user_id = get_jwt_identity()
         current_user_id = "1"
         trigger_type = request.args.get("trigger_type", None)
         limit = request.args.get("limit", 50, type=int)
-
-        # 쿼리 빌드
-        query = Incident.query.filter_by(user_id=current_user_id)
+        archived = parse_archived(request.args.get("archived"))
+        model = incident_model(archived)
+        suffix = "?archived=1" if archived else ""
+
+        # 쿼리 빌드 (media_present가 NULL이면 아직 확인 전 → 포함)
+        query = model.query.options(
+            defer(model.video_blob), defer(model.thumbnail_blob)
+        ).filter(
+            model.user_id == current_user_id,
+            model.media_present.isnot(False),
+        )
 
         if trigger_type:
             query = query.filter_by(incident_type=trigger_type)
 
         # 최신순 정렬
-        incidents = query.order_by(Incident.detected_at.desc()).limit(limit).all()
+        incidents = query.order_by(model.detected_at.desc()).limit(limit).all()
 
         videos = []
         for incident in incidents:
-            video_path = os.path.join(Config.VIDEOS_DIR, incident.video_path)
-
-            # 파일 존재 확인
-            if os.path.exists(video_path):
-                stat = os.stat(video_path)
-
-                video_data = {
-                    "id": incident.id,
-                    "title": f"SafeFall Video - {incident.video_path}",
-                    "filename": incident.video_path,
-                    "video_filename": incident.video_path,
-                    "name": incident.video_path,
-                    "path": f"/api/incidents/{incident.id}/video",
-                    "url": f"http://localhost:5000/api/incidents/{incident.id}/video",
-                    "thumbnail_url": (
-                        f"/api/incidents/{incident.id}/thumbnail"
-                        if incident.thumbnail_path
-                        else None
-                    ),
-                    "size": stat.st_size,
-                    "mtime": incident.detected_at.isoformat(),
-                    "created_at": incident.detected_at.isoformat(),
-                    "createdAt": incident.detected_at.isoformat(),
-                    "confidence": incident.confidence or 0.95,
-                    "isChecked": incident.is_checked,
-                    "processed": incident.is_checked,
-                    "trigger_type": incident.incident_type,
-                    "device_id": (
-                        incident.extra_data.get("device_id", "unknown")
-                        if incident.extra_data
-                        else "unknown"
-                    ),
-                    "file_type": "mp4",
-                }
-                videos.append(video_data)
+            video_data = {
+                "id": incident.id,
+                "title": f"SafeFall Video - {incident.video_path}",
+                "filename": incident.video_path,
+                "video_filename": incident.video_path,
+                "name": incident.video_path,
+                "path": f"/api/incidents/{incident.id}/video{suffix}",
+                "url": f"http://localhost:5000/api/incidents/{incident.id}/video{suffix}",
+                "thumbnail_url": (
+                    f"/api/incidents/{incident.id}/thumbnail{suffix}"
+                    if incident.thumbnail_path
+                    else None
+                ),
+                "size": incident.video_size,
+                "sha256": incident.video_sha256,
+                "mtime": incident.detected_at.isoformat(),
+                "created_at": incident.detected_at.isoformat(),
+                "createdAt": incident.detected_at.isoformat(),
+                "confidence": incident.confidence or 0.95,
+                "isChecked": incident.is_checked,
+                "processed": incident.is_checked,
+                "trigger_type": incident.incident_type,
+                "device_id": incident.device_id or "unknown",
+                "file_type": "mp4",
+            }
+            videos.append(video_data)
 
         return (
             jsonify(
@@ -106,6 +117,7 @@ def get_saved_videos():
                     "success": True,
                     "videos": videos,
                     "count": len(videos),
+                    "archived": archived,
                     "method": "Database",
                 }
             ),
@@ -135,15 +147,21 @@ def get_video_by_identifier(video_identifier):
 
     Parameters:
         - video_identifier: ID 또는 파일명
+
+    Query Parameters:
+        - archived: 1이면 보관된 영상에서 조회
     """
     try:
         # current_user_id = get_jwt_identity()
         current_user_id = "1"
+        archived = parse_archived(request.args.get("archived"))
+        model = incident_model(archived)
+        suffix = "?archived=1" if archived else ""
 
         # ID인지 파일명인지 판단
         if video_identifier.isdigit():
             # ID로 조회
-            incident = Incident.query.filter_by(
+            incident = model.query.filter_by(
                 id=int(video_identifier), user_id=current_user_id
             ).first()
         else:
@@ -152,7 +170,7 @@ def get_video_by_identifier(video_identifier):
 
             decoded_filename = unquote(video_identifier)
 
-            incident = Incident.query.filter_by(
+            incident = model.query.filter_by(
                 video_path=decoded_filename, user_id=current_user_id
             ).first()
 
@@ -168,10 +186,8 @@ def get_video_by_identifier(video_identifier):
                 404,
             )
 
-        # 파일 존재 확인
-        video_path = os.path.join(Config.VIDEOS_DIR, incident.video_path)
-
-        if not os.path.exists(video_path):
+        # 파일 존재 확인 (저장된 메타데이터 기준)
+        if incident.media_present is False:
             return (
                 jsonify(
                     {
@@ -183,22 +199,21 @@ def get_video_by_identifier(video_identifier):
                 404,
             )
 
-        stat = os.stat(video_path)
-
         video_data = {
             "id": incident.id,
             "title": f"SafeFall Video - {incident.video_path}",
             "filename": incident.video_path,
             "video_filename": incident.video_path,
             "name": incident.video_path,
-            "path": f"/api/incidents/{incident.id}/video",
-            "url": f"http://localhost:5000/api/incidents/{incident.id}/video",
+            "path": f"/api/incidents/{incident.id}/video{suffix}",
+            "url": f"http://localhost:5000/api/incidents/{incident.id}/video{suffix}",
             "thumbnail_url": (
-                f"/api/incidents/{incident.id}/thumbnail"
+                f"/api/incidents/{incident.id}/thumbnail{suffix}"
                 if incident.thumbnail_path
                 else None
             ),
-            "size": stat.st_size,
+            "size": incident.video_size,
+            "sha256": incident.video_sha256,
             "mtime": incident.detected_at.isoformat(),
             "created_at": incident.detected_at.isoformat(),
             "createdAt": incident.detected_at.isoformat(),
@@ -206,11 +221,7 @@ def get_video_by_identifier(video_identifier):
             "isChecked": incident.is_checked,
             "processed": incident.is_checked,
             "trigger_type": incident.incident_type,
-            "device_id": (
-                incident.extra_data.get("device_id", "unknown")
-                if incident.extra_data
-                else "unknown"
-            ),
+            "device_id": incident.device_id or "unknown",
         }
 
         return jsonify({"success": True, "video": video_data}), 200
@@ -220,6 +231,47 @@ def get_video_by_identifier(video_identifier):
         return jsonify({"success": False, "error": str(e), "video": None}), 500
 
 
+@videos_bp.route("/status", methods=["PUT"])
+@jwt_required()
+def update_videos_status():
+    """
+    여러 비디오 확인 상태 일괄 업데이트 (UPDATE 한 번)
+
+    Body:
+        - ids: [int] 및/또는 filter: {type, from, to, device_id, is_checked}
+        - isChecked: boolean
+    """
+    # current_user_id = get_jwt_identity()
+    current_user_id = "1"
+    data = request.get_json(silent=True) or {}
+    is_checked = data.get("isChecked", False)
+    if not isinstance(is_checked, bool):
+        return jsonify({"success": False, "error": "isChecked must be a boolean"}), 400
+
+    try:
+        criteria = build_criteria(current_user_id, data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    try:
+        ids = set_checked(current_user_id, criteria, is_checked)
+    except Exception as e:
+        print(f"❌ Update videos status error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return (
+        jsonify(
+            {
+                "success": True,
+                "message": f"{len(ids)} videos status updated",
+                "updated": len(ids),
+                "ids": ids,
+            }
+        ),
+        200,
+    )
+
+
 @videos_bp.route("/<int:video_id>/status", methods=["PUT"])
 @jwt_required()
 def update_video_status(video_id):
@@ -275,7 +327,13 @@ def update_video_status(video_id):
 def sync_videos():
     """
     디스크의 비디오 파일들을 데이터베이스와 동기화
-    (파일시스템에는 있지만 DB에 없는 파일들을 등록)
+    (파일시스템에는 있지만 DB에 없는 파일 등록 + 사라진 파일 표시)
+
+    백그라운드 리컨사일러와 같은 증분 스캐너(utils/media.DirectoryScanner)를 즉시 실행한다.
+    디렉터리가 지난 스캔 이후 바뀌지 않았으면 목록을 읽지 않고 skipped=true를 반환한다.
+
+    Query Parameters:
+        full: 1이면 워터마크를 무시하고 DB 전체와 다시 비교
     """
     try:
         # current_user_id = get_jwt_identity()
@@ -287,94 +345,69 @@ def sync_videos():
                 404,
             )
 
-        print(f"🔍 동기화 시작: {Config.VIDEOS_DIR}")
-
-        # 파일시스템의 비디오 파일 목록
-        video_files = []
-        for filename in os.listdir(Config.VIDEOS_DIR):
-            if filename.lower().endswith((".mp4", ".avi")):
-                file_path = os.path.join(Config.VIDEOS_DIR, filename)
-                if os.path.exists(file_path):
-                    stat = os.stat(file_path)
-                    video_files.append(
-                        {
-                            "filename": filename,
-                            "path": file_path,
-                            "size": stat.st_size,
-                            "mtime": datetime.fromtimestamp(
-                                stat.st_mtime, tz=timezone.utc
-                            ),
-                        }
-                    )
-
-        print(f"📁 파일시스템 비디오: {len(video_files)}개")
-
-        # DB의 기존 파일 목록
-        db_incidents = Incident.query.filter_by(user_id=current_user_id).all()
-        db_filenames = set(incident.video_path for incident in db_incidents)
-
-        print(f"💾 DB 등록된 비디오: {len(db_filenames)}개")
-
-        # 누락된 파일 찾기
-        missing_videos = [v for v in video_files if v["filename"] not in db_filenames]
-
-        print(f"🚨 누락된 영상 {len(missing_videos)}개 발견")
-
-        # 누락된 영상 등록
-        registered = []
-        failed = []
-
-        for video in missing_videos:
-            try:
-                # 새 사고 기록 생성
-                incident = Incident(
-                    user_id=current_user_id,
-                    incident_type="fall",  # 기본 타입
-                    detected_at=video["mtime"],
-                    video_path=video["filename"],
-                    duration=30.0,  # 기본값
-                    confidence=0.90,
-                    extra_data={"device_id": "sync", "source": "filesystem_sync"},
-                )
-
-                db.session.add(incident)
-                db.session.commit()
-
-                registered.append(
-                    {
-                        "filename": video["filename"],
-                        "incident_id": incident.id,
-                        "timestamp": video["mtime"].isoformat(),
-                    }
-                )
+        full = request.args.get("full", "").lower() in ("1", "true", "yes")
+        print(f"🔍 동기화 시작: {Config.VIDEOS_DIR}{' (전체)' if full else ''}")
 
-                print(f"  ✅ {video['filename']} -> ID:{incident.id}")
+        result = directory_scanner.scan(
+            Config.VIDEOS_DIR,
+            current_user_id,
+            max_files=Config.MEDIA_SCAN_MAX_FILES,
+            grace_seconds=Config.MEDIA_SCAN_GRACE_SECONDS,
+            full=full,
+        )
 
-            except Exception as e:
-                failed.append({"filename": video["filename"], "error": str(e)})
-                print(f"  ❌ {video['filename']} 오류: {e}")
-                db.session.rollback()
+        if result["skipped"]:
+            print("✅ 디렉터리 변경 없음 - 스캔 생략")
+        else:
+            print(
+                f"📁 파일시스템 비디오: {result['total_videos']}개 (새 항목 {result['new_entries']}개)"
+            )
+            print(f"🚨 누락된 영상 {result['missing_found']}개 발견, 등록 {len(result['registered'])}개")
+            if result["media_missing"]:
+                print(f"🗑️ 파일이 사라진 사고 {result['media_missing']}건 표시")
 
+        registered = result["registered"]
+        failed = result["failed"]
         return (
             jsonify(
                 {
-                    "success": True,
-                    "total_videos": len(video_files),
-                    "db_videos_before": len(db_filenames),
-                    "missing_found": len(missing_videos),
+                    "success": not failed,
+                    "skipped": result["skipped"],
+                    "total_videos": result["total_videos"],
+                    "new_entries": result["new_entries"],
+                    "missing_found": result["missing_found"],
                     "registered": len(registered),
                     "failed": len(failed),
+                    "media_missing": result["media_missing"],
+                    "pending": result["pending"],
                     "registered_videos": registered,
                     "failed_videos": failed,
                     "message": f"{len(registered)}개 영상이 성공적으로 등록되었습니다",
                 }
             ),
-            200,
+            200 if not failed else 500,
         )
 
     except Exception as e:
+        db.session.rollback()
         print(f"❌ 영상 동기화 오류: {e}")
         import traceback
 
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@videos_bp.route("/sync", methods=["GET"])
+@jwt_required()
+def get_sync_status():
+    """백그라운드 리컨사일러/마지막 스캔 결과 조회"""
+    reconciler = media.media_reconciler
+    return jsonify(
+        {
+            "success": True,
+            "reconciler_running": bool(reconciler and reconciler.thread and reconciler.thread.is_alive()),
+            "interval": Config.MEDIA_RECONCILE_INTERVAL,
+            "last_scan": directory_scanner.last_result,
+            "last_reconcile": reconciler.last_result if reconciler else None,
+        }
+    ), 200
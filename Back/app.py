@@ -1,6 +1,8 @@
+import logging
 import os
 import sys
-from flask import Flask, jsonify, request
+import time
+from flask import Flask, jsonify, request, g, Response
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
@@ -11,6 +13,18 @@ if BASE_DIR not in sys.path:
 
 from config import config
 from models import db
+from utils.metrics import registry, HTTP_REQUEST_SECONDS
+from utils.log import setup_logging, get_logger
+from utils.profiling import init_profiling
+from utils.counters import ensure_incident_counters
+from utils.sync import ensure_change_tracking
+from utils.cache import init_response_cache
+from utils.media import ensure_media_columns, init_media_reconciler
+from utils.filters import ensure_device_column
+from utils.archive import ensure_incident_id_sequence, init_incident_archiver
+from utils.database import engine_options, install_sqlite_pragmas, describe as describe_engine
+
+request_log = get_logger("requests")
 
 
 def create_app(config_name="development"):
@@ -20,9 +34,13 @@ def create_app(config_name="development"):
     # 설정 로드
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
+    setup_logging(app.config)
 
-    # 확장 초기화
+    # 확장 초기화 (DB 엔진 옵션은 백엔드에 맞춰 생성, SQLite는 연결마다 PRAGMA 적용)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
 
     # CORS 설정: 스트리밍 엔드포인트를 위한 추가 설정
     cors_config = {
@@ -51,20 +69,72 @@ def create_app(config_name="development"):
     @app.before_request
     def log_streaming_requests():
         """
-        Log all incoming requests to streaming endpoints
-        This helps diagnose if frames are arriving from Raspberry Pi devices
+        Log incoming requests to streaming endpoints (DEBUG, sampled per route)
+        This helps diagnose if frames are arriving from Raspberry Pi devices.
+        Enable with LOG_LEVEL=DEBUG or LOG_DEBUG_LOGGERS=requests.
         """
-        if request.path.startswith("/api/stream"):
-            print(f"🌐 Incoming request: {request.method} {request.path}")
-            print(f"   Remote addr: {request.remote_addr}")
-            print(f"   Content-Type: {request.content_type}")
-            print(f"   Content-Length: {request.content_length}")
-            if request.args:
-                print(f"   Query params: {dict(request.args)}")
+        if request.path.startswith("/api/stream") and request_log.isEnabledFor(
+            logging.DEBUG
+        ):
+            request_log.debug(
+                "incoming request",
+                extra={
+                    "route": request.path,
+                    "method": request.method,
+                    "remote_addr": request.remote_addr,
+                    "content_type": request.content_type,
+                    "content_length": request.content_length,
+                    "query": dict(request.args) or None,
+                },
+            )
+
+    # 라우트별 지연 시간 메트릭
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # 경로 대신 URL 규칙을 라벨로 사용 (/api/incidents/<id> → 라벨 1개)
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=route,
+                status=response.status_code,
+            )
+        return response
+
+    # 요청 프로파일링 (PROFILING_ENABLED일 때만)
+    init_profiling(app)
+
+    # GET 응답 캐시 (대시보드/목록)
+    init_response_cache(app)
+
+    # 영상 파일 메타데이터 리컨사일러 (첫 요청 시 시작)
+    init_media_reconciler(app)
+
+    # 오래된 확인 완료 사고 보관 (첫 요청 시 시작)
+    init_incident_archiver(app)
 
     # 데이터베이스 초기화
     with app.app_context():
         db.create_all()
+        if ensure_incident_counters():
+            print("✅ 사고 통계 카운터 생성 완료 (기존 사고 집계)")
+        if ensure_media_columns():
+            print("✅ 영상 메타데이터 컬럼 추가 완료 (리컨사일러가 값을 채움)")
+        filled = ensure_device_column()
+        if filled:
+            print(f"✅ device_id 컬럼 채우기 완료: {filled}건 (extra_data에서 이전)")
+        backfilled = ensure_change_tracking()
+        if backfilled:
+            print(f"✅ 델타 동기화 변경 순번 부여 완료: {backfilled}건")
+        rebuilt = ensure_incident_id_sequence()
+        if rebuilt is not None:
+            print(f"✅ incidents 테이블 AUTOINCREMENT 변환 완료: {rebuilt}건 (보관된 id 재사용 방지)")
         print("✅ 데이터베이스 초기화 완료")
 
     # 블루프린트 등록
@@ -118,6 +188,20 @@ def create_app(config_name="development"):
             traceback.print_exc()
             return jsonify({"error": "Failed to retrieve frame"}), 500
 
+    # Prometheus 메트릭
+    @app.route("/metrics")
+    def metrics():
+        """
+        Prometheus text exposition format (version 0.0.4)
+
+        Route latency histograms, per-device ingest rates, buffer occupancy,
+        incident pipeline stage durations, ffmpeg failures and MJPEG viewers.
+        """
+        return Response(
+            registry.render(),
+            mimetype="text/plain; version=0.0.4; charset=utf-8",
+        )
+
     # 헬스체크
     @app.route("/health")
     def health():
@@ -278,6 +362,13 @@ def register_blueprints(app):
         sys.modules["api.videos"] = videos_module
         spec.loader.exec_module(videos_module)
 
+        # debug.py 로드
+        debug_path = os.path.join(BASE_DIR, "api", "debug.py")
+        spec = importlib.util.spec_from_file_location("api.debug", debug_path)
+        debug_module = importlib.util.module_from_spec(spec)
+        sys.modules["api.debug"] = debug_module
+        spec.loader.exec_module(debug_module)
+
         # 블루프린트 등록
         app.register_blueprint(auth_module.auth_bp, url_prefix="/api/auth")
         app.register_blueprint(streaming_module.streaming_bp, url_prefix="/api/stream")
@@ -291,6 +382,7 @@ def register_blueprints(app):
             dashboard_module.dashboard_bp, url_prefix="/api/dashboard"
         )
         app.register_blueprint(videos_module.videos_bp, url_prefix="/api/videos")
+        app.register_blueprint(debug_module.debug_bp, url_prefix="/api/debug")
 
         print("✅ API 블루프린트 등록 완료")
 
@@ -341,6 +433,8 @@ if __name__ == "__main__":
     print(f"📍 Environment: {os.getenv('FLASK_ENV', 'development')}")
     print(f"🌐 CORS Origins: {app.config['CORS_ORIGINS']}")
     print(f"💾 Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    with app.app_context():
+        print(f"⚙️ DB engine: {describe_engine(db.engine)}")
     print("=" * 50)
 
     app.run(host="0.0.0.0", port=5001, debug=app.config["DEBUG"], threaded=True)
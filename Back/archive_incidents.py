@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+SafeFall - Incident archive script
+============================================================
+오래된 확인 완료 사고를 incidents_archive로 옮긴다 (백그라운드 IncidentArchiver와 같은 작업).
+ARCHIVE_INTERVAL=0으로 스레드를 끄고 cron 등에서 실행할 때 사용.
+
+Usage:
+    python archive_incidents.py                    # ARCHIVE_AFTER_DAYS 기준 이동
+    python archive_incidents.py --days 30          # 30일보다 오래된 사고
+    python archive_incidents.py --dry-run          # 대상 건수만 출력
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app import create_app
+from config import Config
+from utils.archive import archive_incidents, count_archivable
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move old checked incidents to incidents_archive')
+    parser.add_argument('--days', type=int, default=Config.ARCHIVE_AFTER_DAYS, help='기준 일수')
+    parser.add_argument('--batch-size', type=int, default=Config.ARCHIVE_BATCH_SIZE, help='트랜잭션당 행 수')
+    parser.add_argument('--pause', type=float, default=Config.ARCHIVE_BATCH_PAUSE, help='배치 사이 대기 (초)')
+    parser.add_argument('--dry-run', action='store_true', help='이동 없이 대상 건수만 출력')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if args.dry_run:
+            print(f"📦 보관 대상: {count_archivable(args.days)}건 ({args.days}일 이전, 확인 완료)")
+            return
+
+        result = archive_incidents(args.days, args.batch_size, args.pause)
+        print(f"✅ 보관 완료: {result['moved']}건 ({result['batches']}개 배치, "
+              f"기준 {result['cutoff'].isoformat()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SQLite read/write concurrency benchmark
+============================================================
+이전 엔진 설정(legacy: rollback journal, PRAGMA 없음)과 utils/database.py 설정(tuned: WAL 등)에서
+목록 조회 스레드와 프레임마다 커밋하는 쓰기 스레드를 동시에 돌려 처리량/지연/잠금 오류를 비교
+
+쓰기: stream_sessions.total_frames += 1 커밋 (프레임 업로드마다의 세션 갱신), 100번마다 사고 1건 INSERT
+읽기: /api/incidents/list 1페이지 쿼리 + COUNT
+
+Usage:
+    python benchmarks/bench_database.py [--seconds 5] [--readers 8] [--writers 2]
+                                        [--rows 20000] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from config import Config
+from models import db, Incident, StreamSession
+from utils.database import engine_options, install_sqlite_pragmas
+
+PROFILES = ('legacy', 'tuned')
+
+# 이 변경 전 Config.SQLALCHEMY_ENGINE_OPTIONS
+LEGACY_OPTIONS = {'pool_size': 10, 'pool_recycle': 3600, 'pool_pre_ping': True, 'max_overflow': 20}
+
+
+def make_engine(profile, path):
+    uri = f"sqlite:///{path}"
+    if profile == 'legacy':
+        return create_engine(uri, **LEGACY_OPTIONS)
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config['SQLALCHEMY_DATABASE_URI'] = uri
+    engine = create_engine(uri, **engine_options(config))
+    install_sqlite_pragmas(engine, config)
+    return engine
+
+
+def seed(engine, rows):
+    db.metadata.create_all(engine)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(StreamSession.__table__), [{'device_id': 'bench', 'total_frames': 0}])
+        for offset in range(0, rows, 10_000):
+            connection.execute(insert(Incident.__table__), [
+                {
+                    'user_id': '1', 'incident_type': 'fall' if i % 3 else 'collapse', 'device_id': f'pi-{i % 8:02d}',
+                    'detected_at': base + timedelta(seconds=i * 37), 'video_path': f'incident_{i}.mp4',
+                    'duration': 30.0, 'is_checked': i % 2 == 0, 'confidence': 0.9,
+                    'extra_data': {'device_id': f'pi-{i % 8:02d}'},
+                }
+                for i in range(offset, min(offset + 10_000, rows))
+            ])
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_profile(profile, seconds, readers, writers, rows):
+    work_dir = tempfile.mkdtemp(prefix='safefall-dbbench-')
+    engine = make_engine(profile, os.path.join(work_dir, 'bench.db'))
+    seed(engine, rows)
+
+    incidents = Incident.__table__
+    sessions = StreamSession.__table__
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {'read': [], 'write': [], 'read_errors': 0, 'write_errors': 0}
+
+    def record(kind, elapsed=None, error=False):
+        with lock:
+            if error:
+                stats[f'{kind}_errors'] += 1
+            else:
+                stats[kind].append(elapsed)
+
+    def reader():
+        query = (
+            select(incidents.c.id, incidents.c.incident_type, incidents.c.detected_at, incidents.c.is_checked)
+            .where(incidents.c.user_id == '1')
+            .order_by(incidents.c.detected_at.desc())
+            .limit(10)
+        )
+        count = select(func.count()).select_from(incidents).where(incidents.c.user_id == '1')
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query).all()
+                    connection.execute(count).scalar()
+                record('read', time.perf_counter() - started)
+            except OperationalError:
+                record('read', error=True)
+
+    def writer(index):
+        frame = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        update(sessions).where(sessions.c.id == 1).values(total_frames=sessions.c.total_frames + 1)
+                    )
+                    if frame % 100 == 0:
+                        connection.execute(insert(incidents).values(
+                            user_id='1', incident_type='fall', detected_at=datetime.now(timezone.utc),
+                            video_path=f'bench_{index}_{frame}.mp4', duration=30.0, confidence=0.9,
+                        ))
+                record('write', time.perf_counter() - started)
+            except OperationalError:
+                record('write', error=True)
+            frame += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    result = {'profile': profile, 'journal_mode': journal_mode, 'seconds': seconds,
+              'readers': readers, 'writers': writers, 'rows': rows}
+    for kind in ('read', 'write'):
+        latencies = stats[kind]
+        result[kind] = {
+            'ops_per_sec': round(len(latencies) / seconds, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1e3, 3) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95) * 1e3, 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99) * 1e3, 3) if latencies else None,
+            'errors': stats[f'{kind}_errors'],
+        }
+    return result
+
+
+def run(seconds=5, readers=8, writers=2, rows=20_000, profiles=PROFILES):
+    return [run_profile(profile, seconds, readers, writers, rows) for profile in profiles]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite engine profile concurrency benchmark')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    results = run(args.seconds, args.readers, args.writers, args.rows)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{'='*88}")
+    print(f"📊 SQLite concurrency: {args.readers} readers + {args.writers} per-frame writers, "
+          f"{args.rows} rows, {args.seconds}s")
+    print(f"{'='*88}")
+    for entry in results:
+        print(f"  {entry['profile']:7s} (journal_mode={entry['journal_mode']})")
+        for kind in ('read', 'write'):
+            stats = entry[kind]
+            print(f"    {kind:5s} {stats['ops_per_sec']:>9.1f} ops/s   p50 {stats['p50_ms'] or 0:>8.3f} ms   "
+                  f"p95 {stats['p95_ms'] or 0:>8.3f} ms   p99 {stats['p99_ms'] or 0:>8.3f} ms   "
+                  f"locked errors {stats['errors']}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
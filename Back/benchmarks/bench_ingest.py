@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Frame ingest micro-benchmark
+============================================================
+multipart(/upload) vs raw(/upload/raw) vs batch(/upload/batch) 경로의
+프레임당 CPU 시간을 Flask test client로 측정
+
+Usage:
+    python benchmarks/bench_ingest.py [--frames 600] [--frame-size 100000]
+                                      [--batch-size 10] [--json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# 벤치마크 전용 임시 DB (config import 전에 설정해야 함)
+_tmp_dir = tempfile.mkdtemp(prefix='safefall-bench-')
+os.environ.setdefault('DATABASE_URI', f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}")
+
+BATCH_FRAME_HEADER = struct.Struct('>IdI')
+
+
+def synthetic_frame(size):
+    """JPEG SOI/EOI 마커로 감싼 합성 프레임 (ingest 경로는 디코드하지 않음)"""
+    return b'\xff\xd8' + os.urandom(max(size - 4, 0)) + b'\xff\xd9'
+
+
+def _measure(fn, count):
+    """fn을 count번 실행하고 (cpu_seconds, wall_seconds) 반환"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(count):
+            fn()
+        return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def run(frames, frame_size, batch_size):
+    from app import create_app
+
+    app = create_app('development')
+    client = app.test_client()
+    frame = synthetic_frame(frame_size)
+
+    def multipart():
+        from io import BytesIO
+        response = client.post(
+            '/api/stream/upload',
+            data={'frame': (BytesIO(frame), 'frame.jpg'), 'device_id': 'bench'},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code == 200, response.status_code
+
+    def raw():
+        response = client.post(
+            '/api/stream/upload/raw',
+            data=frame,
+            headers={
+                'Content-Type': 'image/jpeg',
+                'X-Device-Id': 'bench',
+                'X-Capture-Timestamp': f"{time.time():.6f}"
+            }
+        )
+        assert response.status_code == 200, response.status_code
+
+    def batch():
+        now = time.time()
+        body = b''.join(
+            BATCH_FRAME_HEADER.pack(seq, now, len(frame)) + frame
+            for seq in range(batch_size)
+        )
+        response = client.post(
+            '/api/stream/upload/batch',
+            data=body,
+            headers={'Content-Type': 'application/octet-stream', 'X-Device-Id': 'bench'}
+        )
+        assert response.status_code == 200, response.status_code
+
+    results = []
+    for name, fn, requests_count, frames_per_request in (
+        ('multipart', multipart, frames, 1),
+        ('raw', raw, frames, 1),
+        ('batch', batch, max(frames // batch_size, 1), batch_size),
+    ):
+        # 워밍업 (세션 생성, 라우팅 캐시 등)
+        _measure(fn, 5)
+        cpu, wall = _measure(fn, requests_count)
+        total_frames = requests_count * frames_per_request
+        results.append({
+            'name': f'ingest.{name}',
+            'frames': total_frames,
+            'frame_size': frame_size,
+            'cpu_us_per_frame': round(cpu / total_frames * 1e6, 1),
+            'wall_us_per_frame': round(wall / total_frames * 1e6, 1),
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SafeFall frame ingest micro-benchmark')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--frame-size', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='JSON 결과 출력')
+    args = parser.parse_args()
+
+    results = run(args.frames, args.frame_size, args.batch_size)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{'='*60}")
+    print(f"📊 Frame ingest ({args.frames} frames, {args.frame_size:,} bytes/frame)")
+    print(f"{'='*60}")
+    baseline = results[0]['cpu_us_per_frame']
+    for result in results:
+        speedup = baseline / result['cpu_us_per_frame'] if result['cpu_us_per_frame'] else 0
+        print(f"  {result['name']:20s} cpu {result['cpu_us_per_frame']:>9.1f} µs/frame"
+              f"   wall {result['wall_us_per_frame']:>9.1f} µs/frame   x{speedup:.1f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
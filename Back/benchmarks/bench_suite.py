@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+SafeFall backend benchmark suite
+============================================================
+서버 없이 합성 JPEG 프레임으로 핫 패스를 측정하고 기준값(baseline)과 비교
+
+그룹:
+    buffer     CircularVideoBuffer add / get_all_frames / get_frames_before (크기별)
+    encoder    frames_to_video (100 프레임당), create_thumbnail  - opencv 필요
+    ingest     /upload, /upload/raw, /upload/batch 프레임당 CPU (bench_ingest.py)
+    incidents  /api/incidents/list 응답 시간 (행 수별)
+    mjpeg      /api/stream/mjpeg N명 동시 시청 시 시청자당 fps
+    database   SQLite 읽기/쓰기 동시 실행 지연 (현재 엔진 설정, bench_database.py)
+
+Usage:
+    python benchmarks/bench_suite.py                      # 전체 실행 + 표 출력
+    python benchmarks/bench_suite.py --only buffer,ingest
+    python benchmarks/bench_suite.py --rows 10000,100000,1000000
+    python benchmarks/bench_suite.py --save-baseline      # benchmarks/baseline.json 저장
+    python benchmarks/bench_suite.py --compare            # 기준값 대비 회귀 시 exit 1
+    python benchmarks/bench_suite.py --json --output results.json
+
+기준값은 측정한 머신에 종속되므로 같은 머신/설정에서 저장한 파일과 비교해야 한다.
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# bench_ingest가 임시 DATABASE_URI를 설정하므로 app/config보다 먼저 import
+from bench_ingest import synthetic_frame, run as run_ingest_benchmark
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+GROUPS = ('buffer', 'encoder', 'ingest', 'incidents', 'mjpeg', 'database')
+
+
+def result(name, metric, value, unit, **params):
+    """결과 한 건 (모든 metric은 낮을수록 좋음)"""
+    return {'name': name, 'metric': metric, 'value': round(value, 3), 'unit': unit, 'params': params}
+
+
+def skipped(name, reason):
+    return {'name': name, 'metric': None, 'value': None, 'unit': None, 'skipped': reason}
+
+
+@contextlib.contextmanager
+def quiet():
+    """측정 중 print 출력 억제"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(fn, repeat):
+    """fn을 repeat번 실행한 (cpu_seconds, wall_seconds)"""
+    with quiet():
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def encoded_jpeg(width=640, height=480, quality=85):
+    """실제 디코드 가능한 합성 JPEG (opencv 필요)"""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    image = np.repeat(np.tile(gradient, (height, 1))[:, :, None], 3, axis=2)
+    noise = rng.integers(0, 32, size=image.shape, dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', image + noise, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
+# ---------------------------------------------------------------- buffer
+
+def bench_buffer(sizes, frame_size):
+    from utils.buffer import CircularVideoBuffer
+
+    frame = synthetic_frame(frame_size)
+    results = []
+    for max_frames in sizes:
+        with quiet():
+            buffer = CircularVideoBuffer(duration=max_frames // 30, fps=30)
+
+        adds = max(max_frames * 2, 20_000)  # 버퍼가 가득 찬 상태(evict 포함)까지 측정
+        _, wall = timed(lambda: buffer.add_frame(frame), adds)
+        results.append(result(f'buffer.add[{max_frames}]', 'wall_ns_per_frame', wall / adds * 1e9, 'ns',
+                              max_frames=max_frames))
+
+        repeat = 200
+        _, wall = timed(buffer.get_all_frames, repeat)
+        results.append(result(f'buffer.get_all_frames[{max_frames}]', 'wall_us_per_call', wall / repeat * 1e6, 'us',
+                              max_frames=max_frames))
+
+        incident_time = datetime.now(timezone.utc)
+        _, wall = timed(lambda: buffer.get_frames_before(incident_time, duration=15), repeat)
+        results.append(result(f'buffer.get_frames_before[{max_frames}]', 'wall_us_per_call',
+                              wall / repeat * 1e6, 'us', max_frames=max_frames))
+    return results
+
+
+# ---------------------------------------------------------------- encoder
+
+def bench_encoder(work_dir):
+    if importlib.util.find_spec('cv2') is None:
+        return [skipped('encoder.frames_to_video', 'opencv-python not installed'),
+                skipped('encoder.create_thumbnail', 'opencv-python not installed')]
+
+    from utils.video import frames_to_video, create_thumbnail
+
+    jpeg = encoded_jpeg()
+    start = datetime.now(timezone.utc)
+    frames = [{'data': jpeg, 'timestamp': start + timedelta(seconds=i / 30)} for i in range(100)]
+    video_path = os.path.join(work_dir, 'bench.mp4')
+    thumbnail_path = os.path.join(work_dir, 'bench.jpg')
+
+    with quiet():
+        ok = frames_to_video(frames, video_path)
+    if not ok:
+        return [skipped('encoder.frames_to_video', 'frames_to_video failed (ffmpeg/codec missing?)')]
+
+    results = []
+    repeat = 3
+    cpu, wall = timed(lambda: frames_to_video(frames, video_path), repeat)
+    results.append(result('encoder.frames_to_video', 'wall_s_per_100_frames', wall / repeat, 's',
+                          frames=100, jpeg_bytes=len(jpeg)))
+    results.append(result('encoder.frames_to_video', 'cpu_s_per_100_frames', cpu / repeat, 's',
+                          frames=100, jpeg_bytes=len(jpeg)))
+
+    repeat = 10
+    _, wall = timed(lambda: create_thumbnail(video_path, thumbnail_path), repeat)
+    results.append(result('encoder.create_thumbnail', 'wall_ms_per_call', wall / repeat * 1e3, 'ms'))
+    return results
+
+
+# ---------------------------------------------------------------- ingest
+
+def bench_ingest(frames, frame_size):
+    with quiet():
+        ingest_results = run_ingest_benchmark(frames, frame_size, batch_size=10)
+    return [
+        result(entry['name'], 'cpu_us_per_frame', entry['cpu_us_per_frame'], 'us',
+               frames=entry['frames'], frame_size=frame_size)
+        for entry in ingest_results
+    ]
+
+
+# ---------------------------------------------------------------- incidents
+
+def _seed_incidents(app, target, existing):
+    """incidents 테이블을 target 행까지 채움 (bulk insert)"""
+    from models import db, Incident, User
+
+    with app.app_context():
+        if db.session.get(User, '1') is None:
+            user = User(id='1', username='bench', email='bench@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        chunk = 10_000
+        for offset in range(existing, target, chunk):
+            rows = [
+                {
+                    'user_id': '1',
+                    'incident_type': 'fall' if i % 3 else 'collapse',
+                    'device_id': f'pi-{i % 8:02d}',
+                    'detected_at': base + timedelta(seconds=i * 37),
+                    'video_path': f'incident_fall_{i}.mp4',
+                    'thumbnail_path': f'thumb_{i}.jpg',
+                    'duration': 30.0,
+                    'is_checked': i % 2 == 0,
+                    'confidence': 0.9,
+                    'extra_data': {'device_id': f'pi-{i % 8:02d}', 'frame_count': 900},
+                }
+                for i in range(offset, min(offset + chunk, target))
+            ]
+            db.session.execute(db.insert(Incident), rows)
+            db.session.commit()
+
+
+def bench_incidents(app, row_counts):
+    client = app.test_client()
+    results = []
+    existing = 0
+    for rows in sorted(row_counts):
+        with quiet():
+            _seed_incidents(app, rows, existing)
+        existing = rows
+
+        for label, query in (
+            ('page1', '/api/incidents/list?page=1&per_page=10'),
+            ('deep', f'/api/incidents/list?page={max(rows // 20, 1)}&per_page=10'),
+            ('filtered', '/api/incidents/list?page=1&per_page=10&type=fall&is_checked=false'),
+            ('device', '/api/incidents/list?page=1&per_page=10&device_id=pi-03&min_confidence=0.8'
+                       '&from=2025-01-01T00:00:00Z&to=2025-01-08T00:00:00Z'),
+        ):
+            def request_list():
+                response = client.get(query)
+                assert response.status_code == 200, response.status_code
+
+            request_list()  # 워밍업
+            repeat = 20
+            _, wall = timed(request_list, repeat)
+            results.append(result(f'incidents.list.{label}[{rows}]', 'wall_ms_per_request',
+                                  wall / repeat * 1e3, 'ms', rows=rows))
+    return results
+
+
+# ---------------------------------------------------------------- mjpeg
+
+def bench_mjpeg(app, viewer_counts, frames_per_viewer, frame_size):
+    client = app.test_client()
+    response = client.post(
+        '/api/stream/upload/raw',
+        data=synthetic_frame(frame_size),
+        headers={'Content-Type': 'image/jpeg', 'X-Device-Id': 'bench'}
+    )
+    assert response.status_code == 200, response.status_code
+
+    results = []
+    for viewers in viewer_counts:
+        elapsed = []
+        errors = []
+
+        def watch():
+            try:
+                stream = app.test_client().get('/api/stream/mjpeg', buffered=False)
+                started = time.perf_counter()
+                received = 0
+                for _chunk in stream.response:
+                    received += 1
+                    if received >= frames_per_viewer:
+                        break
+                elapsed.append(time.perf_counter() - started)
+                stream.close()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=watch) for _ in range(viewers)]
+        cpu_start = time.process_time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cpu = time.process_time() - cpu_start
+
+        if errors:
+            raise errors[0]
+
+        fps = [frames_per_viewer / seconds for seconds in elapsed]
+        # 목표 30fps 대비 부족분을 "낮을수록 좋음" 지표로 기록
+        results.append(result(f'mjpeg.fanout[{viewers}]', 'fps_deficit_per_viewer', max(30 - min(fps), 0), 'fps',
+                              viewers=viewers, min_fps=round(min(fps), 2), mean_fps=round(sum(fps) / len(fps), 2)))
+        results.append(result(f'mjpeg.fanout[{viewers}]', 'cpu_ms_per_frame',
+                              cpu / (viewers * frames_per_viewer) * 1e3, 'ms', viewers=viewers))
+    return results
+
+
+# ---------------------------------------------------------------- database
+
+def bench_database(seconds, readers, writers):
+    from bench_database import run as run_database_benchmark
+
+    results = []
+    for entry in run_database_benchmark(seconds, readers, writers, rows=20_000, profiles=('tuned',)):
+        params = {'readers': readers, 'writers': writers, 'journal_mode': entry['journal_mode']}
+        for kind in ('read', 'write'):
+            stats = entry[kind]
+            results.append(result(f'database.{kind}[{readers}r+{writers}w]', 'p95_ms', stats['p95_ms'] or 0, 'ms',
+                                  ops_per_sec=stats['ops_per_sec'], errors=stats['errors'], **params))
+    return results
+
+
+# ---------------------------------------------------------------- baseline
+
+def compare(results, baseline, tolerance):
+    """기준값 대비 tolerance 이상 느려진 항목 목록"""
+    reference = {(entry['name'], entry['metric']): entry['value'] for entry in baseline.get('results', [])}
+    regressions = []
+    for entry in results:
+        base = reference.get((entry['name'], entry['metric']))
+        if entry.get('value') is None or not base:
+            entry['baseline'] = base
+            continue
+        ratio = entry['value'] / base
+        entry['baseline'] = base
+        entry['ratio'] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(entry)
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'='*96}")
+    print("📊 SafeFall benchmark suite")
+    print(f"{'='*96}")
+    for entry in results:
+        if entry.get('skipped'):
+            print(f"  {entry['name']:42s} ⏭️  skipped: {entry['skipped']}")
+            continue
+        line = f"  {entry['name']:42s} {entry['metric']:26s} {entry['value']:>12.3f} {entry['unit']:<3s}"
+        if entry.get('ratio') is not None:
+            marker = '🔺' if entry['ratio'] > 1 else '  '
+            line += f"   {marker} x{entry['ratio']:.2f} vs baseline"
+        print(line)
+    print()
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SafeFall backend benchmark suite')
+    parser.add_argument('--only', default=','.join(GROUPS), help=f'실행할 그룹 ({",".join(GROUPS)})')
+    parser.add_argument('--buffer-sizes', type=parse_int_list, default=[150, 900, 4500])
+    parser.add_argument('--rows', type=parse_int_list, default=[10_000, 100_000],
+                        help='incidents 행 수 (1M 측정: --rows 10000,100000,1000000)')
+    parser.add_argument('--viewers', type=parse_int_list, default=[1, 10, 50])
+    parser.add_argument('--mjpeg-frames', type=int, default=30, help='시청자당 수신 프레임 수')
+    parser.add_argument('--ingest-frames', type=int, default=300)
+    parser.add_argument('--frame-size', type=int, default=100_000)
+    parser.add_argument('--db-seconds', type=float, default=3, help='database 그룹 측정 시간')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='결과를 기준값 파일로 저장')
+    parser.add_argument('--compare', action='store_true', help='기준값과 비교, 회귀 시 exit 1')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용 회귀 비율 (기본 25%%)')
+    parser.add_argument('--json', action='store_true', help='JSON 결과 출력')
+    parser.add_argument('--output', type=Path, help='JSON 결과 파일')
+    args = parser.parse_args()
+
+    groups = [group.strip() for group in args.only.split(',') if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown group(s): {", ".join(sorted(unknown))}')
+
+    from app import create_app
+
+    with quiet():
+        app = create_app('development')
+    work_dir = tempfile.mkdtemp(prefix='safefall-bench-')
+
+    results = []
+    if 'buffer' in groups:
+        results += bench_buffer(args.buffer_sizes, args.frame_size)
+    if 'encoder' in groups:
+        results += bench_encoder(work_dir)
+    if 'ingest' in groups:
+        results += bench_ingest(args.ingest_frames, args.frame_size)
+    if 'incidents' in groups:
+        results += bench_incidents(app, args.rows)
+    if 'mjpeg' in groups:
+        results += bench_mjpeg(app, args.viewers, args.mjpeg_frames, args.frame_size)
+    if 'database' in groups:
+        results += bench_database(args.db_seconds, readers=8, writers=2)
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.compare:
+        if not args.baseline.exists():
+            parser.error(f'baseline not found: {args.baseline} (run with --save-baseline first)')
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        report['regressions'] = [entry['name'] for entry in regressions]
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results)
+        if args.save_baseline:
+            print(f"💾 Baseline saved: {args.baseline}")
+        if args.compare:
+            if regressions:
+                print(f"❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+                for entry in regressions:
+                    print(f"   - {entry['name']} {entry['metric']}: {entry['baseline']} → {entry['value']} {entry['unit']}")
+            else:
+                print(f"✅ No regressions over {args.tolerance:.0%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
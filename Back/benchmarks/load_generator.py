@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Multi-device load generator
+============================================================
+실행 중인 백엔드에 N대의 가상 카메라 + M명의 시청자 부하를 걸고
+코어당 카메라 수용량을 추정한다.
+
+- 카메라: 녹화 영상(--clip) 또는 합성 프레임을 --fps로 업로드 (raw / multipart / batch)
+- 사고: --incident-rate(분당) 간격으로 /api/incidents/report 호출 후
+  /api/incidents/<id>/video가 응답할 때까지의 clip-ready 지연 측정
+- 시청자: /api/stream/mjpeg 스트림 또는 /api/stream/frame/latest 폴링
+- 서버: /metrics의 process_resident_memory_bytes, process_cpu_seconds_total 수집
+
+--clip은 영상 파일(cv2 필요), MJPEG 파일(.mjpeg/.mjpg), JPEG 이미지 디렉토리를 지원한다.
+
+Usage:
+    python benchmarks/load_generator.py --url http://localhost:5000 \\
+        --cameras 8 --fps 15 --frame-size 60000 --duration 60 \\
+        --incident-rate 2 --viewers 4 --viewer-mode mjpeg [--json]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_ingest import BATCH_FRAME_HEADER, synthetic_frame  # noqa: E402
+
+UPLOAD_MODES = ('raw', 'multipart', 'batch')
+VIEWER_MODES = ('mjpeg', 'poll', 'mixed')
+MJPEG_BOUNDARY = b'--frame\r\n'
+
+
+def percentile(values, pct):
+    """정렬 후 최근접 순위 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(seconds):
+    """지연 목록(초) → ms 단위 요약"""
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
+
+    return {
+        'count': len(seconds),
+        'p50_ms': ms(percentile(seconds, 50)),
+        'p95_ms': ms(percentile(seconds, 95)),
+        'p99_ms': ms(percentile(seconds, 99)),
+        'max_ms': ms(max(seconds) if seconds else None),
+    }
+
+
+# ============================================================
+# 프레임 소스
+# ============================================================
+
+def _split_mjpeg(data):
+    """연결된 JPEG 스트림을 SOI/EOI 마커로 분리"""
+    frames = []
+    start = data.find(b'\xff\xd8')
+    while start != -1:
+        end = data.find(b'\xff\xd9', start + 2)
+        if end == -1:
+            break
+        frames.append(data[start:end + 2])
+        start = data.find(b'\xff\xd8', end + 2)
+    return frames
+
+
+def _decode_clip(path, max_frames, width, quality):
+    """영상 파일을 JPEG 프레임 목록으로 변환 (cv2 필요)"""
+    try:
+        import cv2
+    except ImportError:
+        raise SystemExit('❌ Decoding a video clip requires opencv-python (or pass an MJPEG file / image directory)')
+
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ok, image = capture.read()
+            if not ok:
+                break
+            if width and image.shape[1] != width:
+                height = int(image.shape[0] * width / image.shape[1])
+                image = cv2.resize(image, (width, height))
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok:
+                frames.append(buffer.tobytes())
+    finally:
+        capture.release()
+    return frames
+
+
+def load_frames(args):
+    """카메라가 순환 재생할 JPEG 프레임 목록"""
+    if not args.clip:
+        # 같은 바이트가 반복되지 않도록 몇 장을 만들어 순환
+        return [synthetic_frame(args.frame_size) for _ in range(8)]
+
+    path = Path(args.clip)
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in ('.jpg', '.jpeg'))
+        frames = [p.read_bytes() for p in files[:args.clip_frames]]
+    elif path.suffix.lower() in ('.mjpeg', '.mjpg'):
+        frames = _split_mjpeg(path.read_bytes())[:args.clip_frames]
+    else:
+        frames = _decode_clip(path, args.clip_frames, args.width, args.jpeg_quality)
+
+    if not frames:
+        raise SystemExit(f'❌ No frames could be read from {path}')
+    return frames
+
+
+# ============================================================
+# 결과 수집
+# ============================================================
+
+class Recorder:
+    """스레드 간 공유되는 측정값 (락 안에서는 append만 수행)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.upload_latency = []
+        self.uploads_ok = 0
+        self.uploads_failed = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_skipped = 0
+        self.errors = {}
+        self.incidents = []       # {'report_s', 'clip_ready_s', 'status'}
+        self.viewer_frames = {}   # viewer 이름 → 수신 프레임 수
+        self.server_samples = []  # (elapsed, rss_bytes, cpu_seconds)
+
+    def upload(self, latency, ok, frames, size, error=None):
+        with self.lock:
+            self.upload_latency.append(latency)
+            if ok:
+                self.uploads_ok += 1
+                self.frames_sent += frames
+                self.bytes_sent += size
+            else:
+                self.uploads_failed += 1
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def skipped(self, frames):
+        with self.lock:
+            self.frames_skipped += frames
+
+    def incident(self, entry):
+        with self.lock:
+            self.incidents.append(entry)
+
+    def viewer_frame(self, name, count=1):
+        with self.lock:
+            self.viewer_frames[name] = self.viewer_frames.get(name, 0) + count
+
+
+# ============================================================
+# 부하 스레드
+# ============================================================
+
+class VirtualCamera(threading.Thread):
+    """한 대의 카메라: fps 일정에 맞춰 프레임 업로드 (밀린 프레임은 건너뜀)"""
+
+    def __init__(self, index, args, frames, recorder, stop_event):
+        super().__init__(name=f'camera-{index}', daemon=True)
+        self.device_id = f'{args.device_prefix}-{index:03d}'
+        self.args = args
+        self.frames = frames
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.session = requests.Session()
+        self.seq = 0
+        self.cursor = random.randrange(len(frames))  # 카메라마다 다른 위치에서 시작
+
+    def _next_frame(self):
+        frame = self.frames[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.frames)
+        self.seq = (self.seq + 1) % 2**32
+        return self.seq, time.time(), frame
+
+    def _post(self, batch):
+        url = self.args.url
+        timeout = self.args.timeout
+        if self.args.upload_mode == 'batch':
+            body = b''.join(BATCH_FRAME_HEADER.pack(seq, ts, len(frame)) + frame for seq, ts, frame in batch)
+            return self.session.post(
+                f'{url}/api/stream/upload/batch', data=body, timeout=timeout,
+                headers={'Content-Type': 'application/octet-stream', 'X-Device-Id': self.device_id}
+            ), len(body)
+
+        seq, ts, frame = batch[0]
+        if self.args.upload_mode == 'multipart':
+            return self.session.post(
+                f'{url}/api/stream/upload', timeout=timeout,
+                files={'frame': ('frame.jpg', frame, 'image/jpeg')},
+                data={'device_id': self.device_id, 'capture_ts': f'{ts:.6f}', 'seq': str(seq)}
+            ), len(frame)
+
+        return self.session.post(
+            f'{url}/api/stream/upload/raw', data=frame, timeout=timeout,
+            headers={
+                'Content-Type': 'image/jpeg',
+                'X-Device-Id': self.device_id,
+                'X-Capture-Timestamp': f'{ts:.6f}',
+                'X-Sequence': str(seq),
+            }
+        ), len(frame)
+
+    def run(self):
+        per_request = self.args.batch_size if self.args.upload_mode == 'batch' else 1
+        interval = per_request / self.args.fps
+        # 카메라들이 동시에 몰리지 않도록 시작 시점 분산
+        next_due = time.perf_counter() + random.uniform(0, interval)
+
+        while not self.stop_event.is_set():
+            delay = next_due - time.perf_counter()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+
+            batch = [self._next_frame() for _ in range(per_request)]
+            started = time.perf_counter()
+            try:
+                response, size = self._post(batch)
+                ok = response.status_code == 200
+                error = None if ok else f'HTTP {response.status_code}'
+            except requests.RequestException as e:
+                ok, size, error = False, 0, type(e).__name__
+            self.recorder.upload(time.perf_counter() - started, ok, per_request, size, error)
+
+            next_due += interval
+            behind = time.perf_counter() - next_due
+            if behind > interval:
+                # 서버가 못 따라오면 실제 카메라처럼 프레임을 버림
+                missed = int(behind // interval)
+                self.recorder.skipped(missed * per_request)
+                next_due += missed * interval
+
+
+class IncidentReporter(threading.Thread):
+    """분당 rate건 사고 신고 - 신고마다 clip-ready 측정 스레드 생성"""
+
+    def __init__(self, args, cameras, recorder, stop_event):
+        super().__init__(name='incident-reporter', daemon=True)
+        self.args = args
+        self.cameras = cameras
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.pending = []
+
+    def _report(self, device_id):
+        session = requests.Session()
+        entry = {'device_id': device_id, 'report_s': None, 'clip_ready_s': None, 'status': None}
+        started = time.perf_counter()
+        try:
+            response = session.post(
+                f'{self.args.url}/api/incidents/report',
+                json={
+                    'device_id': device_id,
+                    'incident_type': 'fall',
+                    'detected_at': datetime.now(timezone.utc).isoformat(),
+                    'confidence': 0.9,
+                    'user_id': self.args.user_id,
+                },
+                timeout=self.args.clip_timeout,
+            )
+            entry['report_s'] = time.perf_counter() - started
+            entry['status'] = response.status_code
+            if response.status_code != 201:
+                return
+
+            incident_id = response.json()['incident']['id']
+            deadline = started + self.args.clip_timeout
+            while time.perf_counter() < deadline:
+                video = session.get(
+                    f'{self.args.url}/api/incidents/{incident_id}/video',
+                    headers={'Range': 'bytes=0-1023'}, timeout=self.args.timeout
+                )
+                if video.status_code in (200, 206) and video.content:
+                    entry['clip_ready_s'] = time.perf_counter() - started
+                    return
+                time.sleep(0.1)
+            entry['status'] = 'clip_timeout'
+        except (requests.RequestException, KeyError, ValueError) as e:
+            entry['status'] = type(e).__name__
+        finally:
+            self.recorder.incident(entry)
+
+    def run(self):
+        interval = 60.0 / self.args.incident_rate
+        index = 0
+        # 버퍼가 채워진 뒤부터 신고
+        if self.stop_event.wait(min(interval, self.args.warmup)):
+            return
+        while not self.stop_event.is_set():
+            camera = self.cameras[index % len(self.cameras)]
+            index += 1
+            thread = threading.Thread(target=self._report, args=(camera.device_id,), daemon=True)
+            thread.start()
+            self.pending.append(thread)
+            if self.stop_event.wait(interval):
+                break
+
+
+class Viewer(threading.Thread):
+    """MJPEG 스트림 시청 또는 최신 프레임 폴링"""
+
+    def __init__(self, index, mode, args, recorder, stop_event):
+        super().__init__(name=f'viewer-{mode}-{index}', daemon=True)
+        self.mode = mode
+        self.args = args
+        self.recorder = recorder
+        self.stop_event = stop_event
+
+    def _watch_mjpeg(self, session):
+        with session.get(f'{self.args.url}/api/stream/mjpeg', stream=True, timeout=self.args.timeout) as response:
+            tail = b''
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                if self.stop_event.is_set():
+                    break
+                data = tail + chunk
+                count = data.count(MJPEG_BOUNDARY)
+                if count:
+                    self.recorder.viewer_frame(self.name, count)
+                # 청크 경계에 걸친 boundary 처리 (boundary보다 1바이트 짧으므로 중복 집계 없음)
+                tail = data[-(len(MJPEG_BOUNDARY) - 1):]
+
+    def _poll(self, session):
+        interval = 1.0 / self.args.poll_fps
+        while not self.stop_event.is_set():
+            response = session.get(f'{self.args.url}/api/stream/frame/latest', timeout=self.args.timeout)
+            if response.status_code == 200:
+                self.recorder.viewer_frame(self.name)
+            self.stop_event.wait(interval)
+
+    def run(self):
+        session = requests.Session()
+        while not self.stop_event.is_set():
+            try:
+                if self.mode == 'mjpeg':
+                    self._watch_mjpeg(session)
+                else:
+                    self._poll(session)
+            except requests.RequestException:
+                self.stop_event.wait(1.0)
+
+
+class ServerSampler(threading.Thread):
+    """/metrics에서 서버 RSS / CPU 시간을 주기적으로 수집"""
+
+    def __init__(self, args, recorder, stop_event, started):
+        super().__init__(name='server-sampler', daemon=True)
+        self.args = args
+        self.recorder = recorder
+        self.stop_event = stop_event
+        self.started = started
+
+    def sample(self):
+        try:
+            response = requests.get(f'{self.args.url}/metrics', timeout=self.args.timeout)
+        except requests.RequestException:
+            return
+        values = {}
+        for line in response.text.splitlines():
+            name, _, value = line.partition(' ')
+            if name in ('process_resident_memory_bytes', 'process_cpu_seconds_total'):
+                values[name] = float(value)
+        with self.recorder.lock:
+            self.recorder.server_samples.append((
+                time.perf_counter() - self.started,
+                values.get('process_resident_memory_bytes'),
+                values.get('process_cpu_seconds_total'),
+            ))
+
+    def run(self):
+        self.sample()
+        while not self.stop_event.wait(self.args.sample_interval):
+            self.sample()
+        self.sample()
+
+
+# ============================================================
+# 실행 / 보고
+# ============================================================
+
+def _server_summary(samples):
+    if not samples:
+        return {'available': False}
+
+    rss = [rss for _, rss, _ in samples if rss is not None]
+    cpu = [(elapsed, value) for elapsed, _, value in samples if value is not None]
+    summary = {'available': True}
+    if rss:
+        summary.update({
+            'rss_start_mb': round(rss[0] / 2**20, 1),
+            'rss_end_mb': round(rss[-1] / 2**20, 1),
+            'rss_peak_mb': round(max(rss) / 2**20, 1),
+        })
+    if len(cpu) >= 2 and cpu[-1][0] > cpu[0][0]:
+        summary['cpu_cores_used'] = round((cpu[-1][1] - cpu[0][1]) / (cpu[-1][0] - cpu[0][0]), 3)
+    return summary
+
+
+def run(args):
+    frames = load_frames(args)
+    recorder = Recorder()
+    stop_event = threading.Event()
+
+    try:
+        requests.get(f'{args.url}/health', timeout=args.timeout).raise_for_status()
+    except requests.RequestException as e:
+        raise SystemExit(f'❌ Backend not reachable at {args.url}: {e}')
+
+    started = time.perf_counter()
+    sampler = ServerSampler(args, recorder, stop_event, started)
+    cameras = [VirtualCamera(i, args, frames, recorder, stop_event) for i in range(args.cameras)]
+
+    viewers = []
+    for i in range(args.viewers):
+        mode = args.viewer_mode
+        if mode == 'mixed':
+            mode = 'mjpeg' if i % 2 == 0 else 'poll'
+        viewers.append(Viewer(i, mode, args, recorder, stop_event))
+
+    reporter = IncidentReporter(args, cameras, recorder, stop_event) if args.incident_rate > 0 else None
+
+    threads = [sampler, *cameras, *viewers] + ([reporter] if reporter else [])
+    for thread in threads:
+        thread.start()
+
+    try:
+        stop_event.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    stop_event.set()
+    elapsed = time.perf_counter() - started
+
+    for thread in threads:
+        thread.join(timeout=args.timeout)
+    if reporter:
+        # 진행 중인 신고는 clip-ready까지 기다림
+        for thread in reporter.pending:
+            thread.join(timeout=args.clip_timeout)
+
+    return summarize(args, recorder, elapsed, frames)
+
+
+def summarize(args, recorder, elapsed, frames):
+    with recorder.lock:
+        uploads = recorder.uploads_ok + recorder.uploads_failed
+        incidents = list(recorder.incidents)
+        server = _server_summary(recorder.server_samples)
+        viewer_frames = dict(recorder.viewer_frames)
+        result = {
+            'config': {
+                'url': args.url,
+                'cameras': args.cameras,
+                'fps': args.fps,
+                'upload_mode': args.upload_mode,
+                'batch_size': args.batch_size if args.upload_mode == 'batch' else 1,
+                'frame_bytes_avg': round(sum(map(len, frames)) / len(frames)),
+                'source': args.clip or 'synthetic',
+                'viewers': args.viewers,
+                'viewer_mode': args.viewer_mode,
+                'incident_rate_per_min': args.incident_rate,
+                'duration_s': round(elapsed, 1),
+            },
+            'ingest': {
+                'requests': uploads,
+                'success_rate': round(recorder.uploads_ok / uploads, 4) if uploads else None,
+                'frames_sent': recorder.frames_sent,
+                'frames_skipped': recorder.frames_skipped,
+                'target_fps': args.cameras * args.fps,
+                'achieved_fps': round(recorder.frames_sent / elapsed, 1),
+                'mbit_per_s': round(recorder.bytes_sent * 8 / elapsed / 1e6, 2),
+                'errors': dict(recorder.errors),
+                'latency': latency_summary(recorder.upload_latency),
+            },
+        }
+
+    ready = [entry['clip_ready_s'] for entry in incidents if entry['clip_ready_s'] is not None]
+    result['incidents'] = {
+        'reported': len(incidents),
+        'clips_ready': len(ready),
+        'failures': [entry['status'] for entry in incidents if entry['clip_ready_s'] is None],
+        'report_latency': latency_summary([e['report_s'] for e in incidents if e['report_s'] is not None]),
+        'clip_ready_latency': latency_summary(ready),
+    }
+    result['viewers'] = {
+        'count': args.viewers,
+        'avg_fps': round(sum(viewer_frames.values()) / elapsed / args.viewers, 1) if args.viewers else None,
+        'min_fps': round(min(viewer_frames.values(), default=0) / elapsed, 1) if args.viewers else None,
+    }
+    result['server'] = server
+
+    cores = server.get('cpu_cores_used')
+    if cores:
+        # 서버가 포화되지 않은 상태에서만 의미 있음 (success_rate / frames_skipped 확인)
+        result['capacity'] = {
+            'frames_per_core_second': round(result['ingest']['achieved_fps'] / cores, 1),
+            'cameras_per_core': round(args.cameras / cores, 2),
+        }
+    return result
+
+
+def print_report(result):
+    config, ingest, incidents = result['config'], result['ingest'], result['incidents']
+    latency = ingest['latency']
+
+    print(f"\n{'='*60}")
+    print(f"📊 Load test: {config['cameras']} cameras × {config['fps']} fps ({config['upload_mode']}, "
+          f"{config['frame_bytes_avg']:,} bytes/frame), {config['viewers']} viewers, {config['duration_s']}s")
+    print(f"{'='*60}")
+    print(f"📤 Ingest: success {ingest['success_rate']}  "
+          f"{ingest['achieved_fps']}/{ingest['target_fps']} fps  {ingest['mbit_per_s']} Mbit/s  "
+          f"skipped {ingest['frames_skipped']}")
+    print(f"   upload latency p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms")
+    if ingest['errors']:
+        print(f"   ⚠️ errors: {ingest['errors']}")
+
+    clip = incidents['clip_ready_latency']
+    print(f"🚨 Incidents: {incidents['clips_ready']}/{incidents['reported']} clips ready  "
+          f"p50 {clip['p50_ms']} ms  p95 {clip['p95_ms']} ms  p99 {clip['p99_ms']} ms")
+    if incidents['failures']:
+        print(f"   ⚠️ failures: {incidents['failures']}")
+
+    if result['viewers']['count']:
+        print(f"👀 Viewers: avg {result['viewers']['avg_fps']} fps  min {result['viewers']['min_fps']} fps")
+
+    server = result['server']
+    if server.get('available'):
+        print(f"🖥️  Server: RSS {server.get('rss_start_mb')} → {server.get('rss_end_mb')} MB "
+              f"(peak {server.get('rss_peak_mb')})  CPU {server.get('cpu_cores_used')} cores")
+    else:
+        print("🖥️  Server: /metrics unavailable")
+
+    if 'capacity' in result:
+        capacity = result['capacity']
+        print(f"📈 Capacity: {capacity['cameras_per_core']} cameras/core "
+              f"({capacity['frames_per_core_second']} frames/core·s)")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SafeFall multi-device load generator')
+    parser.add_argument('--url', default=os.getenv('BACKEND_URL', 'http://localhost:5000'))
+    parser.add_argument('--cameras', type=int, default=4, help='가상 카메라 수')
+    parser.add_argument('--fps', type=float, default=15.0, help='카메라당 fps')
+    parser.add_argument('--frame-size', type=int, default=60_000, help='합성 프레임 크기 (bytes)')
+    parser.add_argument('--clip', help='영상 파일 / MJPEG 파일 / JPEG 디렉토리')
+    parser.add_argument('--clip-frames', type=int, default=300, help='clip에서 읽을 최대 프레임 수')
+    parser.add_argument('--width', type=int, default=640, help='clip 리사이즈 폭 (영상 파일만)')
+    parser.add_argument('--jpeg-quality', type=int, default=80, help='clip JPEG 품질 (영상 파일만)')
+    parser.add_argument('--upload-mode', choices=UPLOAD_MODES, default='raw')
+    parser.add_argument('--batch-size', type=int, default=5, help='batch 모드 요청당 프레임 수')
+    parser.add_argument('--incident-rate', type=float, default=1.0, help='분당 사고 신고 수 (0이면 끔)')
+    parser.add_argument('--viewers', type=int, default=2, help='시청자 수')
+    parser.add_argument('--viewer-mode', choices=VIEWER_MODES, default='mixed')
+    parser.add_argument('--poll-fps', type=float, default=5.0, help='폴링 시청자 요청 빈도')
+    parser.add_argument('--duration', type=float, default=60.0, help='측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=5.0, help='첫 사고 신고 전 대기 (초)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='HTTP 요청 타임아웃 (초)')
+    parser.add_argument('--clip-timeout', type=float, default=120.0, help='사고 신고~영상 준비 최대 대기 (초)')
+    parser.add_argument('--sample-interval', type=float, default=2.0, help='서버 메트릭 수집 주기 (초)')
+    parser.add_argument('--device-prefix', default='load-cam')
+    parser.add_argument('--user-id', default='1', help='사고를 기록할 사용자 ID')
+    parser.add_argument('--json', action='store_true', help='JSON 결과 출력')
+    parser.add_argument('--output', help='JSON 결과 저장 경로')
+    args = parser.parse_args()
+
+    if args.cameras < 1 or args.fps <= 0:
+        parser.error('--cameras must be >= 1 and --fps > 0')
+    args.url = args.url.rstrip('/')
+
+    result = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == '__main__':
+    main()
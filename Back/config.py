@@ -18,13 +18,27 @@ class Config:
         f'sqlite:///{os.path.join(INSTANCE_DIR, "safefall.db")}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    # Database connection pool configuration (performance optimization)
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,              # Maximum number of persistent connections
-        'pool_recycle': 3600,         # Recycle connections after 1 hour
-        'pool_pre_ping': True,        # Verify connections before using them
-        'max_overflow': 20,           # Maximum overflow connections beyond pool_size
-    }
+    # DB 엔진 옵션 - 백엔드별 기본값은 utils/database.engine_options()가 만들고,
+    # 여기에 적은 키가 우선한다 (예: {'pool_size': 5})
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    # SQLite 튜닝 (새 연결마다 PRAGMA 적용)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')  # WAL: 읽기와 쓰기가 서로 막지 않음
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # WAL에서는 앱 크래시에도 안전 (전원 장애 시 마지막 커밋 유실 가능)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))  # 쓰기 잠금 대기
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', '-64000'))  # 음수 = KiB (64MB)
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', '10'))
+    SQLITE_MAX_OVERFLOW = int(os.environ.get('SQLITE_MAX_OVERFLOW', '20'))
+
+    # PostgreSQL (서버형 DB) 연결 풀
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))  # 빈 연결 대기 (초)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '10'))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))  # 0이면 비활성화
+    DB_APPLICATION_NAME = os.environ.get('DB_APPLICATION_NAME', 'safefall')
 
     # JWT 설정
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
@@ -41,13 +55,93 @@ class Config:
     HLS_SEGMENT_DURATION = 2  # 초
     BUFFER_DURATION = 30  # 사고 전후 저장할 시간 (초) - 15초 → 30초
     INCIDENT_VIDEO_DURATION = 30  # 총 저장 영상 길이 (초)
+    # 사고 파이프라인 트레이스: 이 시간(ms)을 넘는 단계는 경고 로그 + safefall_incident_slow_stages_total
+    TRACE_SLOW_STAGE_MS = int(os.environ.get('TRACE_SLOW_STAGE_MS', '5000'))
+
+    # 동시 업로드 재정렬 (jitter buffer): 빠진 시퀀스를 기다리는 최대 시간/프레임 수
+    REORDER_WINDOW_MS = int(os.environ.get('REORDER_WINDOW_MS', '200'))
+    REORDER_MAX_FRAMES = int(os.environ.get('REORDER_MAX_FRAMES', '32'))
+
+    # Pull 방식 수집 소스 (ffmpeg로 RTSP/HTTP MJPEG/파일을 읽어 버퍼에 공급)
+    # 형식: "name=url,name2=url2" - name은 device_id로 사용
+    # 예: INGEST_SOURCES="cam-03=rtsp://10.0.0.3:554/stream1,replay=/data/sample.mp4"
+    INGEST_SOURCES = os.environ.get('INGEST_SOURCES', '')
+    INGEST_FFMPEG_PATH = os.environ.get('INGEST_FFMPEG_PATH', 'ffmpeg')
+    INGEST_FPS = int(os.environ.get('INGEST_FPS', '0')) or None  # 0 = 원본 프레임레이트
+    INGEST_JPEG_QUALITY = int(os.environ.get('INGEST_JPEG_QUALITY', '5'))  # ffmpeg -q:v (2~31)
+    INGEST_LOOP_FILES = os.environ.get('INGEST_LOOP_FILES', 'True') == 'True'
     
+    # 사고 통계 일 단위 버킷 시간대 (IANA 이름, 예: Asia/Seoul)
+    # incident_counters 날짜 행 기준 - 변경 후 rebuild_incident_counters.py 실행
+    STATS_TIMEZONE = os.environ.get('STATS_TIMEZONE', 'UTC')
+    # 대시보드 요약에서 STATS_TIMEZONE 요청은 incident_counters 일별 롤업 사용 (False면 항상 SQL 집계)
+    SUMMARY_USE_ROLLUP = os.environ.get('SUMMARY_USE_ROLLUP', 'True') == 'True'
+    SUMMARY_MAX_DAYS = int(os.environ.get('SUMMARY_MAX_DAYS', '366'))
+
+    # 사고 이벤트 스트림 (utils/events.py, /api/v1/notifications/stream, /events)
+    EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', '1000'))  # Last-Event-ID 재개용 보관 이벤트 수
+    SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))  # 프록시 유휴 타임아웃 방지용 주석 전송 간격
+    SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', '3000'))  # 브라우저 EventSource 재연결 대기
+    LONGPOLL_MAX_TIMEOUT = int(os.environ.get('LONGPOLL_MAX_TIMEOUT', '30'))
+
+    # 델타 동기화 (utils/sync.py, /api/incidents/changes)
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))  # 이보다 오래된 커서는 전체 재동기화
+    SYNC_PAGE_MAX = int(os.environ.get('SYNC_PAGE_MAX', '1000'))
+
+    # 목록 직렬화 행 단위 JSON 조각 캐시 항목 수 (utils/serialize.py)
+    SERIALIZE_CACHE_SIZE = int(os.environ.get('SERIALIZE_CACHE_SIZE', '5000'))
+
+    # GET 응답 캐시 (utils/cache.py) - 사고 변경 커밋 시 사용자 단위로 무효화, TTL은 상한
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')  # memory / sqlite (워커 간 공유)
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', os.path.join(INSTANCE_DIR, 'response_cache.sqlite'))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', '30'))  # 초
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '512'))
+    RESPONSE_CACHE_COALESCE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_COALESCE_TIMEOUT', '30'))  # 동시 요청 대기 상한 (초)
+
+    # 영상 파일 메타데이터 리컨사일러 (utils/media.py) - 0이면 비활성화
+    MEDIA_RECONCILE_INTERVAL = int(os.environ.get('MEDIA_RECONCILE_INTERVAL', '300'))  # 초
+    MEDIA_RECONCILE_BATCH = int(os.environ.get('MEDIA_RECONCILE_BATCH', '200'))
+    # 디렉터리 증분 스캔 (미등록 파일 등록) - 선택 사항: 등록할 사용자 ID를 지정해야 백그라운드 등록
+    # (기본값 비어 있음 - POST /api/videos/sync 수동 동기화는 그대로 동작)
+    MEDIA_SCAN_USER_ID = os.environ.get('MEDIA_SCAN_USER_ID', '')
+    MEDIA_SCAN_MAX_FILES = int(os.environ.get('MEDIA_SCAN_MAX_FILES', '500'))  # 스캔 1회 등록 상한
+    MEDIA_SCAN_GRACE_SECONDS = int(os.environ.get('MEDIA_SCAN_GRACE_SECONDS', '120'))  # 이보다 최근 파일은 다음 스캔에서
+
+    # 사고 벌크 작업 (/api/incidents/bulk/*) - ids 목록 최대 길이
+    BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS', '10000'))
+
+    # 사고 보관 (utils/archive.py) - 오래된 확인 완료 사고를 incidents_archive로 이동, 0이면 비활성화
+    ARCHIVE_INTERVAL = int(os.environ.get('ARCHIVE_INTERVAL', '3600'))  # 초
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '90'))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '200'))  # 트랜잭션당 행 수
+    ARCHIVE_BATCH_PAUSE = float(os.environ.get('ARCHIVE_BATCH_PAUSE', '0.1'))  # 배치 사이 대기 (초)
+
     # CORS 설정
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173,http://localhost:5174,http://safefall2.s3-website.ap-northeast-2.amazonaws.com').split(',')
     
     # 최대 업로드 크기
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB
 
+    # 로깅 (utils/log.py)
+    # 핫 패스 요청 로그는 DEBUG 레벨 - LOG_LEVEL=DEBUG 또는 LOG_DEBUG_LOGGERS로 필요할 때만 활성화
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # text / json
+    # 특정 로거만 DEBUG로: "api.streaming,api.incidents"
+    LOG_DEBUG_LOGGERS = os.environ.get('LOG_DEBUG_LOGGERS', '')
+    # 라우트 접두사별 샘플링 비율: "/api/stream/upload=0.01,/api/stream=0.1"
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '/api/stream=0.01')
+    LOG_RATE_LIMIT = int(os.environ.get('LOG_RATE_LIMIT', '20'))  # 메시지별 초당 최대 건수
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+
+    # 요청 프로파일링 (utils/profiling.py, /api/debug/*) - 기본 비활성화
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False') == 'True'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')  # X-Debug-Token 헤더 값
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(INSTANCE_DIR, 'profiles'))
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+    PROFILE_FORMAT = os.environ.get('PROFILE_FORMAT', 'speedscope')  # speedscope / pstats
+    PROFILE_SAMPLE_INTERVAL_MS = int(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+
     @staticmethod
     def init_app(app):
         """앱 초기화 시 실행"""
@@ -89,6 +183,10 @@ class ProductionConfig(Config):
                 "SECURITY ERROR: JWT_SECRET_KEY must be set via environment variable in production. "
                 "Never use the default development key in production!"
             )
+        if app.config.get('PROFILING_ENABLED') and not app.config.get('PROFILING_TOKEN'):
+            raise RuntimeError(
+                "SECURITY ERROR: PROFILING_TOKEN must be set when PROFILING_ENABLED=True in production."
+            )
     
 
 config = {
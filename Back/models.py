@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -56,25 +56,19 @@ class User(db.Model):
         }
 
 
-class Incident(db.Model):
-    """사고 기록 모델"""
-    __tablename__ = 'incidents'
+class IncidentColumns:
+    """
+    사고 기록 컬럼 (incidents와 incidents_archive 공용)
 
-    # PERFORMANCE: Added composite indices for common query patterns
-    __table_args__ = (
-        # Index for filtering by user and incident type (used in /list endpoint)
-        db.Index('idx_user_incident_type', 'user_id', 'incident_type'),
-        # Index for filtering by user and checked status (used in /list endpoint)
-        db.Index('idx_user_checked', 'user_id', 'is_checked'),
-        # Index for filtering by user and time (used in /stats endpoint for "today" count)
-        db.Index('idx_user_detected_at', 'user_id', 'detected_at'),
-    )
+    컬럼은 두 테이블에 같은 이름으로 있어야 한다 (utils/archive.py가 INSERT ... SELECT로 옮김).
+    """
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
 
     # 사고 정보
     incident_type = db.Column(db.String(50), nullable=False)  # fall, collapse, etc.
+    device_id = db.Column(db.String(100))  # 보고한 장치 (idx_user_device_detected)
     detected_at = db.Column(db.DateTime, nullable=False)  # Composite index exists: idx_user_detected_at
 
     # 영상 정보
@@ -86,6 +80,13 @@ class Incident(db.Model):
     video_blob = db.Column(db.LargeBinary)  # 영상 파일 바이너리
     thumbnail_blob = db.Column(db.LargeBinary)  # 썸네일 파일 바이너리
 
+    # 영상 파일 메타데이터 (클립 저장 시 기록, utils/media.py 리컨사일러가 갱신)
+    # 목록 API는 파일시스템 대신 이 값을 사용한다. media_present가 NULL이면 아직 확인 전
+    video_size = db.Column(db.BigInteger)
+    video_mtime = db.Column(db.Float)  # 마지막 확인 시 파일 mtime (변경 시에만 해시 재계산)
+    video_sha256 = db.Column(db.String(64))
+    media_present = db.Column(db.Boolean)
+
     # 상태
     is_checked = db.Column(db.Boolean, default=False)  # 확인 여부
     checked_at = db.Column(db.DateTime)
@@ -96,6 +97,9 @@ class Incident(db.Model):
 
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # 변경 순번 (추가/수정마다 utils/sync.py가 증가값 부여, 델타 동기화 커서)
+    change_seq = db.Column(db.BigInteger)
     
     def to_dict(self):
         """딕셔너리 변환"""
@@ -103,6 +107,7 @@ class Incident(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'incident_type': self.incident_type,
+            'device_id': self.device_id,
             'detected_at': self.detected_at.isoformat(),
             'video_path': self.video_path,
             'thumbnail_path': self.thumbnail_path,
@@ -122,6 +127,99 @@ class Incident(db.Model):
         }
 
 
+class Incident(IncidentColumns, db.Model):
+    """사고 기록 모델"""
+    __tablename__ = 'incidents'
+
+    # PERFORMANCE: Added composite indices for common query patterns
+    __table_args__ = (
+        # Index for filtering by user and incident type (used in /list endpoint)
+        db.Index('idx_user_incident_type', 'user_id', 'incident_type'),
+        # Index for filtering by user and checked status (used in /list endpoint)
+        db.Index('idx_user_checked', 'user_id', 'is_checked'),
+        # Index for filtering by user and time (used in /stats endpoint for "today" count)
+        db.Index('idx_user_detected_at', 'user_id', 'detected_at'),
+        # Index for delta sync (/changes endpoint: user_id = ? AND change_seq > ?)
+        db.Index('idx_user_change_seq', 'user_id', 'change_seq'),
+        # Index for filesystem scan (video_path IN (...) lookups in utils/media.py)
+        db.Index('idx_video_path', 'video_path'),
+        # Index for device filters (device + date range + confidence, ordered by detected_at)
+        db.Index('idx_user_device_detected', 'user_id', 'device_id', 'detected_at', 'confidence'),
+        # SQLite: 삭제/보관된 id를 다시 쓰지 않음 (incidents_archive와 id 충돌 방지)
+        {'sqlite_autoincrement': True},
+    )
+
+
+class ArchivedIncident(IncidentColumns, db.Model):
+    """
+    보관된 사고 기록 (utils/archive.py가 오래된 확인 완료 사고를 incidents에서 옮김)
+
+    목록/영상 API는 archived=1일 때만 이 테이블을 조회한다. id는 incidents에서의 값을 유지한다.
+    """
+    __tablename__ = 'incidents_archive'
+
+    # SQLite 인덱스 이름은 DB 전체에서 유일해야 함
+    __table_args__ = (
+        db.Index('idx_archive_user_detected_at', 'user_id', 'detected_at'),
+        db.Index('idx_archive_user_device_detected', 'user_id', 'device_id', 'detected_at', 'confidence'),
+        db.Index('idx_archive_video_path', 'video_path'),
+    )
+
+    archived_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class IncidentCounter(db.Model):
+    """
+    사고 통계 카운터 (사용자, 유형, 날짜별)
+
+    Incident 추가/확인/삭제와 같은 트랜잭션에서 utils/counters.py가 갱신한다.
+    day가 ALL_TIME인 행은 유형별 전체 누적값이며, 날짜는 detected_at의 Config.STATS_TIMEZONE 날짜.
+    통계 API는 이 테이블의 (ALL_TIME, 오늘) 행만 읽으므로 사고 수와 무관하게 일정한 비용.
+    날짜 행은 대시보드 요약의 일별 롤업으로도 쓰인다.
+    """
+    __tablename__ = 'incident_counters'
+
+    ALL_TIME = date.min
+
+    user_id = db.Column(db.String(50), primary_key=True)
+    incident_type = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+    checked = db.Column(db.Integer, nullable=False, default=0)
+
+
+class IncidentTombstone(db.Model):
+    """
+    삭제된 사고 기록 (델타 동기화용)
+
+    삭제도 변경 순번을 하나 받으며, 클라이언트는 since 이후 tombstone으로 캐시에서 제거한다.
+    SYNC_TOMBSTONE_RETENTION_DAYS가 지나면 정리되고, 그보다 오래된 커서는 전체 재동기화.
+    """
+    __tablename__ = 'incident_tombstones'
+    __table_args__ = (
+        db.Index('idx_tombstone_user_seq', 'user_id', 'change_seq'),
+    )
+
+    change_seq = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    incident_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.String(50), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class ChangeSequence(db.Model):
+    """
+    이름별 단조 증가 카운터 (utils/sync.py)
+
+    incidents: 마지막으로 부여한 변경 순번
+    incident_tombstones_pruned: 정리된 tombstone 중 가장 큰 순번 (이보다 오래된 커서는 재동기화)
+    """
+    __tablename__ = 'change_sequences'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+
 class StreamSession(db.Model):
     """스트리밍 세션 모델"""
     __tablename__ = 'stream_sessions'
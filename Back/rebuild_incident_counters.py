@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+SafeFall - Incident counter rebuild script
+============================================================
+incidents 테이블에서 incident_counters(통계 카운터)를 다시 계산한다.
+벌크 SQL로 사고를 추가/삭제했거나 카운터가 어긋났을 때 사용.
+
+Usage:
+    python rebuild_incident_counters.py           # 재계산
+    python rebuild_incident_counters.py --check   # 불일치만 확인 (종료 코드 1)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app import create_app
+from utils.counters import rebuild_incident_counters, verify_incident_counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild incident statistics counters')
+    parser.add_argument('--check', action='store_true', help='재계산 없이 불일치 항목만 출력')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        mismatches = verify_incident_counters()
+        for (user_id, incident_type, day), stored, expected in sorted(mismatches, key=str)[:20]:
+            print(f"  ⚠️ user={user_id} type={incident_type} day={day}: "
+                  f"stored total/checked={stored}, expected={expected}")
+        if len(mismatches) > 20:
+            print(f"  ... {len(mismatches) - 20} more")
+
+        if args.check:
+            print(f"{'✅ 카운터 일치' if not mismatches else f'❌ 불일치 {len(mismatches)}건'}")
+            sys.exit(1 if mismatches else 0)
+
+        rows = rebuild_incident_counters()
+        print(f"✅ 카운터 재계산 완료: {rows}행 (불일치 {len(mismatches)}건 수정)")
+
+
+if __name__ == '__main__':
+    main()
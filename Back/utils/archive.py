@@ -0,0 +1,231 @@
+"""
+사고 보관 (incidents → incidents_archive)
+
+ARCHIVE_AFTER_DAYS보다 오래되고 확인 완료된 사고를 배치 단위로 incidents_archive로 옮긴다.
+배치마다 INSERT ... SELECT + DELETE를 짧은 트랜잭션 하나로 커밋하고 잠시 쉬므로
+쓰기 잠금을 오래 잡지 않는다 (BLOB 컬럼도 DB 안에서 그대로 복사됨).
+
+- 목록/영상 API는 기본적으로 incidents(최근 데이터)만 조회하고, archived=1이면 보관 테이블을 조회한다.
+- 통계 카운터는 보관된 사고도 계속 센다 (이동은 카운터를 바꾸지 않음, 재계산 시 두 테이블 합산).
+- 델타 동기화에서는 보관된 사고가 tombstone으로 내려간다 (기본 목록에서 빠지므로).
+- 보관된 사고의 영상 파일은 그대로 두며, 디렉터리 스캐너도 보관 테이블의 파일을 등록된 것으로 본다.
+- 배치는 utils.media.maintenance_lock을 잡고 실행한다 (스캔/리컨사일과 같은 행을 동시에 건드리지 않도록).
+- id는 두 테이블에서 유일해야 하므로 SQLite incidents는 AUTOINCREMENT로 만든다
+  (ensure_incident_id_sequence()가 이전 DB를 변환).
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import exists, func, literal, select, text
+
+from config import Config
+from models import db, Incident, ArchivedIncident
+from utils.cache import invalidate_user
+from utils.log import get_logger
+from utils.media import maintenance_lock
+from utils.schema import rebuild_sqlite_table
+from utils.sync import add_tombstones
+
+log = get_logger('archive')
+
+_hot = Incident.__table__
+_archive = ArchivedIncident.__table__
+_COLUMNS = [column.name for column in _hot.columns]
+
+
+def parse_archived(value):
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+
+def incident_model(archived):
+    """archived 플래그에 맞는 모델 (Incident / ArchivedIncident)"""
+    return ArchivedIncident if archived else Incident
+
+
+def _candidates(connection, cutoff, after_id, limit):
+    """
+    보관 대상 (id, user_id) - id 순
+
+    보관 테이블에 같은 id가 이미 있는 행(AUTOINCREMENT 변환 전 SQLite가 id를 다시 쓴 경우)은
+    PK 충돌로 배치 전체가 실패하지 않도록 제외한다.
+    """
+    return connection.execute(
+        select(_hot.c.id, _hot.c.user_id)
+        .where(
+            _hot.c.id > after_id,
+            _hot.c.detected_at < cutoff,
+            _hot.c.is_checked.is_(True),
+            ~exists().where(_archive.c.id == _hot.c.id),
+        )
+        .order_by(_hot.c.id)
+        .limit(limit)
+    ).all()
+
+
+def ensure_incident_id_sequence():
+    """
+    incidents id가 다시 쓰이지 않도록 보정 (앱 시작 시, SQLite만)
+
+    AUTOINCREMENT 없는 SQLite는 max(id) + 1을 새 id로 쓰므로, 최신 행이 삭제되면 보관된 id가
+    다시 나와 두 테이블에 같은 id가 생기고 델타 동기화 tombstone에 새 행이 가려진다.
+    이전 DB는 테이블을 AUTOINCREMENT로 다시 만들고, 시퀀스를 보관 테이블 최대 id 이상으로 맞춘다.
+    (PostgreSQL 시퀀스는 값을 다시 쓰지 않으므로 할 일 없음)
+
+    Returns:
+        테이블을 다시 만들었으면 복사한 행 수, 아니면 None
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return None
+
+    definition = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': _hot.name}
+    ).scalar() or ''
+    copied = None
+    if 'AUTOINCREMENT' not in definition.upper():
+        copied = rebuild_sqlite_table(connection, _hot)
+
+    floor = connection.execute(select(func.max(_archive.c.id))).scalar() or 0
+    current = connection.execute(
+        text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {'name': _hot.name}
+    ).scalar()
+    if current is None:
+        connection.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {'name': _hot.name, 'seq': floor}
+        )
+    elif current < floor:
+        connection.execute(
+            text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name"), {'name': _hot.name, 'seq': floor}
+        )
+    db.session.commit()
+    return copied
+
+
+def count_archivable(older_than_days=None):
+    older_than_days = Config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    return db.session.query(func.count(Incident.id)).filter(
+        Incident.detected_at < cutoff, Incident.is_checked.is_(True)
+    ).scalar()
+
+
+def archive_incidents(older_than_days=None, batch_size=None, pause=None, max_batches=None, stop_event=None):
+    """
+    오래된 확인 완료 사고를 보관 테이블로 이동 (앱 컨텍스트 필요)
+
+    Args:
+        older_than_days: 기준 일수 (기본 Config.ARCHIVE_AFTER_DAYS)
+        batch_size: 트랜잭션당 행 수 (기본 Config.ARCHIVE_BATCH_SIZE)
+        pause: 배치 사이 대기 초 (다른 쓰기가 잠금을 얻을 틈)
+        max_batches: 한 번 실행에 처리할 최대 배치 수 (None이면 끝까지)
+        stop_event: 설정되면 현재 배치 후 중단
+
+    Returns:
+        {'moved', 'batches', 'cutoff'}
+    """
+    older_than_days = Config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+    pause = Config.ARCHIVE_BATCH_PAUSE if pause is None else pause
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    moved = batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        if stop_event is not None and stop_event.is_set():
+            break
+        with maintenance_lock:
+            try:
+                connection = db.session.connection()
+                rows = _candidates(connection, cutoff, last_id, batch_size)
+                if not rows:
+                    db.session.commit()
+                    break
+                ids = [row.id for row in rows]
+                now = datetime.now(timezone.utc)
+                connection.execute(
+                    _archive.insert().from_select(
+                        _COLUMNS + ['archived_at'],
+                        select(*[_hot.c[name] for name in _COLUMNS], literal(now, db.DateTime))
+                        .where(_hot.c.id.in_(ids)),
+                    )
+                )
+                connection.execute(_hot.delete().where(_hot.c.id.in_(ids)))
+                add_tombstones(connection, [(row.id, row.user_id) for row in rows])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        for user_id in {row.user_id for row in rows}:
+            invalidate_user(user_id)
+        moved += len(ids)
+        batches += 1
+        last_id = ids[-1]
+        if pause:
+            time.sleep(pause)
+
+    if moved:
+        log.info("incidents archived", extra={'rows': moved, 'batches': batches, 'cutoff': cutoff.isoformat()})
+    return {'moved': moved, 'batches': batches, 'cutoff': cutoff}
+
+
+class IncidentArchiver:
+    """주기적으로 archive_incidents()를 실행하는 데몬 스레드"""
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_result = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.thread = threading.Thread(target=self._run, name='IncidentArchiver', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                self.last_result = archive_incidents(stop_event=self.stop_event)
+            except Exception as e:
+                log.warning("incident archive failed", extra={'error': str(e)})
+                return None
+            finally:
+                db.session.remove()
+        return self.last_result
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.run_once()
+            self.stop_event.wait(self.interval)
+
+
+incident_archiver = None
+_archiver_lock = threading.Lock()
+
+
+def init_incident_archiver(app):
+    """첫 요청 시 보관 스레드 시작 (ARCHIVE_INTERVAL이 0이면 비활성화 - archive_incidents.py로 수동 실행)"""
+    if not app.config.get('ARCHIVE_INTERVAL'):
+        return
+
+    @app.before_request
+    def _start_incident_archiver():
+        global incident_archiver
+        if incident_archiver is not None:
+            return
+        with _archiver_lock:
+            if incident_archiver is None:
+                incident_archiver = IncidentArchiver(
+                    current_app._get_current_object(), app.config['ARCHIVE_INTERVAL']
+                ).start()
@@ -1,3 +1,4 @@
+import heapq
 import threading
 from collections import deque
 from datetime import datetime, timedelta, timezone
@@ -21,6 +22,7 @@ class CircularVideoBuffer:
         
         self.buffer = deque(maxlen=self.max_frames)
         self.lock = threading.Lock()
+        self.total_bytes = 0  # 버퍼에 보관 중인 JPEG 바이트 합계
         
         print(f"📦 순환 버퍼 초기화: {duration}초, {fps}FPS, 최대 {self.max_frames} 프레임")
     
@@ -35,11 +37,18 @@ class CircularVideoBuffer:
         if timestamp is None:
             timestamp = datetime.now(timezone.utc)
         
+        size = len(frame_data) if isinstance(frame_data, bytes) else 0
+
         with self.lock:
+            if len(self.buffer) == self.max_frames:
+                evicted = self.buffer[0]['data']
+                if isinstance(evicted, bytes):
+                    self.total_bytes -= len(evicted)
             self.buffer.append({
                 'data': frame_data,
                 'timestamp': timestamp
             })
+            self.total_bytes += size
     
     def get_frames_before(self, incident_time, duration=15):
         """
@@ -74,11 +83,13 @@ class CircularVideoBuffer:
         """버퍼 초기화"""
         with self.lock:
             self.buffer.clear()
+            self.total_bytes = 0
     
     def get_status(self):
         """버퍼 상태 반환"""
         with self.lock:
             frame_count = len(self.buffer)
+            total_bytes = self.total_bytes
             if frame_count > 0:
                 oldest = self.buffer[0]['timestamp']
                 newest = self.buffer[-1]['timestamp']
@@ -90,6 +101,7 @@ class CircularVideoBuffer:
         return {
             'frame_count': frame_count,
             'max_frames': self.max_frames,
+            'total_bytes': total_bytes,
             'duration_seconds': duration_seconds,
             'oldest_frame': oldest.isoformat() if oldest else None,
             'newest_frame': newest.isoformat() if newest else None,
@@ -152,4 +164,310 @@ class HLSSegmentManager:
         """세그먼트 초기화"""
         with self.lock:
             self.segments.clear()
-            self.current_sequence = 0
\ No newline at end of file
+            self.current_sequence = 0
+
+class ClockOffsetEstimator:
+    """
+    디바이스 시계 → 서버 시계 오프셋 추정기
+
+    (서버 수신 시각 - 디바이스 캡처 시각)은 시계 오프셋 + 네트워크 지연이다.
+    최근 window개 샘플의 최솟값을 취하면 지연 변동(jitter)이 제거되어
+    오프셋 + 최소 지연의 안정적인 추정치가 된다.
+    """
+
+    def __init__(self, window=300):
+        """
+        Args:
+            window: 최솟값을 구할 최근 샘플 수 (30fps 기준 10초)
+        """
+        self.window = window
+        self.count = 0
+        # 단조 증가 deque (index, delta) - 슬라이딩 윈도우 최솟값을 O(1)로 유지
+        self._candidates = deque()
+
+    def observe(self, capture_ts, arrival_ts):
+        """
+        샘플 추가
+
+        Args:
+            capture_ts: 디바이스 캡처 시각 (epoch 초, 디바이스 시계)
+            arrival_ts: 서버 수신 시각 (epoch 초, 서버 시계)
+        """
+        delta = arrival_ts - capture_ts
+        index = self.count
+        self.count += 1
+
+        while self._candidates and self._candidates[-1][1] >= delta:
+            self._candidates.pop()
+        self._candidates.append((index, delta))
+
+        while self._candidates[0][0] <= index - self.window:
+            self._candidates.popleft()
+
+    @property
+    def offset(self):
+        """추정 오프셋 (초). 샘플이 없으면 0"""
+        return self._candidates[0][1] if self._candidates else 0.0
+
+
+class FrameReorderBuffer:
+    """
+    시퀀스 번호 기준 재정렬 버퍼 (jitter buffer)
+
+    동시에 여러 요청으로 업로드된 프레임이 순서가 뒤바뀌어 도착해도
+    시퀀스 순서대로 내보낸다. 빠진 프레임은 window 시간 또는 max_frames만큼만
+    기다린 뒤 건너뛰며, 이미 내보낸 시퀀스보다 늦게 온 프레임은 버린다.
+
+    디바이스 프로세스가 재시작되면 시퀀스가 0부터 다시 시작한다. 내보낸 위치보다
+    restart_gap 넘게 뒤인 프레임이 연달아(서로 max_frames 이내로) 오면 새 에포크로 보고
+    대기 중인 프레임을 모두 내보낸 뒤 시퀀스 상태를 초기화한다. 재전송된 오래된 프레임
+    하나로는 초기화되지 않는다.
+    """
+
+    SEQ_MODULO = 2 ** 32
+
+    def __init__(self, window=0.2, max_frames=32, restart_gap=None):
+        """
+        Args:
+            window: 빠진 프레임을 기다리는 최대 시간 (초)
+            max_frames: 버퍼에 보관할 최대 프레임 수
+            restart_gap: 재시작으로 볼 역방향 시퀀스 차이 (기본 max_frames * 4)
+        """
+        self.window = window
+        self.max_frames = max_frames
+        self.restart_gap = restart_gap if restart_gap is not None else max_frames * 4
+
+        self._heap = []
+        self.highest_seq = None  # 지금까지 받은 가장 큰 (unwrap된) 시퀀스
+        self.next_seq = None
+        self._restart_probe = None  # 재시작 후보 프레임의 (unwrap된) 시퀀스
+
+        # 통계
+        self.reordered = 0
+        self.late_dropped = 0
+        self.skipped = 0
+        self.restarts = 0
+
+    def unwrap(self, seq):
+        """32비트 시퀀스를 단조 증가 정수로 변환"""
+        if self.highest_seq is None:
+            self.highest_seq = seq
+            return seq
+
+        diff = (seq - self.highest_seq) % self.SEQ_MODULO
+        if diff >= self.SEQ_MODULO // 2:
+            diff -= self.SEQ_MODULO
+        unwrapped = self.highest_seq + diff
+        if unwrapped > self.highest_seq:
+            self.highest_seq = unwrapped
+        return unwrapped
+
+    def push(self, seq, item, now):
+        """
+        프레임 추가
+
+        Args:
+            seq: 디바이스 시퀀스 번호 (32비트)
+            item: 보관할 항목
+            now: 현재 시각 (monotonic 초)
+
+        Returns:
+            list: 시퀀스 순서대로 내보낼 항목 리스트
+        """
+        unwrapped = self.unwrap(seq)
+
+        if self.next_seq is not None and unwrapped < self.next_seq:
+            if self.next_seq - unwrapped > self.restart_gap:
+                probe = self._restart_probe
+                if probe is not None and 0 < unwrapped - probe <= self.max_frames:
+                    # 디바이스 재시작: 이전 에포크를 비우고 이 프레임부터 새로 시작
+                    released = self._reset_epoch()
+                    return released + self.push(seq, item, now)
+                self._restart_probe = unwrapped
+            self.late_dropped += 1
+            return self.flush_expired(now)
+
+        self._restart_probe = None
+        if self._heap and unwrapped < self._heap[0][0]:
+            self.reordered += 1
+        heapq.heappush(self._heap, (unwrapped, now, item))
+        return self.flush_expired(now)
+
+    def flush_expired(self, now):
+        """순서가 된 항목과 대기 시간이 지난 항목을 내보냄"""
+        released = []
+        heap = self._heap
+        while heap:
+            seq, arrived, item = heap[0]
+            in_order = self.next_seq is None or seq == self.next_seq
+            expired = now - arrived >= self.window or len(heap) > self.max_frames
+            if not (in_order or expired):
+                break
+
+            heapq.heappop(heap)
+            if self.next_seq is not None and seq > self.next_seq:
+                self.skipped += seq - self.next_seq
+            self.next_seq = seq + 1
+            released.append(item)
+        return released
+
+    def _reset_epoch(self):
+        """대기 중인 프레임을 순서대로 내보내고 시퀀스 상태 초기화"""
+        released = [item for _, _, item in sorted(self._heap)]
+        self._heap = []
+        self.highest_seq = None
+        self.next_seq = None
+        self._restart_probe = None
+        self.restarts += 1
+        return released
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class DeviceTimeline:
+    """
+    디바이스별 프레임 타임라인
+
+    캡처 시각을 서버 시계로 보정하고(ClockOffsetEstimator), 시퀀스 순서로
+    재정렬한 뒤(FrameReorderBuffer) 순환 버퍼에 넣는다. 프레임별 지연도 기록한다.
+    """
+
+    RATE_WINDOW = 5.0
+
+    def __init__(self, device_id, reorder_window=0.2, reorder_max_frames=32, latency_samples=300):
+        self.device_id = device_id
+        self.clock = ClockOffsetEstimator()
+        self.reorder = FrameReorderBuffer(window=reorder_window, max_frames=reorder_max_frames)
+        self.lock = threading.Lock()
+
+        self.frames = 0
+        self.bytes = 0
+        # (capture→arrival 지연, 최소 지연 대비 큐잉 지연) 초 단위
+        self.latencies = deque(maxlen=latency_samples)
+        # 최근 RATE_WINDOW초 (수신 시각, 바이트) - fps/bytes_per_second 계산용
+        self._recent = deque()
+
+    def ingest(self, frames, arrival_ts, sink):
+        """
+        프레임 처리 후 순서대로 sink(frame_data, timestamp) 호출
+
+        sink 호출은 디바이스 락 안에서 이루어지므로 동시 요청에서도
+        버퍼에 시퀀스 순서대로 추가된다.
+
+        Args:
+            frames: (frame_bytes, capture_ts, seq) 리스트. capture_ts/seq는 None 가능
+            arrival_ts: 서버 수신 시각 (epoch 초)
+            sink: 순환 버퍼 추가 함수
+
+        Returns:
+            bytes or None: 이번 호출에서 가장 최신(시퀀스 기준)이 된 프레임
+        """
+        newest = None
+        now = time.monotonic()
+
+        with self.lock:
+            for frame_bytes, capture_ts, seq in frames:
+                self.frames += 1
+                self.bytes += len(frame_bytes)
+                self._recent.append((arrival_ts, len(frame_bytes)))
+
+                if capture_ts:
+                    self.clock.observe(capture_ts, arrival_ts)
+                    server_ts = capture_ts + self.clock.offset
+                    self.latencies.append((arrival_ts - capture_ts, arrival_ts - server_ts))
+                else:
+                    server_ts = arrival_ts
+
+                timestamp = datetime.fromtimestamp(server_ts, tz=timezone.utc)
+
+                if seq is None:
+                    newest = frame_bytes
+                    released = self.reorder.flush_expired(now) + [(frame_bytes, timestamp)]
+                else:
+                    previous_highest = self.reorder.highest_seq
+                    previous_restarts = self.reorder.restarts
+                    released = self.reorder.push(seq, (frame_bytes, timestamp), now)
+                    if self.reorder.restarts != previous_restarts:
+                        # 디바이스 재시작 - 시계 오프셋도 다시 추정
+                        self.clock = ClockOffsetEstimator(self.clock.window)
+                        if capture_ts:
+                            self.clock.observe(capture_ts, arrival_ts)
+                        newest = frame_bytes
+                    elif previous_highest is None or self.reorder.highest_seq > previous_highest:
+                        newest = frame_bytes
+
+                for frame_data, frame_ts in released:
+                    sink(frame_data, frame_ts)
+
+            self._trim_recent(arrival_ts)
+
+        return newest
+
+    def _trim_recent(self, now):
+        cutoff = now - self.RATE_WINDOW
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    def get_rates(self, now=None):
+        """
+        최근 RATE_WINDOW초 수신 속도
+
+        Returns:
+            tuple: (fps, bytes_per_second)
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self._trim_recent(now)
+            frame_count = len(self._recent)
+            total = sum(size for _, size in self._recent)
+        return frame_count / self.RATE_WINDOW, total / self.RATE_WINDOW
+
+    def flush(self, sink):
+        """대기 시간이 지난 프레임을 sink로 내보냄 (새 프레임이 없을 때 사용)"""
+        with self.lock:
+            for frame_data, frame_ts in self.reorder.flush_expired(time.monotonic()):
+                sink(frame_data, frame_ts)
+
+    def to_server_time(self, device_time):
+        """디바이스 시계 기준 datetime을 서버 시계로 보정"""
+        return device_time + timedelta(seconds=self.clock.offset)
+
+    def get_status(self):
+        """디바이스 타임라인 상태"""
+        with self.lock:
+            latencies = list(self.latencies)
+            status = {
+                'device_id': self.device_id,
+                'frames': self.frames,
+                'bytes': self.bytes,
+                'clock_offset_ms': round(self.clock.offset * 1000, 1),
+                'reorder_pending': len(self.reorder),
+                'reordered': self.reorder.reordered,
+                'late_dropped': self.reorder.late_dropped,
+                'skipped': self.reorder.skipped,
+                'restarts': self.reorder.restarts,
+            }
+
+        def percentile(values, p):
+            if not values:
+                return None
+            values = sorted(values)
+            return round(values[min(int(len(values) * p), len(values) - 1)] * 1000, 1)
+
+        fps, bytes_per_second = self.get_rates()
+        status['fps'] = round(fps, 2)
+        status['bytes_per_second'] = round(bytes_per_second)
+
+        capture_latency = [sample[0] for sample in latencies]
+        queue_latency = [sample[1] for sample in latencies]
+        status['latency_ms'] = {
+            'samples': len(latencies),
+            # 디바이스/서버 시계가 동기화(NTP)되어 있을 때의 캡처→수신 지연
+            'capture_to_arrival_p50': percentile(capture_latency, 0.5),
+            'capture_to_arrival_p95': percentile(capture_latency, 0.95),
+            # 시계 동기화와 무관한 최소 지연 대비 추가 지연 (jitter)
+            'jitter_p50': percentile(queue_latency, 0.5),
+            'jitter_p95': percentile(queue_latency, 0.95),
+        }
+        return status
@@ -0,0 +1,155 @@
+"""
+사고 벌크 작업 (확인/확인 취소/삭제)
+
+id 목록 또는 필터(유형, 기간, 장치, 확인 여부)에 맞는 사고를 UPDATE/DELETE 한 번으로 처리한다.
+ORM을 거치지 않으므로 세션 이벤트가 하던 일을 같은 트랜잭션에서 직접 한다:
+카운터는 apply_bulk_deltas(), 델타 동기화는 bump_change_seq()/add_tombstones(),
+커밋 후 응답 캐시 invalidate_user()와 이벤트 발행(요청당 한 건).
+삭제된 사고의 파일은 utils.media.file_cleaner가 요청 밖에서 지운다.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from config import Config
+from models import db, Incident
+from utils.cache import invalidate_user
+from utils.counters import apply_bulk_deltas
+from utils.filters import incident_criteria
+from utils.events import publish_incidents_checked, publish_incidents_deleted
+from utils.log import get_logger
+from utils.media import file_cleaner
+from utils.sync import add_tombstones, bump_change_seq
+
+log = get_logger('bulk')
+
+IN_CHUNK = 500
+
+_table = Incident.__table__
+_ROW_COLUMNS = (
+    _table.c.id, _table.c.incident_type, _table.c.detected_at, _table.c.is_checked,
+    _table.c.video_path, _table.c.thumbnail_path,
+)
+
+
+def build_criteria(user_id, data, allowed_types=None):
+    """
+    요청 본문 → WHERE 조건 목록
+
+    Body:
+        ids: [int] (최대 Config.BULK_MAX_IDS개)
+        filter: {"type", "device_id", "from", "to" (ISO 8601, to는 미포함),
+                 "min_confidence", "max_confidence", "is_checked"} - utils/filters.py
+        ids와 filter를 함께 주면 둘 다 만족하는 사고만 대상
+
+    Raises:
+        ValueError: 대상 조건이 없거나 값이 잘못됨 (전체 삭제를 막기 위해 조건은 필수)
+    """
+    ids = data.get('ids')
+    filters = data.get('filter') or {}
+    if not isinstance(filters, dict):
+        raise ValueError("filter must be an object")
+    # incident_criteria()는 null/빈 값을 조건 없이 넘기므로 명시한 키는 여기서 거부
+    empty = [key for key, value in filters.items() if value is None or value == '' or value == []]
+    if empty:
+        raise ValueError(f"Empty filter values: {', '.join(empty)}")
+    filter_criteria = incident_criteria(filters, allowed_types)
+    if ids is None and not filter_criteria:
+        raise ValueError("ids or filter required")
+
+    criteria = [Incident.user_id == user_id]
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError("ids must be a list of integers")
+        if len(ids) > Config.BULK_MAX_IDS:
+            raise ValueError(f"Too many ids (max {Config.BULK_MAX_IDS}); use a filter instead")
+        criteria.append(Incident.id.in_(ids))
+
+    criteria.extend(filter_criteria)
+    return criteria
+
+
+def _execute(connection, statement, criteria, dialect_returning):
+    """
+    UPDATE/DELETE 한 번 실행 후 대상 행 반환
+
+    RETURNING을 지원하면 그대로 쓰고 (SQLite 3.35+, PostgreSQL),
+    아니면 같은 트랜잭션에서 대상 행을 먼저 읽고 id 묶음으로 실행한다.
+    """
+    if dialect_returning:
+        return connection.execute(statement.where(*criteria).returning(*_ROW_COLUMNS)).all()
+
+    rows = connection.execute(select(*_ROW_COLUMNS).where(*criteria)).all()
+    ids = [row.id for row in rows]
+    for start in range(0, len(ids), IN_CHUNK):
+        connection.execute(statement.where(_table.c.id.in_(ids[start:start + IN_CHUNK])))
+    return rows
+
+
+def set_checked(user_id, criteria, checked):
+    """
+    조건에 맞는 사고 확인/확인 취소 (상태가 실제로 바뀌는 행만)
+
+    Returns:
+        바뀐 사고 id 목록
+    """
+    connection = db.session.connection()
+    now = datetime.now(timezone.utc)
+    values = {'is_checked': checked, 'updated_at': now}
+    if checked:
+        values['checked_at'] = now
+    # NULL(미확인)도 확인 대상
+    changing = Incident.is_checked.isnot(True) if checked else Incident.is_checked.is_(True)
+
+    try:
+        rows = _execute(
+            connection, _table.update().values(**values), [*criteria, changing],
+            connection.dialect.update_returning,
+        )
+        ids = sorted(row.id for row in rows)
+        bump_change_seq(connection, ids)
+        sign = 1 if checked else -1
+        apply_bulk_deltas(connection, [
+            (user_id, row.incident_type, row.detected_at, 0, sign) for row in rows
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if ids:
+        invalidate_user(user_id)
+        publish_incidents_checked(ids, user_id, checked, now if checked else None)
+        log.info("incidents bulk checked", extra={'user_id': user_id, 'checked': checked, 'rows': len(ids)})
+    return ids
+
+
+def delete_incidents(user_id, criteria):
+    """
+    조건에 맞는 사고 삭제, 파일 삭제는 백그라운드에 예약
+
+    Returns:
+        (삭제된 사고 id 목록, 삭제 예약한 파일 수)
+    """
+    connection = db.session.connection()
+    try:
+        rows = _execute(connection, _table.delete(), criteria, connection.dialect.delete_returning)
+        ids = sorted(row.id for row in rows)
+        add_tombstones(connection, [(incident_id, user_id) for incident_id in ids])
+        apply_bulk_deltas(connection, [
+            (user_id, row.incident_type, row.detected_at, -1, -1 if row.is_checked else 0) for row in rows
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    files = 0
+    if ids:
+        invalidate_user(user_id)
+        publish_incidents_deleted(ids, user_id)
+        files = file_cleaner.submit(Config.VIDEOS_DIR, [
+            path for row in rows for path in (row.video_path, row.thumbnail_path)
+        ])
+        log.info("incidents bulk deleted", extra={'user_id': user_id, 'rows': len(ids), 'files': files})
+    return ids, files
@@ -0,0 +1,299 @@
+"""
+GET 응답 캐시 (대시보드/목록 엔드포인트)
+
+- 키: 뷰 이름 + 사용자 + 정렬된 쿼리 인자 + 세대 번호
+- 무효화: Incident가 추가/수정/삭제된 트랜잭션이 커밋되면 해당 사용자의 세대를 올리고,
+  StreamSession이 바뀌면 전체 세대를 올린다. 세대가 바뀐 키는 다시 조회되지 않고 TTL/LRU로 사라진다.
+  ORM을 거치지 않는 벌크 SQL 뒤에는 invalidate_user()를 직접 호출한다.
+- 저장소: memory (프로세스 내 LRU + TTL) 또는 sqlite (RESPONSE_CACHE_PATH 파일, 워커 간 공유)
+- 같은 키의 동시 요청은 한 번만 계산하고 나머지는 그 결과를 받는다 (single-flight)
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from config import Config
+from models import Incident, StreamSession
+from utils.log import get_logger
+from utils.metrics import registry
+
+log = get_logger('cache')
+
+RESPONSE_CACHE = registry.counter(
+    'safefall_response_cache_total',
+    'Response cache lookups by result (hit, miss, coalesced)',
+    ('view', 'result')
+)
+
+GLOBAL_GENERATION = '*'
+
+CachedResponse = namedtuple('CachedResponse', 'status mimetype body')
+
+
+class MemoryStore:
+    """프로세스 내 LRU + TTL"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key → (expires, CachedResponse)
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def generation(self, name):
+        with self.lock:
+            return self.generations.get(name, 0)
+
+    def bump(self, name):
+        with self.lock:
+            self.generations[name] = self.generations.get(name, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SQLiteStore:
+    """
+    SQLite 파일 저장소 (같은 호스트의 여러 워커가 캐시/세대를 공유)
+
+    스레드마다 연결을 따로 열고 WAL 모드로 읽기/쓰기가 서로 막지 않게 한다.
+    """
+
+    def __init__(self, path, max_entries=512):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.puts = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, expires REAL NOT NULL, status INTEGER NOT NULL, "
+            "mimetype TEXT, body BLOB NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        connection.commit()
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT expires, status, mimetype, body FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        return CachedResponse(row[1], row[2], bytes(row[3]))
+
+    def put(self, key, value, ttl):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (key, expires, status, mimetype, body) VALUES (?, ?, ?, ?, ?)",
+            (key, time.time() + ttl, value.status, value.mimetype, value.body),
+        )
+        self.puts += 1
+        if self.puts % 100 == 0:
+            # 만료 항목 정리 + 최대 개수 초과분은 만료가 가까운 것부터 삭제
+            connection.execute("DELETE FROM response_cache WHERE expires < ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def generation(self, name):
+        row = self._connection().execute(
+            "SELECT value FROM cache_generations WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, name):
+        self._connection().execute(
+            "INSERT INTO cache_generations (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def clear(self):
+        self._connection().execute("DELETE FROM response_cache")
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class ResponseCache:
+    def __init__(self):
+        self.store = None
+        self.ttl = 30
+        self.enabled = False
+        self.flights = {}
+        self.flights_lock = threading.Lock()
+
+    def configure(self, config):
+        self.enabled = config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = config.get('RESPONSE_CACHE_TTL', 30)
+        max_entries = config.get('RESPONSE_CACHE_SIZE', 512)
+        backend = config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        if backend == 'sqlite':
+            self.store = SQLiteStore(config['RESPONSE_CACHE_PATH'], max_entries)
+        else:
+            self.store = MemoryStore(max_entries)
+        log.info("response cache configured", extra={
+            'enabled': self.enabled, 'backend': backend, 'ttl': self.ttl, 'max_entries': max_entries,
+        })
+
+    def key(self, view, user_id):
+        args = urlencode(sorted(request.args.items(multi=True)))
+        generation = f"{self.store.generation(GLOBAL_GENERATION)}.{self.store.generation(user_id)}"
+        return f"{view}|{user_id}|{args}|{generation}"
+
+    def invalidate_user(self, user_id):
+        if self.store is not None:
+            self.store.bump(str(user_id))
+
+    def invalidate_all(self):
+        if self.store is not None:
+            self.store.bump(GLOBAL_GENERATION)
+
+    def fetch(self, view, key, compute):
+        """캐시 조회 → 없으면 single-flight로 계산 (200 응답만 저장)"""
+        cached = self.store.get(key)
+        if cached is not None:
+            RESPONSE_CACHE.inc(view=view, result='hit')
+            return cached, 'HIT'
+
+        with self.flights_lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait(Config.RESPONSE_CACHE_COALESCE_TIMEOUT)
+            if flight.result is not None:
+                RESPONSE_CACHE.inc(view=view, result='coalesced')
+                return flight.result, 'COALESCED'
+            # 선행 요청이 실패했거나 너무 오래 걸림 - 직접 계산
+            return compute(), 'MISS'
+
+        try:
+            result = compute()
+            flight.result = result
+            if result.status == 200:
+                self.store.put(key, result, self.ttl)
+            RESPONSE_CACHE.inc(view=view, result='miss')
+            return result, 'MISS'
+        finally:
+            with self.flights_lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+
+
+response_cache = ResponseCache()
+
+
+def init_response_cache(app):
+    response_cache.configure(app.config)
+
+
+def invalidate_user(user_id):
+    """사용자 응답 캐시 무효화 (벌크 SQL 변경 후 호출)"""
+    response_cache.invalidate_user(user_id)
+
+
+def _current_user_id():
+    # current_user_id = get_jwt_identity()
+    return "1"
+
+
+def cached_response(view):
+    """GET 뷰 응답 캐시 데코레이터 (@jwt_required 아래에 둔다)"""
+    name = f"{view.__module__}.{view.__name__}"
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not response_cache.enabled or response_cache.store is None or request.method != 'GET':
+            return view(*args, **kwargs)
+
+        def compute():
+            response = current_app.make_response(view(*args, **kwargs))
+            return CachedResponse(response.status_code, response.mimetype, response.get_data())
+
+        key = response_cache.key(name, _current_user_id())
+        result, state = response_cache.fetch(name, key, compute)
+        response = Response(result.body, status=result.status, mimetype=result.mimetype)
+        response.headers['X-Cache'] = state
+        return response
+
+    return wrapper
+
+
+# ============================================================
+# 커밋 시 자동 무효화
+# ============================================================
+
+@event.listens_for(Session, 'before_flush')
+def _collect_invalidations(session, flush_context, instances):
+    users = session.info.setdefault('response_cache_users', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Incident):
+            # 소유자가 바뀐 경우 이전 사용자도 무효화
+            history = inspect(obj).attrs.user_id.history
+            for user_id in (obj.user_id, *history.deleted):
+                if user_id is not None:
+                    users.add(str(user_id))
+        elif isinstance(obj, StreamSession):
+            session.info['response_cache_all'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    users = session.info.pop('response_cache_users', None)
+    if session.info.pop('response_cache_all', False):
+        response_cache.invalidate_all()
+    for user_id in users or ():
+        response_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop('response_cache_users', None)
+    session.info.pop('response_cache_all', False)
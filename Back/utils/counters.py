@@ -0,0 +1,399 @@
+"""
+사고 통계 카운터 (incident_counters) 유지
+
+Incident 추가/확인 상태 변경/삭제가 flush될 때 같은 트랜잭션 안에서
+(사용자, 유형, 날짜) 및 (사용자, 유형, ALL_TIME) 카운터를 증감한다.
+ORM을 거치는 모든 변경(incidents, videos, sync 등)이 자동으로 반영되며,
+db.insert()/query.delete() 같은 벌크 SQL은 반영되지 않으므로 같은 트랜잭션에서
+apply_bulk_deltas()를 호출하거나, 그 뒤에 rebuild_incident_counters()로 다시 계산한다
+(rebuild_incident_counters.py).
+
+날짜 행은 Config.STATS_TIMEZONE 기준 일 단위이며, 대시보드 요약(incident_summary)의
+일별 롤업으로도 사용한다. 다른 시간대 요약은 incidents 테이블에서 SQL GROUP BY로 계산한다.
+
+보관된 사고(incidents_archive, utils/archive.py)도 계속 센다. 보관 이동은 카운터를 바꾸지 않고,
+재계산과 SQL 요약은 두 테이블을 합산한다.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from config import Config
+from models import db, Incident, ArchivedIncident, IncidentCounter
+from utils.log import get_logger
+
+log = get_logger('counters')
+
+ALL_TIME = IncidentCounter.ALL_TIME
+
+# 카운터에 포함되는 사고 테이블
+_COUNTED_MODELS = (Incident, ArchivedIncident)
+
+# 값이 바뀌면 카운터 키나 checked 수가 달라지는 컬럼
+_COUNTED_ATTRS = ('user_id', 'incident_type', 'detected_at', 'is_checked')
+
+
+@lru_cache(maxsize=64)
+def get_zone(name=None):
+    """IANA 시간대 (기본: Config.STATS_TIMEZONE). 알 수 없는 이름이면 ValueError"""
+    name = name or Config.STATS_TIMEZONE
+    if name.upper() == 'UTC':
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone: {name}") from e
+
+
+def day_bucket(detected_at, zone=None):
+    """detected_at의 STATS_TIMEZONE 기준 날짜 (naive datetime은 UTC로 간주)"""
+    if detected_at.tzinfo is None:
+        detected_at = detected_at.replace(tzinfo=timezone.utc)
+    return detected_at.astimezone(zone or get_zone()).date()
+
+
+def _state(incident, committed=False):
+    """카운터 키와 checked 여부 (committed=True면 flush 이전 DB 값)"""
+    values = {}
+    attrs = inspect(incident).attrs
+    for name in _COUNTED_ATTRS:
+        history = attrs[name].history
+        if not committed or not history.has_changes():
+            # 변경되지 않은 속성은 현재 값 (만료된 경우 DB에서 로드)
+            values[name] = getattr(incident, name)
+        elif history.deleted:
+            values[name] = history.deleted[0]
+        else:
+            # 이전 값이 NULL이었음
+            values[name] = None
+
+    if values['user_id'] is None or values['incident_type'] is None or values['detected_at'] is None:
+        return None
+    return (values['user_id'], values['incident_type'], day_bucket(values['detected_at'])), bool(values['is_checked'])
+
+
+def _add(deltas, state, sign):
+    if state is None:
+        return
+    (user_id, incident_type, day), checked = state
+    for key in ((user_id, incident_type, day), (user_id, incident_type, ALL_TIME)):
+        deltas[key][0] += sign
+        deltas[key][1] += sign if checked else 0
+
+
+def _collect_deltas(session):
+    deltas = defaultdict(lambda: [0, 0])  # key → [total, checked]
+
+    for obj in session.new:
+        if isinstance(obj, Incident):
+            _add(deltas, _state(obj), +1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Incident):
+            _add(deltas, _state(obj, committed=True), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Incident) or obj in session.deleted:
+            continue
+        attrs = inspect(obj).attrs
+        if not any(attrs[name].history.has_changes() for name in _COUNTED_ATTRS):
+            continue
+        _add(deltas, _state(obj, committed=True), -1)
+        _add(deltas, _state(obj), +1)
+
+    return {key: value for key, value in deltas.items() if value != [0, 0]}
+
+
+def _apply_deltas(connection, deltas):
+    """카운터 증감 (행이 없으면 생성)"""
+    table = IncidentCounter.__table__
+    for (user_id, incident_type, day), (total, checked) in deltas.items():
+        where = (
+            (table.c.user_id == user_id)
+            & (table.c.incident_type == incident_type)
+            & (table.c.day == day)
+        )
+        result = connection.execute(
+            table.update()
+            .where(where)
+            .values(total=table.c.total + total, checked=table.c.checked + checked)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(
+                user_id=user_id, incident_type=incident_type, day=day, total=total, checked=checked
+            ))
+
+
+def apply_bulk_deltas(connection, rows):
+    """
+    벌크 SQL 변경분 카운터 반영 (변경과 같은 트랜잭션에서 호출)
+
+    Args:
+        rows: [(user_id, incident_type, detected_at, total, checked)] - 행마다 total/checked 증감
+              예: 확인 처리 (…, 0, +1), 삭제 (…, -1, -1 if is_checked else 0)
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for user_id, incident_type, detected_at, total, checked in rows:
+        day = day_bucket(detected_at)
+        for key in ((user_id, incident_type, day), (user_id, incident_type, ALL_TIME)):
+            deltas[key][0] += total
+            deltas[key][1] += checked
+    _apply_deltas(connection, {key: value for key, value in deltas.items() if value != [0, 0]})
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history: 만료된(커밋 후) 객체에 값을 설정할 때도 이전 값을 로드해 history에 남김
+for _name in _COUNTED_ATTRS:
+    event.listen(getattr(Incident, _name), 'set', _load_previous_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_counter_deltas(session, flush_context, instances):
+    # 삭제될 행의 이전 값은 DELETE 전에만 로드할 수 있으므로 flush 전에 계산
+    session.info['incident_counter_deltas'] = _collect_deltas(session)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_counters(session, flush_context):
+    # incidents 변경과 같은 트랜잭션/커넥션에서 카운터 갱신
+    deltas = session.info.pop('incident_counter_deltas', None)
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+def _expected_counters():
+    """incidents + incidents_archive에서 계산한 카운터 {(user, type, day): [total, checked]}"""
+    expected = defaultdict(lambda: [0, 0])
+    for model in _COUNTED_MODELS:
+        rows = db.session.query(
+            model.user_id,
+            model.incident_type,
+            model.detected_at,
+            model.is_checked,
+        ).yield_per(5000)
+        for user_id, incident_type, detected_at, is_checked in rows:
+            _add(expected, ((user_id, incident_type, day_bucket(detected_at)), bool(is_checked)), +1)
+    return expected
+
+
+def rebuild_incident_counters():
+    """
+    incidents(+ 보관) 테이블에서 카운터 전체 재계산 (앱 컨텍스트 필요)
+
+    벌크 SQL 변경 후나 카운터가 어긋났을 때 사용한다. 한 트랜잭션에서 삭제 후 다시 채운다.
+    """
+    expected = _expected_counters()
+
+    connection = db.session.connection()
+    connection.execute(IncidentCounter.__table__.delete())
+    if expected:
+        connection.execute(IncidentCounter.__table__.insert(), [
+            {'user_id': user_id, 'incident_type': incident_type, 'day': day, 'total': total, 'checked': checked}
+            for (user_id, incident_type, day), (total, checked) in expected.items()
+        ])
+    db.session.commit()
+
+    log.info("incident counters rebuilt", extra={'rows': len(expected)})
+    return len(expected)
+
+
+def verify_incident_counters():
+    """카운터와 incidents 테이블 집계가 다른 키 목록 [(key, stored, expected)]"""
+    expected = _expected_counters()
+    stored = {
+        (row.user_id, row.incident_type, row.day): [row.total, row.checked]
+        for row in IncidentCounter.query.all()
+    }
+
+    mismatches = []
+    for key in set(expected) | set(stored):
+        actual = stored.get(key, [0, 0])
+        wanted = expected.get(key, [0, 0])
+        if actual != wanted:
+            mismatches.append((key, actual, wanted))
+    return mismatches
+
+
+def ensure_incident_counters():
+    """카운터 테이블이 비어 있는데 사고가 있으면 재계산 (카운터 도입 이전 DB)"""
+    if db.session.query(IncidentCounter.user_id).first() is not None:
+        return False
+    if all(db.session.query(model.id).first() is None for model in _COUNTED_MODELS):
+        return False
+    rebuild_incident_counters()
+    return True
+
+
+def incident_stats(user_id):
+    """
+    사용자 사고 통계 (ALL_TIME + 오늘 행만 조회)
+
+    Returns:
+        {'total', 'checked', 'unchecked', 'today', 'by_type'}
+    """
+    today = datetime.now(get_zone()).date()
+    rows = (
+        db.session.query(
+            IncidentCounter.incident_type,
+            IncidentCounter.day,
+            IncidentCounter.total,
+            IncidentCounter.checked,
+        )
+        .filter(IncidentCounter.user_id == user_id, IncidentCounter.day.in_((ALL_TIME, today)))
+        .all()
+    )
+
+    total = checked = today_count = 0
+    by_type = {}
+    for incident_type, day, type_total, type_checked in rows:
+        if day == ALL_TIME:
+            total += type_total
+            checked += type_checked
+            if type_total:
+                by_type[incident_type] = type_total
+        else:
+            today_count += type_total
+
+    return {
+        'total': total,
+        'checked': checked,
+        'unchecked': total - checked,
+        'today': today_count,
+        'by_type': by_type,
+    }
+
+
+# ============================================================
+# 기간 요약 (일별 롤업 / SQL GROUP BY)
+# ============================================================
+
+def _local_midnight(day, zone):
+    """zone 기준 day 00:00의 UTC 시각"""
+    return datetime.combine(day, time(), tzinfo=zone).astimezone(timezone.utc)
+
+
+def _shifted_date(offset, model=Incident):
+    """UTC detected_at에 offset을 더한 날짜 SQL 표현식"""
+    minutes = int(offset.total_seconds() // 60)
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return func.date(model.detected_at, f'{minutes:+d} minutes')
+    return func.date(model.detected_at + offset)
+
+
+def _day_key(value):
+    # SQLite date()는 문자열, PostgreSQL은 date 반환
+    return value if isinstance(value, str) else value.isoformat()
+
+
+def _summary_from_rollup(user_id, first_day, last_day):
+    return (
+        db.session.query(IncidentCounter.incident_type, IncidentCounter.day, IncidentCounter.total)
+        .filter(
+            IncidentCounter.user_id == user_id,
+            IncidentCounter.day >= first_day,
+            IncidentCounter.day <= last_day,
+            IncidentCounter.total > 0,
+        )
+        .all()
+    )
+
+
+def _summary_from_incidents(user_id, first_day, days, zone):
+    """incidents + incidents_archive에서 (유형, 현지 날짜) GROUP BY (같은 키는 호출자가 합산)"""
+    midnights = [_local_midnight(first_day + timedelta(days=i), zone) for i in range(days + 1)]
+    rows = []
+    for model in _COUNTED_MODELS:
+        rows.extend(_summary_rows(model, user_id, first_day, days, zone, midnights))
+    return rows
+
+
+def _summary_rows(model, user_id, first_day, days, zone, midnights):
+    """
+    한 테이블의 (유형, 현지 날짜) GROUP BY
+
+    현지 날짜 = date(detected_at + UTC 오프셋). 오프셋이 같은 연속 구간마다 한 번씩 질의하고,
+    서머타임 전환일(23/25시간)은 그날 하루 구간을 유형별로만 집계한다.
+    """
+    rows = []
+
+    i = 0
+    while i < days:
+        if midnights[i + 1] - midnights[i] != timedelta(days=1):
+            # 전환일: 날짜 계산 없이 그날로 집계
+            day = first_day + timedelta(days=i)
+            rows.extend(
+                (incident_type, day, count)
+                for incident_type, count in db.session.query(model.incident_type, func.count(model.id))
+                .filter(
+                    model.user_id == user_id,
+                    model.detected_at >= midnights[i],
+                    model.detected_at < midnights[i + 1],
+                )
+                .group_by(model.incident_type)
+            )
+            i += 1
+            continue
+
+        j = i + 1
+        while j < days and midnights[j + 1] - midnights[j] == timedelta(days=1):
+            j += 1
+        local_date = _shifted_date(midnights[i].astimezone(zone).utcoffset(), model)
+        rows.extend(
+            db.session.query(model.incident_type, local_date, func.count(model.id))
+            .filter(
+                model.user_id == user_id,
+                model.detected_at >= midnights[i],
+                model.detected_at < midnights[j],
+            )
+            .group_by(model.incident_type, local_date)
+        )
+        i = j
+
+    return rows
+
+
+def incident_summary(user_id, days, tz=None):
+    """
+    최근 days일(오늘 포함, tz 기준 달력 날짜) 사고 집계
+
+    tz가 STATS_TIMEZONE이고 SUMMARY_USE_ROLLUP이면 incident_counters 일별 행을 읽고,
+    아니면 incidents 테이블에서 SQL로 GROUP BY 한다. 어느 쪽이든 결과 크기는 (유형 × 일) 행.
+
+    Returns:
+        {'total', 'by_type', 'by_date', 'since', 'timezone', 'source'}
+    """
+    zone = get_zone(tz)
+    today = datetime.now(zone).date()
+    first_day = today - timedelta(days=days - 1)
+
+    if Config.SUMMARY_USE_ROLLUP and zone is get_zone():
+        rows = _summary_from_rollup(user_id, first_day, today)
+        source = 'rollup'
+    else:
+        rows = _summary_from_incidents(user_id, first_day, days, zone)
+        source = 'sql'
+
+    total = 0
+    by_type = {}
+    by_date = {}
+    for incident_type, day, count in rows:
+        total += count
+        by_type[incident_type] = by_type.get(incident_type, 0) + count
+        day = _day_key(day)
+        by_date[day] = by_date.get(day, 0) + count
+
+    return {
+        'total': total,
+        'by_type': by_type,
+        'by_date': dict(sorted(by_date.items())),
+        'since': _local_midnight(first_day, zone),
+        'timezone': tz or Config.STATS_TIMEZONE,
+        'source': source,
+    }
@@ -0,0 +1,126 @@
+"""
+DB 엔진 설정 (백엔드별 풀/연결 옵션)
+
+SQLALCHEMY_DATABASE_URI의 백엔드를 보고 SQLALCHEMY_ENGINE_OPTIONS를 만든다.
+Config.SQLALCHEMY_ENGINE_OPTIONS에 직접 적은 값이 항상 우선한다.
+
+- SQLite 파일: 연결마다 PRAGMA 적용 (WAL, synchronous=NORMAL, busy_timeout, mmap_size, cache_size).
+  WAL에서는 읽기와 쓰기(프레임 업로드마다의 StreamSession 갱신 등)가 서로 막지 않는다.
+  쓰기는 여전히 한 번에 하나이므로 busy_timeout 동안 대기 후 재시도한다.
+- SQLite 메모리: Flask-SQLAlchemy 기본값 (StaticPool) 그대로
+- PostgreSQL: QueuePool 크기/대기 시간/재활용, 연결 시 statement_timeout 등
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+def backend_name(uri):
+    """'sqlite' / 'postgresql' / 기타 드라이버 이름 (postgresql+psycopg2 → postgresql)"""
+    return make_url(uri).get_backend_name()
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def sqlite_pragmas(config):
+    """연결마다 실행할 PRAGMA (순서 유지)"""
+    return (
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE', -64000)),  # 음수 = KiB 단위
+        ('temp_store', 'MEMORY'),
+    )
+
+
+def engine_options(config):
+    """
+    백엔드에 맞는 SQLALCHEMY_ENGINE_OPTIONS
+
+    Args:
+        config: app.config (SQLALCHEMY_DATABASE_URI, SQLITE_* / DB_POOL_* 설정)
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    backend = backend_name(uri)
+    overrides = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    if backend == 'sqlite':
+        if is_memory_sqlite(uri):
+            options = {}
+        else:
+            # 연결 생성 비용이 작고 쓰기는 파일 잠금으로 직렬화되므로 풀은 스레드 수 정도면 충분.
+            # pysqlite의 timeout(초)도 busy_timeout과 맞춘다.
+            options = {
+                'poolclass': QueuePool,
+                'pool_size': config.get('SQLITE_POOL_SIZE', 10),
+                'max_overflow': config.get('SQLITE_MAX_OVERFLOW', 20),
+                'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+                'connect_args': {
+                    'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000,
+                    'check_same_thread': False,
+                },
+            }
+    elif backend == 'postgresql':
+        connect_args = {
+            'connect_timeout': config.get('DB_CONNECT_TIMEOUT', 10),
+            'application_name': config.get('DB_APPLICATION_NAME', 'safefall'),
+        }
+        statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', 30000)
+        if statement_timeout:
+            connect_args['options'] = f"-c statement_timeout={int(statement_timeout)}"
+        options = {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+            'pool_use_lifo': True,  # 유휴 연결은 풀 뒤쪽에 남아 서버 측 idle timeout으로 정리됨
+            'connect_args': connect_args,
+        }
+    else:
+        options = {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': True,
+        }
+
+    if 'connect_args' in overrides and 'connect_args' in options:
+        overrides['connect_args'] = {**options['connect_args'], **overrides['connect_args']}
+    options.update(overrides)
+    return options
+
+
+def install_sqlite_pragmas(engine, config):
+    """SQLite 엔진의 새 연결마다 PRAGMA 적용 (연결 전에 호출)"""
+    if engine.dialect.name != 'sqlite' or is_memory_sqlite(str(engine.url)):
+        return False
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return True
+
+
+def describe(engine):
+    """시작 로그용 요약 (journal_mode 등 실제 적용 값)"""
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            values = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in ('journal_mode', 'synchronous', 'busy_timeout')
+            }
+        return f"sqlite journal_mode={values['journal_mode']} synchronous={values['synchronous']} " \
+               f"busy_timeout={values['busy_timeout']}ms pool={engine.pool.__class__.__name__}"
+    return f"{engine.dialect.name} pool={engine.pool.__class__.__name__} size={getattr(engine.pool, 'size', lambda: '-')()}"
@@ -0,0 +1,134 @@
+"""
+사고 이벤트 pub/sub (프로세스 내)
+
+report/check/delete 핸들러가 커밋 직후 publish하고, SSE/롱폴링 구독자는
+Condition에서 대기하다가 새 이벤트가 생기면 깨어난다. 이벤트 사이에는 DB 조회가 없다.
+
+이벤트 ID는 "<epoch>-<seq>" 형식이며 Last-Event-ID 재개 커서로 쓰인다.
+epoch는 프로세스 시작 시각이므로 서버 재시작 전 커서나 보관 범위(EVENT_HISTORY_SIZE)를
+벗어난 커서는 이어갈 수 없고, 이때 구독자는 reset을 받아 /latest로 다시 동기화한다.
+워커 프로세스가 여러 개면 각 프로세스의 이벤트만 전달된다.
+"""
+import threading
+import time
+from collections import deque
+
+from config import Config
+from utils.metrics import registry
+
+EVENT_SUBSCRIBERS = registry.gauge(
+    'safefall_event_subscribers',
+    'Connected incident event stream clients (SSE + long-poll)'
+)
+EVENT_SUBSCRIBERS.set(0)
+
+
+class EventBus:
+    """순번이 붙은 이벤트를 최근 history개까지 보관하는 브로드캐스트 버스"""
+
+    def __init__(self, history=1000):
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.seq = 0
+        self.events = deque(maxlen=history)  # (seq, event)
+        self.cond = threading.Condition()
+
+    def event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, event_type, data):
+        """이벤트 추가 후 대기 중인 구독자를 모두 깨움 (이벤트 ID 반환)"""
+        with self.cond:
+            self.seq += 1
+            event = {
+                'id': self.event_id(self.seq),
+                'type': event_type,
+                'data': data,
+                'ts': time.time(),
+            }
+            self.events.append((self.seq, event))
+            self.cond.notify_all()
+            return event['id']
+
+    def cursor(self, last_event_id=None):
+        """
+        Last-Event-ID → 내부 순번
+
+        Returns:
+            (seq, resumable) - ID가 없으면 현재 위치부터, 다른 epoch이거나 형식이 잘못됐으면
+            resumable=False와 현재 위치
+        """
+        with self.cond:
+            current = self.seq
+        if not last_event_id:
+            return current, True
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > current:
+            return current, False
+        return int(seq), True
+
+    def _collect(self, seq):
+        """seq 이후 이벤트 (cond 보유 상태). 보관 범위를 벗어났으면 complete=False"""
+        if seq >= self.seq:
+            return [], True
+        oldest = self.events[0][0] if self.events else self.seq + 1
+        complete = oldest <= seq + 1
+        return [event for event_seq, event in self.events if event_seq > seq], complete
+
+    def wait(self, seq, timeout):
+        """
+        seq 이후 이벤트가 생길 때까지 최대 timeout초 대기
+
+        Returns:
+            (events, complete, cursor) - cursor는 다음 호출에 넘길 순번
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > seq, timeout)
+            events, complete = self._collect(seq)
+            return events, complete, self.seq
+
+
+incident_events = EventBus(Config.EVENT_HISTORY_SIZE)
+
+
+def incident_payload(incident):
+    """created 이벤트 데이터 (구독자가 DB 조회 없이 알림을 만들 수 있는 필드)"""
+    return {
+        'id': incident.id,
+        'user_id': incident.user_id,
+        'type': incident.incident_type,
+        'filename': incident.video_path,
+        'confidence': incident.confidence,
+        'isChecked': bool(incident.is_checked),
+        'createdAt': incident.detected_at.isoformat(),
+    }
+
+
+def publish_incident_created(incident):
+    return incident_events.publish('incident.created', incident_payload(incident))
+
+
+def publish_incident_checked(incident):
+    return incident_events.publish('incident.checked', {
+        'id': incident.id,
+        'user_id': incident.user_id,
+        'isChecked': bool(incident.is_checked),
+        'checkedAt': incident.checked_at.isoformat() if incident.checked_at else None,
+    })
+
+
+def publish_incident_deleted(incident_id, user_id):
+    return incident_events.publish('incident.deleted', {'id': incident_id, 'user_id': user_id})
+
+
+def publish_incidents_checked(incident_ids, user_id, checked, checked_at=None):
+    """벌크 확인/확인 취소 - 사고마다가 아니라 요청당 한 번"""
+    return incident_events.publish('incidents.checked', {
+        'ids': list(incident_ids),
+        'user_id': user_id,
+        'isChecked': bool(checked),
+        'checkedAt': checked_at.isoformat() if checked_at else None,
+    })
+
+
+def publish_incidents_deleted(incident_ids, user_id):
+    return incident_events.publish('incidents.deleted', {'ids': list(incident_ids), 'user_id': user_id})
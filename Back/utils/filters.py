@@ -0,0 +1,124 @@
+"""
+사고 필터 (목록 API와 벌크 작업 공용)
+
+필터 키: type, device_id, from, to, min_confidence, max_confidence, is_checked
+query string 값(문자열)과 JSON 값 모두 받는다. device_id는 쉼표로 여러 개 지정 가능.
+
+인덱스:
+    장치 지정 - idx_user_device_detected (user_id, device_id, detected_at, confidence)
+                기간/정렬은 인덱스 범위로, confidence 조건은 행 조회 없이 인덱스에서 거른다.
+    장치 없음 - idx_user_detected_at (user_id, detected_at)
+
+device_id는 원래 extra_data JSON 안에만 있었으므로 기존 DB는 ensure_device_column()이
+컬럼을 추가하고 extra_data 값으로 채운다.
+"""
+from datetime import datetime, timezone
+
+from models import db, Incident
+from utils.schema import add_missing_columns
+
+FILTER_KEYS = ('type', 'device_id', 'from', 'to', 'min_confidence', 'max_confidence', 'is_checked')
+
+
+def parse_time(name, value):
+    """ISO 8601 → UTC datetime (시간대 없으면 UTC). 잘못된 값이면 ValueError"""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError as e:
+        raise ValueError(f"Invalid {name}: {value}") from e
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _parse_confidence(name, value):
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid {name}: {value}") from e
+    if not 0.0 <= confidence <= 1.0:
+        raise ValueError(f"{name} must be between 0 and 1")
+    return confidence
+
+
+def _parse_bool(name, value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('true', '1', 'yes'):
+            return True
+        if lowered in ('false', '0', 'no'):
+            return False
+    raise ValueError(f"{name} must be a boolean")
+
+
+def incident_criteria(filters, allowed_types=None, model=Incident):
+    """
+    필터 dict → WHERE 조건 목록 (사용자 조건은 호출자가 추가)
+
+    Args:
+        filters: {키: 값} - None/빈 문자열 값은 무시
+        allowed_types: 허용 사고 유형 (None이면 검사 안 함)
+        model: Incident 또는 ArchivedIncident (archived=1 조회)
+
+    Raises:
+        ValueError: 알 수 없는 키 또는 잘못된 값
+    """
+    filters = {key: value for key, value in filters.items() if value is not None and value != ''}
+    unknown = [key for key in filters if key not in FILTER_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown filter keys: {', '.join(unknown)} (allowed: {', '.join(FILTER_KEYS)})")
+
+    criteria = []
+    if 'type' in filters:
+        if allowed_types is not None and filters['type'] not in allowed_types:
+            raise ValueError(f"Invalid type: {filters['type']}")
+        criteria.append(model.incident_type == filters['type'])
+    if 'device_id' in filters:
+        devices = filters['device_id']
+        if isinstance(devices, str):
+            devices = [device.strip() for device in devices.split(',') if device.strip()]
+        elif not isinstance(devices, list):
+            devices = [devices]
+        devices = [str(device) for device in devices]
+        if not devices:
+            raise ValueError("device_id must not be empty")
+        criteria.append(model.device_id == devices[0] if len(devices) == 1 else model.device_id.in_(devices))
+    if 'from' in filters:
+        criteria.append(model.detected_at >= parse_time('from', filters['from']))
+    if 'to' in filters:
+        criteria.append(model.detected_at < parse_time('to', filters['to']))
+    if 'min_confidence' in filters:
+        criteria.append(model.confidence >= _parse_confidence('min_confidence', filters['min_confidence']))
+    if 'max_confidence' in filters:
+        criteria.append(model.confidence <= _parse_confidence('max_confidence', filters['max_confidence']))
+    if 'is_checked' in filters:
+        criteria.append(model.is_checked == _parse_bool('is_checked', filters['is_checked']))
+    return criteria
+
+
+def ensure_device_column():
+    """
+    device_id 컬럼/인덱스가 없는 기존 DB 보정 + 컬럼을 추가한 경우 extra_data 값으로 채우기 (앱 시작 시)
+
+    응답 필드가 새로 생기는 것이라 변경 순번과 updated_at은 바꾸지 않는다 (델타 동기화 클라이언트는
+    다음 수정 때 device_id를 받음).
+
+    Returns:
+        채운 행 수
+    """
+    connection = db.session.connection()
+    added = add_missing_columns(
+        connection, 'incidents', {'device_id': 'VARCHAR(100)'},
+        indexes=[('idx_user_device_detected', 'user_id, device_id, detected_at, confidence')],
+    )
+    filled = 0
+    if added:
+        table = Incident.__table__
+        device = table.c.extra_data['device_id'].as_string()
+        filled = connection.execute(
+            table.update().where(device.isnot(None)).values(device_id=device, updated_at=table.c.updated_at)
+        ).rowcount
+    db.session.commit()
+    return filled
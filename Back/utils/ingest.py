@@ -0,0 +1,513 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from utils.log import get_logger
+from utils.metrics import FFMPEG_FAILURES
+
+log = get_logger('ingest')
+
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+# 파트 헤더 블록 최대 크기 (이보다 크면 손상된 스트림으로 간주)
+MAX_PART_HEADER_SIZE = 8 * 1024
+
+SEQ_MODULO = 2 ** 32
+
+
+class MJPEGStreamParser:
+    """
+    MJPEG 바이트 스트림 증분 파서
+
+    청크 단위로 들어오는 바이트를 feed()로 넣으면 완성된 프레임만 반환한다.
+    - boundary 지정 시: multipart 파트 단위 분리
+      (파트에 Content-Length 헤더가 있으면 그대로 사용, 없으면 다음 boundary까지)
+    - boundary 없음: JPEG SOI(FFD8)/EOI(FFD9) 마커로 분리
+      (ffmpeg -f mjpeg, rpicam-vid --codec mjpeg 출력)
+    """
+
+    def __init__(self, boundary=None, max_frame_size=10 * 1024 * 1024):
+        """
+        Args:
+            boundary: multipart boundary 문자열 (None이면 JPEG 마커 모드)
+            max_frame_size: 프레임 최대 크기 (바이트)
+        """
+        self.boundary = b'--' + boundary.encode('latin-1') if boundary else None
+        self.max_frame_size = max_frame_size
+
+        self.buffer = bytearray()
+        self._part_headers = None
+        self._scan_from = 0
+
+        # 통계
+        self.bytes_received = 0
+        self.frames_parsed = 0
+        self.bytes_discarded = 0
+
+    def feed(self, chunk):
+        """
+        청크 추가 후 완성된 프레임 반환
+
+        Args:
+            chunk: 수신한 바이트
+
+        Returns:
+            list: (frame_bytes, headers) 튜플 리스트. headers는 소문자 키 dict
+
+        Raises:
+            ValueError: 프레임 크기 초과 등 스트림 형식 오류
+        """
+        if chunk:
+            self.buffer += chunk
+            self.bytes_received += len(chunk)
+
+        frames = []
+        while True:
+            if self.boundary:
+                frame = self._next_part()
+            else:
+                frame = self._next_jpeg()
+            if frame is None:
+                break
+            frames.append(frame)
+
+        self.frames_parsed += len(frames)
+        return frames
+
+    def _discard(self, count):
+        """버퍼 앞쪽 count 바이트 폐기"""
+        if count > 0:
+            del self.buffer[:count]
+            self.bytes_discarded += count
+
+    def _next_jpeg(self):
+        buf = self.buffer
+
+        start = buf.find(JPEG_SOI)
+        if start == -1:
+            # 마커가 청크 경계에 걸칠 수 있으므로 마지막 1바이트만 남김
+            self._discard(len(buf) - 1)
+            self._scan_from = 0
+            return None
+        if start > 0:
+            self._discard(start)
+            self._scan_from = 0
+
+        end = buf.find(JPEG_EOI, max(self._scan_from, 2))
+        if end == -1:
+            if len(buf) > self.max_frame_size:
+                # 끝 마커 없이 너무 커진 경우 (손상된 프레임) 버리고 다음 SOI부터 재동기화
+                log.warning("mjpeg frame too large, resyncing", extra={'max_frame_size': self.max_frame_size})
+                self._discard(len(buf) - 1)
+                self._scan_from = 0
+                return None
+            self._scan_from = max(len(buf) - 1, 2)
+            return None
+
+        frame = bytes(buf[:end + 2])
+        del buf[:end + 2]
+        self._scan_from = 0
+        return frame, {}
+
+    def _next_part(self):
+        buf = self.buffer
+
+        if self._part_headers is None:
+            start = buf.find(self.boundary)
+            if start == -1:
+                # boundary가 청크 경계에 걸칠 수 있으므로 꼬리만 남김
+                self._discard(len(buf) - len(self.boundary) + 1)
+                return None
+
+            marker_end = start + len(self.boundary)
+            if len(buf) < marker_end + 2:
+                return None
+            if buf[marker_end:marker_end + 2] == b'--':
+                # 종료 boundary (--boundary--)
+                self._discard(marker_end + 2)
+                return None
+
+            header_end = buf.find(b'\r\n\r\n', start)
+            if header_end == -1:
+                if len(buf) - start > MAX_PART_HEADER_SIZE:
+                    raise ValueError('Multipart part headers too large')
+                return None
+
+            line_end = buf.find(b'\r\n', start)
+            headers = {}
+            for line in bytes(buf[line_end + 2:header_end]).split(b'\r\n'):
+                name, sep, value = line.partition(b':')
+                if sep:
+                    headers[name.strip().decode('latin-1').lower()] = value.strip().decode('latin-1')
+
+            del buf[:header_end + 4]
+            self._part_headers = headers
+            self._scan_from = 0
+
+        headers = self._part_headers
+
+        try:
+            length = int(headers['content-length'])
+        except (KeyError, ValueError):
+            length = None
+
+        if length is not None:
+            if length > self.max_frame_size:
+                raise ValueError(f'Frame too large: {length} bytes')
+            if len(buf) < length:
+                return None
+            frame = bytes(buf[:length])
+            del buf[:length]
+        else:
+            delimiter = b'\r\n' + self.boundary
+            idx = buf.find(delimiter, self._scan_from)
+            if idx == -1:
+                if len(buf) > self.max_frame_size:
+                    raise ValueError(f'Frame exceeded {self.max_frame_size} bytes without boundary')
+                self._scan_from = max(len(buf) - len(delimiter) + 1, 0)
+                return None
+            frame = bytes(buf[:idx])
+            del buf[:idx]
+
+        self._part_headers = None
+        self._scan_from = 0
+        return frame, headers
+
+
+class IngestStats:
+    """
+    수집 경로(장기 연결 업로드, ffmpeg 소스 등)별 처리량 통계
+
+    재연결 후에도 같은 key로 누적되며, 시퀀스 번호를 기억해
+    재전송된 프레임을 중복으로 걸러낸다.
+    """
+
+    def __init__(self, key, device_id):
+        self.key = key
+        self.device_id = device_id
+        self.lock = threading.Lock()
+
+        self.active = False
+        self.connections = 0
+        self.frames = 0
+        self.bytes = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.last_seq = None
+        self.last_error = None
+        self.last_frame_at = None
+
+        # 현재 연결 통계
+        self.connection_started = None
+        self.connection_frames = 0
+        self.connection_bytes = 0
+
+    def connection_opened(self):
+        """연결 시작"""
+        with self.lock:
+            self.active = True
+            self.connections += 1
+            self.connection_started = time.monotonic()
+            self.connection_frames = 0
+            self.connection_bytes = 0
+
+    def connection_closed(self, error=None):
+        """연결 종료"""
+        with self.lock:
+            self.active = False
+            if error:
+                self.errors += 1
+                self.last_error = str(error)
+
+    def is_duplicate(self, seq, pending_seq=None):
+        """
+        이미 저장된 시퀀스인지 확인 (중복이면 duplicates 증가)
+
+        Args:
+            seq: 디바이스 시퀀스 번호 (없으면 항상 False)
+            pending_seq: 아직 record_frame() 전인 묶음의 마지막 시퀀스 (있으면 last_seq 대신 비교)
+        """
+        if seq is None:
+            return False
+        with self.lock:
+            last_seq = pending_seq if pending_seq is not None else self.last_seq
+            # 32비트 wrap-around를 고려한 비교
+            if last_seq is not None and (last_seq - seq) % SEQ_MODULO < SEQ_MODULO // 2:
+                self.duplicates += 1
+                return True
+            return False
+
+    def record_frame(self, size, seq=None):
+        """
+        프레임 수신 기록 (저장이 끝난 뒤 호출 - last_seq는 재전송 중복 판단 기준)
+
+        Args:
+            size: 프레임 크기 (바이트)
+            seq: 디바이스 시퀀스 번호 (없으면 중복 검사 생략)
+
+        Returns:
+            bool: 새 프레임이면 True, 이미 받은 시퀀스면 False
+        """
+        with self.lock:
+            if seq is not None and self.last_seq is not None:
+                # 32비트 wrap-around를 고려한 비교
+                if (self.last_seq - seq) % SEQ_MODULO < SEQ_MODULO // 2:
+                    self.duplicates += 1
+                    return False
+
+            if seq is not None:
+                self.last_seq = seq
+            self.frames += 1
+            self.bytes += size
+            self.connection_frames += 1
+            self.connection_bytes += size
+            self.last_frame_at = datetime.now(timezone.utc)
+            return True
+
+    def to_dict(self):
+        """통계 딕셔너리 반환"""
+        with self.lock:
+            elapsed = (
+                time.monotonic() - self.connection_started
+                if self.connection_started is not None else 0
+            )
+            return {
+                'key': self.key,
+                'device_id': self.device_id,
+                'active': self.active,
+                'connections': self.connections,
+                'frames': self.frames,
+                'bytes': self.bytes,
+                'duplicates': self.duplicates,
+                'errors': self.errors,
+                'last_seq': self.last_seq,
+                'last_error': self.last_error,
+                'last_frame_at': self.last_frame_at.isoformat() if self.last_frame_at else None,
+                'connection': {
+                    'duration_seconds': round(elapsed, 2),
+                    'frames': self.connection_frames,
+                    'bytes': self.connection_bytes,
+                    'fps': round(self.connection_frames / elapsed, 2) if elapsed > 0 else 0,
+                    'bytes_per_second': round(self.connection_bytes / elapsed) if elapsed > 0 else 0,
+                },
+            }
+
+
+class FFmpegIngestWorker:
+    """
+    ffmpeg 서브프로세스로 외부 소스(RTSP 카메라, HTTP MJPEG, 로컬 파일)를 읽어
+    MJPEG 프레임을 콜백으로 전달하는 수집 워커
+
+    ffmpeg가 종료되거나 실패하면 지수 백오프로 재시작한다 (supervised restart).
+    """
+
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, name, url, device_id, on_frames, ffmpeg_path='ffmpeg',
+                 fps=None, jpeg_quality=5, loop_files=True, app=None,
+                 restart_delay=1, max_restart_delay=30):
+        """
+        Args:
+            name: 소스 이름 (통계 키)
+            url: ffmpeg 입력 URL (rtsp://, http://, 파일 경로)
+            device_id: 프레임을 기록할 디바이스 ID
+            on_frames: 콜백 (device_id, [(frame_bytes, capture_ts, seq), ...])
+            ffmpeg_path: ffmpeg 실행 파일
+            fps: 출력 프레임레이트 제한 (None이면 원본 유지)
+            jpeg_quality: ffmpeg MJPEG 품질 (-q:v, 2~31, 낮을수록 고품질)
+            loop_files: 로컬 파일을 반복 재생할지 여부
+            app: 콜백을 실행할 Flask 앱 (DB 세션 사용 시 필요)
+            restart_delay: 첫 재시작 대기 (초)
+            max_restart_delay: 최대 재시작 대기 (초)
+        """
+        self.name = name
+        self.url = url
+        self.device_id = device_id
+        self.on_frames = on_frames
+        self.ffmpeg_path = ffmpeg_path
+        self.fps = fps
+        self.jpeg_quality = jpeg_quality
+        self.loop_files = loop_files
+        self.app = app
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+
+        self.stats = IngestStats(name, device_id)
+        self.restarts = 0
+        self.process = None
+        self.stderr_tail = deque(maxlen=5)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_file_source(self):
+        return '://' not in self.url or self.url.startswith('file://')
+
+    def build_command(self):
+        """ffmpeg 명령어 생성"""
+        cmd = [self.ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-nostdin']
+
+        if self.url.startswith('rtsp://'):
+            # UDP 손실로 인한 프레임 깨짐 방지
+            cmd += ['-rtsp_transport', 'tcp']
+        if self.is_file_source:
+            # 파일은 실시간 속도로 재생 (카메라와 동일한 타이밍)
+            cmd += ['-re']
+            if self.loop_files:
+                cmd += ['-stream_loop', '-1']
+
+        cmd += ['-i', self.url]
+
+        if self.fps:
+            cmd += ['-vf', f'fps={self.fps}']
+
+        cmd += ['-an', '-f', 'mjpeg', '-q:v', str(self.jpeg_quality), '-']
+        return cmd
+
+    def start(self):
+        """워커 스레드 시작"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._supervise, name=f'Ingest-{self.name}', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """워커 정지 (ffmpeg 종료)"""
+        self._stop.set()
+        self._terminate()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def restart(self):
+        """현재 ffmpeg 프로세스를 종료해 supervisor가 즉시 재시작하도록 함"""
+        self._terminate()
+
+    def _terminate(self):
+        process = self.process
+        if process and process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=3)
+            except Exception:
+                process.kill()
+
+    def _supervise(self):
+        if self.app is not None:
+            with self.app.app_context():
+                self._supervise_loop()
+        else:
+            self._supervise_loop()
+
+    def _supervise_loop(self):
+        delay = self.restart_delay
+        while not self._stop.is_set():
+            started = time.monotonic()
+            error = None
+            try:
+                self._run_once()
+            except Exception as e:
+                error = e
+
+            returncode = self.process.returncode if self.process else None
+            if error is None and returncode not in (0, None, -15):
+                error = f"ffmpeg exited with code {returncode}: {' | '.join(self.stderr_tail)}"
+            if error is not None:
+                FFMPEG_FAILURES.inc(operation='ingest')
+            self.stats.connection_closed(error)
+
+            if self._stop.is_set():
+                break
+
+            # 충분히 오래 동작했으면 백오프 초기화
+            if time.monotonic() - started > self.max_restart_delay:
+                delay = self.restart_delay
+
+            log.warning("ingest source stopped", extra={
+                'source': self.name, 'error': str(error) if error else 'end of stream', 'restart_in': delay
+            })
+            self.restarts += 1
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def _run_once(self):
+        import subprocess
+
+        self.stderr_tail.clear()
+        self.process = subprocess.Popen(
+            self.build_command(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.stats.connection_opened()
+        log.info("ingest source started", extra={'source': self.name, 'pid': self.process.pid, 'url': self.url})
+
+        stderr_thread = threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True)
+        stderr_thread.start()
+
+        parser = MJPEGStreamParser()
+        stdout = self.process.stdout
+        while not self._stop.is_set():
+            chunk = stdout.read1(self.READ_SIZE)
+            if not chunk:
+                break
+
+            frames = []
+            for frame_bytes, _headers in parser.feed(chunk):
+                self.stats.record_frame(len(frame_bytes))
+                # 로컬 ffmpeg 출력이므로 캡처 시각/시퀀스 없이 서버 수신 시각 사용
+                frames.append((frame_bytes, None, None))
+
+            if frames:
+                self.on_frames(self.device_id, frames)
+
+        self.process.wait()
+        stderr_thread.join(timeout=1)
+
+    def _drain_stderr(self, process):
+        for line in process.stderr:
+            line = line.decode('utf-8', 'replace').strip()
+            if line:
+                self.stderr_tail.append(line)
+
+    def to_dict(self):
+        """소스 상태 및 통계"""
+        stats = self.stats.to_dict()
+        stats.update({
+            'name': self.name,
+            'url': self.url,
+            'restarts': self.restarts,
+            'pid': self.process.pid if self.process and self.process.poll() is None else None,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'stderr_tail': list(self.stderr_tail),
+        })
+        return stats
+
+
+def parse_ingest_sources(value):
+    """
+    INGEST_SOURCES 설정 파싱
+
+    형식: "name=url,name2=url2" (name은 device_id로도 사용)
+
+    Returns:
+        list: (name, url) 튜플 리스트
+    """
+    sources = []
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, url = entry.partition('=')
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f'Invalid ingest source entry: {entry!r} (expected name=url)')
+        sources.append((name.strip(), url.strip()))
+    return sources
@@ -0,0 +1,212 @@
+"""
+구조화 + 레벨 + 샘플링 로깅
+
+핫 패스(프레임 업로드, 스트리밍 요청, 영상 Range 요청)는 print 대신
+get_logger()로 얻은 로거에 DEBUG 레벨로 기록한다. 운영(LOG_LEVEL=INFO)에서는
+레벨 검사에서 바로 버려지므로 비용이 거의 없다.
+
+- 레코드의 extra 필드는 key=value(또는 JSON) 구조화 필드로 출력된다
+- extra에 route가 있으면 LOG_SAMPLE_RATES의 라우트 접두사별 비율로 샘플링된다
+- 같은 로거/메시지 템플릿은 초당 LOG_RATE_LIMIT건으로 제한된다 (WARNING 이상 제외)
+- 실제 출력은 QueueListener 스레드가 담당하므로 요청 스레드는 stdout에 쓰지 않는다
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+
+
+ROOT_LOGGER = 'safefall'
+
+# LogRecord 기본 속성 - 이 외의 속성은 extra로 전달된 구조화 필드로 간주
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name):
+    """safefall.<name> 로거 반환"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def _extra_fields(record):
+    return {
+        key: value for key, value in record.__dict__.items()
+        if key not in _RESERVED_ATTRS and not key.startswith('_')
+    }
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`시각 레벨 로거 메시지 key=value ...` 형식"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 형식 (로그 수집기용)"""
+
+    def format(self, record):
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    라우트별 샘플링 + 메시지별 초당 건수 제한
+
+    WARNING 이상은 항상 통과한다.
+    """
+
+    def __init__(self, sample_rates=None, rate_limit=0):
+        """
+        Args:
+            sample_rates: {라우트 접두사: 0~1 비율} - 가장 긴 접두사가 적용됨
+            rate_limit: 로거+메시지 템플릿별 초당 최대 건수 (0이면 제한 없음)
+        """
+        super().__init__()
+        self.sample_rates = sorted((sample_rates or {}).items(), key=lambda item: -len(item[0]))
+        self.rate_limit = rate_limit
+        self.suppressed = 0
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, route):
+        for prefix, rate in self.sample_rates:
+            if route.startswith(prefix):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        route = getattr(record, 'route', None)
+        if route is not None and self.sample_rates:
+            rate = self._sample_rate(route)
+            if rate < 1.0 and random.random() >= rate:
+                return False
+
+        if self.rate_limit:
+            key = (record.name, record.msg)
+            now = int(time.monotonic())
+            with self._lock:
+                window, count = self._windows.get(key, (now, 0))
+                if window != now:
+                    window, count = now, 0
+                if count >= self.rate_limit:
+                    self.suppressed += 1
+                    return False
+                self._windows[key] = (window, count + 1)
+
+        return True
+
+
+class StdoutHandler(logging.StreamHandler):
+    """출력 시점의 sys.stdout에 기록 (redirect_stdout 등 교체된 stdout 반영)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 블로킹/예외 없이 레코드를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 포맷은 리스너 스레드에서 수행 (요청 스레드 비용 최소화)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sample_rates(value):
+    """
+    LOG_SAMPLE_RATES 파싱
+
+    형식: "/api/stream/upload=0.01,/api/stream=0.1"
+    """
+    rates = {}
+    for item in (value or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        prefix, sep, rate = item.rpartition('=')
+        if not sep or not prefix:
+            raise ValueError(f'Invalid LOG_SAMPLE_RATES entry: {item!r} (expected route=rate)')
+        rates[prefix.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def setup_logging(config):
+    """
+    safefall 로거 구성 (여러 번 호출해도 한 번만 적용)
+
+    Args:
+        config: LOG_LEVEL, LOG_DEBUG_LOGGERS, LOG_FORMAT, LOG_SAMPLE_RATES,
+            LOG_RATE_LIMIT, LOG_QUEUE_SIZE를 가진 설정 (app.config)
+    """
+    global _listener
+
+    with _setup_lock:
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(str(config.get('LOG_LEVEL', 'INFO')).upper())
+        for name in (config.get('LOG_DEBUG_LOGGERS') or '').split(','):
+            if name.strip():
+                get_logger(name.strip()).setLevel(logging.DEBUG)
+        if _listener is not None:
+            return logger
+
+        stream_handler = StdoutHandler()
+        if config.get('LOG_FORMAT', 'text') == 'json':
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(KeyValueFormatter())
+
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=config.get('LOG_QUEUE_SIZE', 10000)))
+        queue_handler.addFilter(SamplingFilter(
+            parse_sample_rates(config.get('LOG_SAMPLE_RATES', '')),
+            rate_limit=config.get('LOG_RATE_LIMIT', 0)
+        ))
+
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+        _listener.start()
+        return logger
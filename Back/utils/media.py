@@ -0,0 +1,528 @@
+"""
+사고 영상 파일 메타데이터 (크기, SHA-256, 존재 여부)
+
+클립을 저장할 때 record_media()로 Incident에 기록하고, MediaReconciler 스레드가
+주기적으로 파일과 비교해 바뀐 행만 갱신한다. 목록 API(/api/videos/saved 등)는
+이 컬럼만 읽으므로 요청 처리 중 파일시스템을 건드리지 않는다.
+
+파일 크기/mtime이 그대로면 해시를 다시 계산하지 않는다.
+
+반대 방향(디스크에는 있지만 DB에 없는 파일)은 DirectoryScanner가 맡는다.
+디렉터리 mtime이 그대로면 목록을 읽지 않고, 바뀌었으면 이름 집합 차이만 DB와 비교한다.
+
+벌크 삭제된 사고의 파일은 file_cleaner가 요청 밖에서 지운다.
+
+스캔/리컨사일 배치와 보관 배치(utils/archive.py)는 maintenance_lock으로 직렬화한다
+(읽은 행이 커밋 전에 보관 테이블로 옮겨져 ORM 갱신이 StaleDataError로 실패하지 않도록).
+"""
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+
+from models import db, Incident, ArchivedIncident
+from utils.cache import invalidate_user
+from utils.log import get_logger
+from utils.schema import add_missing_columns
+from utils.sync import bump_change_seq
+
+log = get_logger('media')
+
+HASH_CHUNK = 1024 * 1024
+VIDEO_EXTENSIONS = ('.mp4', '.avi')
+IN_CHUNK = 500
+
+_table = Incident.__table__
+
+# 백그라운드 사고 쓰기 작업(디렉터리 스캔, 리컨사일 배치, 보관 배치) 직렬화 - 프로세스 안에서만 유효
+maintenance_lock = threading.Lock()
+
+
+def fingerprint(path, with_hash=True):
+    """
+    파일 (size, mtime, sha256) - 파일이 없으면 None
+
+    with_hash=False면 sha256은 None (stat만 수행)
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    digest = None
+    if with_hash:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+    return stat.st_size, stat.st_mtime, digest
+
+
+def record_media(incident, path):
+    """방금 저장한 클립의 메타데이터를 incident에 기록 (커밋은 호출자)"""
+    info = fingerprint(path)
+    if info is None:
+        incident.media_present = False
+        return False
+    incident.video_size, incident.video_mtime, incident.video_sha256 = info
+    incident.media_present = True
+    return True
+
+
+def _reconcile_row(incident, videos_dir):
+    """
+    파일과 비교해 바뀐 값 dict 반환 (변경 없으면 빈 dict)
+
+    mtime/크기가 같고 해시가 있으면 stat 한 번으로 끝난다.
+    """
+    if not incident.video_path:
+        return {'media_present': False} if incident.media_present is not False else {}
+
+    path = os.path.join(videos_dir, incident.video_path)
+    info = fingerprint(path, with_hash=False)
+    if info is None:
+        return {'media_present': False} if incident.media_present is not False else {}
+
+    size, mtime, _ = info
+    unchanged = (
+        incident.media_present
+        and incident.video_size == size
+        and incident.video_mtime == mtime
+        and incident.video_sha256
+    )
+    if unchanged:
+        return {}
+
+    info = fingerprint(path)
+    if info is None:  # stat과 해시 사이에 삭제됨
+        return {'media_present': False}
+    size, mtime, digest = info
+    return {'video_size': size, 'video_mtime': mtime, 'video_sha256': digest, 'media_present': True}
+
+
+def _incidents_for_update(*criteria):
+    """갱신용 Incident 로드 (BLOB 제외)"""
+    return (
+        Incident.query.options(defer(Incident.video_blob), defer(Incident.thumbnail_blob))
+        .filter(*criteria)
+        .all()
+    )
+
+
+def _chunks(items, size=IN_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def mark_media_missing(video_paths):
+    """
+    파일이 사라진 사고를 media_present=False로 표시 (앱 컨텍스트 필요)
+
+    IN 묶음별 Core UPDATE 후 한 번 커밋한다. 그 사이 삭제/보관된 행은 조건에 걸리지 않고 건너뛴다
+    (ORM 갱신처럼 StaleDataError가 나지 않음). 세션 이벤트를 거치지 않으므로 변경 순번과
+    응답 캐시 무효화는 벌크 작업(utils/bulk.py)처럼 직접 한다 (카운터는 영향 없음).
+
+    Returns:
+        표시한 사고 수
+    """
+    connection = db.session.connection()
+    rows = []
+    try:
+        for chunk in _chunks(video_paths):
+            criteria = (_table.c.video_path.in_(chunk), _table.c.media_present.isnot(False))
+            statement = _table.update().values(media_present=False)
+            if connection.dialect.update_returning:
+                rows.extend(connection.execute(
+                    statement.where(*criteria).returning(_table.c.id, _table.c.user_id)
+                ).all())
+                continue
+            found = connection.execute(select(_table.c.id, _table.c.user_id).where(*criteria)).all()
+            if found:
+                connection.execute(statement.where(_table.c.id.in_([row.id for row in found]), *criteria[1:]))
+                rows.extend(found)
+        bump_change_seq(connection, sorted(row.id for row in rows))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for user_id in {row.user_id for row in rows}:
+        invalidate_user(user_id)
+    return len(rows)
+
+
+def reconcile_media(videos_dir, batch_size=200):
+    """
+    전체 사고의 영상 메타데이터를 파일과 맞춤 (앱 컨텍스트 필요)
+
+    id 순으로 batch_size씩 읽고, 값이 바뀐 행만 ORM으로 갱신/커밋한다
+    (변경 순번·응답 캐시 무효화가 함께 적용됨). 배치마다 maintenance_lock을 잡는다.
+
+    Returns:
+        {'checked', 'updated', 'missing'}
+    """
+    checked = updated = missing = 0
+    last_id = 0
+    columns = (
+        Incident.id, Incident.video_path, Incident.video_size,
+        Incident.video_mtime, Incident.video_sha256, Incident.media_present,
+    )
+
+    while True:
+        with maintenance_lock:
+            rows = (
+                db.session.query(*columns)
+                .filter(Incident.id > last_id)
+                .order_by(Incident.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            changes = {}
+            for row in rows:
+                checked += 1
+                values = _reconcile_row(row, videos_dir)
+                if values:
+                    changes[row.id] = values
+
+            for incident in _incidents_for_update(Incident.id.in_(changes)) if changes else ():
+                values = changes[incident.id]
+                for name, value in values.items():
+                    setattr(incident, name, value)
+                updated += 1
+                if values.get('media_present') is False:
+                    missing += 1
+            db.session.commit()
+
+    return {'checked': checked, 'updated': updated, 'missing': missing}
+
+
+class DirectoryScanner:
+    """
+    영상 디렉터리 → DB 증분 스캔 (프로세스당 하나, 앱 컨텍스트 필요)
+
+    - 워터마크: 디렉터리 (st_dev, st_ino, st_mtime_ns). 파일 추가/삭제/이름 변경 시에만 바뀌므로
+      같으면 목록도 읽지 않는다 (제자리 수정은 reconcile_media()가 확인).
+    - 목록이 바뀌었으면 이름만 읽어 지난 스캔의 이름 집합과 비교하고,
+      새 이름은 video_path만 조회해 미등록 파일을 찾고, 사라진 이름은 media_present=False로 표시한다.
+    - 미등록 파일은 한 번에 max_files개까지 한 트랜잭션으로 등록한다. 남은 파일과 막 생성된 파일
+      (grace_seconds 이내 - 아직 쓰는 중이거나 report 커밋 전일 수 있음)은 다음 스캔으로 넘긴다.
+
+    첫 스캔(또는 full=True)은 video_path 전체를 한 번 읽어 디렉터리와 양방향으로 비교한다.
+    보관된 사고(incidents_archive)의 파일도 등록된 것으로 본다.
+    file_cleaner가 지울 예정이거나 지우지 못한 파일(삭제된 사고의 파일)은 다시 등록하지 않는다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watermark = None
+        self.known = None  # 처리를 마친 파일 이름 집합 (None이면 아직 스캔 전)
+        self.last_result = None
+
+    def reset(self):
+        with self.lock:
+            self.watermark = None
+            self.known = None
+
+    def scan(self, videos_dir, user_id, max_files=500, grace_seconds=120, full=False):
+        """
+        Returns:
+            {'skipped', 'total_videos', 'new_entries', 'missing_found', 'registered',
+             'failed', 'media_missing', 'pending'}
+        """
+        with self.lock, maintenance_lock:
+            result = self._scan(videos_dir, user_id, max_files, grace_seconds, full)
+            self.last_result = result
+            return result
+
+    def _scan(self, videos_dir, user_id, max_files, grace_seconds, full):
+        stat = os.stat(videos_dir)
+        watermark = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        result = {
+            'skipped': False, 'total_videos': None, 'new_entries': 0, 'missing_found': 0,
+            'registered': [], 'failed': [], 'media_missing': 0, 'pending': 0,
+        }
+        first = full or self.known is None
+        if not first and watermark == self.watermark:
+            result['skipped'] = True
+            return result
+
+        names = {
+            entry.name for entry in os.scandir(videos_dir)
+            if entry.name.lower().endswith(VIDEO_EXTENSIONS) and entry.is_file()
+        }
+        result['total_videos'] = len(names)
+
+        if first:
+            # 파일 이름만 조회 (BLOB/ORM 객체 없음)
+            registered = set(db.session.execute(db.select(Incident.video_path)).scalars())
+            vanished = registered - names
+            registered.update(db.session.execute(db.select(ArchivedIncident.video_path)).scalars())
+            added = names
+        else:
+            added = names - self.known
+            vanished = self.known - names
+            registered = set()
+            for chunk in _chunks(added):
+                for model in (Incident, ArchivedIncident):
+                    registered.update(db.session.execute(
+                        db.select(model.video_path).where(model.video_path.in_(chunk))
+                    ).scalars())
+        result['new_entries'] = len(added)
+
+        # 삭제된 사고의 파일 - 처리한 것으로 보고 known에 남긴다 (삭제되면 다음 스캔에서 사라진 이름이 됨)
+        deleting = (added - registered) & file_cleaner.busy_names()
+        unregistered = sorted(added - registered - deleting)
+        result['missing_found'] = len(unregistered)
+        young_before = time.time() - grace_seconds
+        pending = set(unregistered[max_files:])
+        incidents = []
+        for name in unregistered[:max_files]:
+            path = os.path.join(videos_dir, name)
+            info = fingerprint(path, with_hash=False)
+            if info is None:  # 목록을 읽은 뒤 삭제됨
+                continue
+            if info[1] > young_before:
+                pending.add(name)
+                continue
+            incident = Incident(
+                user_id=user_id,
+                incident_type="fall",  # 기본 타입
+                device_id="sync",
+                detected_at=datetime.fromtimestamp(info[1], tz=timezone.utc),
+                video_path=name,
+                duration=30.0,  # 기본값
+                confidence=0.90,
+                extra_data={"device_id": "sync", "source": "filesystem_sync"},
+            )
+            record_media(incident, path)
+            incidents.append(incident)
+
+        timestamps = [incident.detected_at.isoformat() for incident in incidents]  # 커밋 후 만료되기 전 (UTC 오프셋 유지)
+        # 등록은 ORM 경유 (카운터/변경 순번/캐시 무효화 포함)
+        db.session.add_all(incidents)
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log.warning("directory scan commit failed", extra={'files': len(incidents), 'error': str(e)})
+            result['failed'] = [{'filename': incident.video_path, 'error': str(e)} for incident in incidents]
+            pending.update(incident.video_path for incident in incidents)
+            incidents = []
+
+        # 다음 커밋에서 다시 만료되기 전에 id를 읽어 둔다
+        result['registered'] = [
+            {'filename': incident.video_path, 'incident_id': incident.id, 'timestamp': timestamp}
+            for incident, timestamp in zip(incidents, timestamps)
+        ]
+
+        # 사라진 파일 표시는 별도 트랜잭션 (실패하면 워터마크 없이 다음 스캔에서 다시 시도)
+        retry = False
+        try:
+            result['media_missing'] = mark_media_missing(vanished) if vanished else 0
+        except Exception as e:
+            log.warning("directory scan missing-media update failed", extra={'files': len(vanished), 'error': str(e)})
+            vanished, retry = set(), True
+
+        result['pending'] = len(pending)
+
+        # 처리하지 못한 이름은 known에서 빼서 다음 스캔에 다시 보이게 한다
+        # (첫 스캔의 표시 실패는 known에서 알 수 없으므로 다음에 전체 비교)
+        if retry and first:
+            self.known = None
+        else:
+            self.known = (names - pending) if first else (self.known - vanished) | (added - pending)
+        # 남은 파일이 없고 mtime이 충분히 지난 경우에만 워터마크 저장
+        # (같은 mtime 틱 안에 추가된 파일을 놓치지 않도록)
+        settled = stat.st_mtime_ns < (time.time() - 2) * 1e9
+        self.watermark = watermark if not pending and not retry and settled else None
+
+        if incidents or result['media_missing'] or result['failed']:
+            log.info("videos directory scanned", extra={
+                'total': len(names), 'new_entries': len(added), 'registered': len(incidents),
+                'media_missing': result['media_missing'], 'pending': len(pending),
+            })
+        return result
+
+
+directory_scanner = DirectoryScanner()
+
+
+class MediaReconciler:
+    """주기적으로 디렉터리 스캔 + reconcile_media()를 실행하는 데몬 스레드"""
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_result = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.thread = threading.Thread(target=self._run, name='MediaReconciler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def run_once(self):
+        with self.app.app_context():
+            config = self.app.config
+            try:
+                if config.get('MEDIA_SCAN_USER_ID') and os.path.isdir(config['VIDEOS_DIR']):
+                    directory_scanner.scan(
+                        config['VIDEOS_DIR'], config['MEDIA_SCAN_USER_ID'],
+                        config.get('MEDIA_SCAN_MAX_FILES', 500), config.get('MEDIA_SCAN_GRACE_SECONDS', 120),
+                    )
+                self.last_result = reconcile_media(
+                    self.app.config['VIDEOS_DIR'], self.app.config.get('MEDIA_RECONCILE_BATCH', 200)
+                )
+            except Exception as e:
+                db.session.rollback()
+                log.warning("media reconcile failed", extra={'error': str(e)})
+                return None
+            finally:
+                db.session.remove()
+        if self.last_result['updated']:
+            log.info("media reconciled", extra=self.last_result)
+        return self.last_result
+
+    def _run(self):
+        # 시작 직후 한 번 실행 (컬럼 추가 직후의 NULL 값 채우기)
+        while not self.stop_event.is_set():
+            self.run_once()
+            self.stop_event.wait(self.interval)
+
+
+def _media_path(base_dir, filename):
+    """base_dir 안의 경로만 허용 (경로 순회 방지)"""
+    if os.path.isabs(filename) or '..' in filename.replace('\\', '/').split('/'):
+        raise ValueError(f"Invalid media path: {filename}")
+    base = os.path.realpath(base_dir)
+    path = os.path.realpath(os.path.join(base, filename))
+    if os.path.commonpath([base, path]) != base:
+        raise ValueError(f"Path is outside the media directory: {filename}")
+    return path
+
+
+class FileCleaner:
+    """
+    삭제된 사고의 영상/썸네일 파일을 지우는 데몬 스레드 (첫 submit 시 시작)
+
+    삭제 대기 중인 이름과 삭제에 실패한 이름을 기억해 DirectoryScanner가 다시 등록하지 않게 한다.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.pending = Counter()  # 큐에 있거나 지우는 중인 이름 (같은 이름이 여러 번 예약될 수 있음)
+        self.failed = set()
+
+    def busy_names(self):
+        """삭제 대기 중이거나 삭제에 실패한 파일 이름 집합"""
+        with self.lock:
+            return set(self.pending) | self.failed
+
+    def submit(self, base_dir, filenames):
+        """파일 삭제 예약 (커밋 후 호출). 예약한 파일 수 반환"""
+        filenames = [name for name in filenames if name]
+        if not filenames:
+            return 0
+        with self.lock:
+            self.pending.update(filenames)
+        self.queue.put((base_dir, filenames))
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='FileCleaner', daemon=True)
+                self.thread.start()
+        return len(filenames)
+
+    def join(self):
+        """예약된 삭제가 모두 끝날 때까지 대기"""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            base_dir, filenames = self.queue.get()
+            removed = failed = 0
+            try:
+                for name in filenames:
+                    ok = True
+                    try:
+                        os.remove(_media_path(base_dir, name))
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+                    except (OSError, ValueError) as e:
+                        ok = False
+                        failed += 1
+                        log.warning("media file delete failed", extra={'file': name, 'error': str(e)})
+                    with self.lock:
+                        self.pending[name] -= 1
+                        if self.pending[name] <= 0:
+                            del self.pending[name]
+                        if ok:
+                            self.failed.discard(name)
+                        else:
+                            self.failed.add(name)
+                log.info("media files deleted", extra={'removed': removed, 'failed': failed})
+            finally:
+                self.queue.task_done()
+
+
+file_cleaner = FileCleaner()
+
+media_reconciler = None
+_reconciler_lock = threading.Lock()
+
+
+def ensure_media_columns():
+    """기존 DB에 영상 메타데이터 컬럼 추가 (앱 시작 시)"""
+    added = add_missing_columns(db.session.connection(), 'incidents', {
+        'video_size': 'BIGINT',
+        'video_mtime': 'FLOAT',
+        'video_sha256': 'VARCHAR(64)',
+        'media_present': 'BOOLEAN',
+    }, indexes=[('idx_video_path', 'video_path')])
+    db.session.commit()
+    return added
+
+
+def init_media_reconciler(app):
+    """
+    첫 요청 시 리컨사일러 시작 (MEDIA_RECONCILE_INTERVAL이 0이면 비활성화)
+
+    수집 워커와 같은 이유로 create_app()에서 바로 시작하지 않는다
+    (마이그레이션 스크립트, 디버그 리로더 부모 프로세스).
+    """
+    if not app.config.get('MEDIA_RECONCILE_INTERVAL'):
+        return
+
+    @app.before_request
+    def _start_media_reconciler():
+        global media_reconciler
+        if media_reconciler is not None:
+            return
+        with _reconciler_lock:
+            if media_reconciler is None:
+                media_reconciler = MediaReconciler(
+                    current_app._get_current_object(), app.config['MEDIA_RECONCILE_INTERVAL']
+                ).start()
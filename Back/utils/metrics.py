@@ -0,0 +1,297 @@
+"""
+Prometheus 텍스트 포맷 메트릭 레지스트리
+
+외부 의존성 없이 Counter / Gauge / Histogram을 제공한다.
+각 메트릭은 자체 락을 가지며 락 안에서는 딕셔너리 갱신만 수행하므로
+프레임 수신 같은 핫 패스에서도 비용이 작다.
+버퍼 점유율처럼 스크랩 시점에 계산하면 되는 값은 collector로 등록한다.
+"""
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.log import get_logger
+
+log = get_logger('metrics')
+
+
+# 요청 지연 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 사고 영상 파이프라인 단계 버킷 (초) - ffmpeg 변환은 수십 초까지 걸릴 수 있음
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    """샘플 값을 텍스트 포맷으로 변환"""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    """라벨 값 이스케이프"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    """메트릭 공통 부분 (이름, 설명, 라벨)"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name}: expected labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def remove(self, **labels):
+        """라벨 조합 제거 (사라진 디바이스 등)"""
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """임의로 증감하는 값"""
+
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 카운트(+Inf 포함), 합계, 개수]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간을 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        bounds = self.buckets + (math.inf,)
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 및 스크랩 시점 collector 모음"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # 모듈 재로딩 시 같은 메트릭 재사용
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """
+        스크랩 시 호출될 collector 등록
+
+        collector()는 (name, type, help, [(labels_dict, value), ...]) 튜플 리스트를 반환한다.
+        같은 이름의 collector는 교체된다 (블루프린트 모듈 재로딩 대비).
+        """
+        key = f'{collector.__module__}.{collector.__qualname__}'
+        with self._lock:
+            self._collectors[key] = collector
+
+    def render(self):
+        """전체 메트릭을 텍스트 포맷으로 반환"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                log.warning("metrics collector failed", extra={
+                    'collector': getattr(collector, '__name__', repr(collector)), 'error': str(e)
+                })
+                continue
+            for name, type_name, documentation, samples in families:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {type_name}')
+                for labels, value in samples:
+                    label_names = tuple(labels)
+                    label_values = tuple(labels[n] for n in label_names)
+                    lines.append(f'{name}{_format_labels(label_names, label_values)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'safefall_http_request_duration_seconds',
+    'HTTP request latency by route',
+    ('method', 'route', 'status')
+)
+INGEST_FRAMES = registry.counter(
+    'safefall_ingest_frames_total',
+    'Frames received per device',
+    ('device',)
+)
+INGEST_BYTES = registry.counter(
+    'safefall_ingest_bytes_total',
+    'Frame bytes received per device',
+    ('device',)
+)
+INCIDENT_STAGE_SECONDS = registry.histogram(
+    'safefall_incident_stage_duration_seconds',
+    'Incident clip pipeline stage duration',
+    ('stage',),
+    buckets=STAGE_BUCKETS
+)
+FFMPEG_FAILURES = registry.counter(
+    'safefall_ffmpeg_failures_total',
+    'ffmpeg failures by operation (transcode, ingest)',
+    ('operation',)
+)
+MJPEG_VIEWERS = registry.gauge(
+    'safefall_mjpeg_viewers',
+    'Connected MJPEG stream clients'
+)
+MJPEG_VIEWERS.set(0)
+
+
+def _read_rss_bytes():
+    """현재 프로세스 RSS (Linux /proc, 그 외 플랫폼은 None)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _collect_process_metrics():
+    """프로세스 RSS / CPU 시간 / 스레드 수 (부하 테스트 시 코어당 용량 계산용)"""
+    times = os.times()
+    families = [
+        ('process_cpu_seconds_total', 'counter', 'Total user and system CPU time spent in seconds',
+         [({}, round(times.user + times.system, 3))]),
+        ('process_threads', 'gauge', 'Number of Python threads',
+         [({}, threading.active_count())]),
+    ]
+    rss = _read_rss_bytes()
+    if rss is not None:
+        families.append(
+            ('process_resident_memory_bytes', 'gauge', 'Resident memory size in bytes', [({}, rss)])
+        )
+    return families
+
+
+registry.register_collector(_collect_process_metrics)
@@ -0,0 +1,265 @@
+"""
+운영 중 요청 프로파일링
+
+PROFILING_ENABLED=True일 때만 동작한다.
+- 특정 라우트(URL 규칙)를 다음 N개 요청 동안 프로파일 (arm_route)
+- 권한 있는 호출자는 ?__profile=1 로 해당 요청만 프로파일 (X-Debug-Token 헤더)
+
+프로파일 형식:
+- speedscope: 요청 스레드 스택을 주기적으로 샘플링 (오버헤드 낮음, https://www.speedscope.app)
+- pstats: cProfile 결정적 프로파일 (python -m pstats, snakeviz 등)
+
+결과는 PROFILE_DIR에 저장되며 PROFILE_MAX_FILES개를 넘으면 오래된 것부터 삭제된다.
+"""
+import cProfile
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import g, request
+
+from utils.log import get_logger
+
+log = get_logger('profiling')
+
+PROFILE_FORMATS = ('speedscope', 'pstats')
+
+
+class SamplingProfiler:
+    """대상 스레드의 스택을 interval마다 수집하는 샘플링 프로파일러"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = []          # speedscope shared frames
+        self._frame_index = {}    # (name, file, line) → index
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self.duration = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='SamplingProfiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _frame_id(self, code, lineno):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = len(self.frames)
+            self._frame_index[key] = index
+            self.frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+        return index
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                break
+
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            stack.reverse()  # root → leaf
+
+            self.samples.append(stack)
+            self.weights.append(now - last)
+            last = now
+
+    def to_speedscope(self, name):
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'exporter': 'safefall',
+            'name': name,
+            'activeProfileIndex': 0,
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': self.samples,
+                'weights': self.weights,
+            }],
+        }
+
+
+class ProfileStore:
+    """PROFILE_DIR의 프로파일 파일 관리 (개수 제한)"""
+
+    def __init__(self, directory, max_files=50):
+        self.directory = directory
+        self.max_files = max_files
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _filename(self, route, fmt):
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        slug = ''.join(c if c.isalnum() else '_' for c in route).strip('_') or 'root'
+        extension = 'speedscope.json' if fmt == 'speedscope' else 'pstats'
+        return f'{stamp}_{slug[:80]}.{extension}'
+
+    def save(self, route, fmt, profiler):
+        """프로파일 저장 후 파일 이름 반환"""
+        filename = self._filename(route, fmt)
+        path = os.path.join(self.directory, filename)
+
+        if fmt == 'speedscope':
+            with open(path, 'w') as f:
+                json.dump(profiler.to_speedscope(f'{request.method} {route}'), f)
+        else:
+            profiler.dump_stats(path)
+
+        self._prune()
+        return filename
+
+    def _prune(self):
+        with self.lock:
+            files = self.list()
+            for entry in files[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, entry['name']))
+                except OSError:
+                    pass
+
+    def list(self):
+        """최신순 프로파일 목록"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append({
+                'name': name,
+                'size': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
+            })
+        entries.sort(key=lambda entry: entry['name'], reverse=True)
+        return entries
+
+    def path(self, name):
+        """다운로드할 파일 경로 (디렉토리 밖 경로는 None)"""
+        if os.sep in name or (os.altsep and os.altsep in name) or name.startswith('.'):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class RequestProfiler:
+    """before/after_request 훅으로 선택된 요청을 프로파일"""
+
+    def __init__(self, app):
+        config = app.config
+        self.token = config.get('PROFILING_TOKEN') or ''
+        self.default_format = config.get('PROFILE_FORMAT', 'speedscope')
+        self.interval = config.get('PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000
+        self.store = ProfileStore(config['PROFILE_DIR'], config.get('PROFILE_MAX_FILES', 50))
+        self.armed = {}  # route(URL 규칙) → {'remaining': n, 'format': fmt}
+        self.lock = threading.Lock()
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def is_authorized(self):
+        """X-Debug-Token 헤더 검사 (PROFILING_TOKEN 미설정 시 항상 허용)"""
+        if not self.token:
+            return True
+        return hmac.compare_digest(request.headers.get('X-Debug-Token', ''), self.token)
+
+    def arm(self, route, count, fmt=None):
+        """route의 다음 count개 요청을 프로파일"""
+        fmt = fmt or self.default_format
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f'Unknown profile format: {fmt} (expected one of {PROFILE_FORMATS})')
+        with self.lock:
+            self.armed[route] = {'remaining': count, 'format': fmt}
+
+    def disarm(self, route):
+        with self.lock:
+            return self.armed.pop(route, None) is not None
+
+    def status(self):
+        with self.lock:
+            return {route: dict(entry) for route, entry in self.armed.items()}
+
+    def _take(self, route):
+        """프로파일할 요청이면 형식 반환"""
+        if request.args.get('__profile') == '1' and self.is_authorized():
+            fmt = request.args.get('__profile_format', self.default_format)
+            return fmt if fmt in PROFILE_FORMATS else self.default_format
+
+        if not self.armed:
+            return None
+        with self.lock:
+            entry = self.armed.get(route)
+            if entry is None:
+                return None
+            entry['remaining'] -= 1
+            if entry['remaining'] <= 0:
+                del self.armed[route]
+            return entry['format']
+
+    def _before_request(self):
+        route = request.url_rule.rule if request.url_rule else None
+        if route is None or route.startswith('/api/debug'):
+            return None
+
+        fmt = self._take(route)
+        if fmt is None:
+            return None
+
+        if fmt == 'pstats':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), self.interval)
+            profiler.start()
+        g.profile = (route, fmt, profiler)
+        return None
+
+    def _after_request(self, response):
+        active = g.pop('profile', None)
+        if active is None:
+            return response
+
+        route, fmt, profiler = active
+        if fmt == 'pstats':
+            profiler.disable()
+        else:
+            profiler.stop()
+
+        try:
+            filename = self.store.save(route, fmt, profiler)
+            response.headers['X-Profile'] = filename
+            log.info("request profiled", extra={'route': route, 'format': fmt, 'file': filename})
+        except Exception:
+            log.exception("failed to save profile", extra={'route': route})
+        return response
+
+
+def init_profiling(app):
+    """PROFILING_ENABLED일 때 요청 프로파일러 등록 (app.extensions['profiler'])"""
+    if not app.config.get('PROFILING_ENABLED'):
+        return None
+    profiler = RequestProfiler(app)
+    app.extensions['profiler'] = profiler
+    log.info("request profiling enabled", extra={'dir': profiler.store.directory})
+    return profiler
@@ -0,0 +1,60 @@
+"""
+기존 DB 스키마 보정 (db.create_all()은 기존 테이블에 컬럼을 추가하지 않음)
+
+새 컬럼은 모두 NULL 허용으로 추가하고, 값 채우기는 각 기능 모듈이 담당한다.
+ALTER로 바꿀 수 없는 SQLite 테이블 정의(AUTOINCREMENT 등)는 rebuild_sqlite_table()로 다시 만든다.
+"""
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+def add_missing_columns(connection, table, columns, indexes=()):
+    """
+    table에 없는 컬럼/인덱스 추가
+
+    Args:
+        columns: {컬럼명: SQL 타입} 예: {'change_seq': 'BIGINT'}
+        indexes: [(인덱스명, '컬럼1, 컬럼2')]
+
+    Returns:
+        추가한 컬럼 이름 목록
+    """
+    existing = {column['name'] for column in inspect(connection).get_columns(table)}
+    added = []
+    for name, sql_type in columns.items():
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+            added.append(name)
+    for index_name, index_columns in indexes:
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({index_columns})"))
+    return added
+
+
+def rebuild_sqlite_table(connection, table):
+    """
+    SQLite 테이블을 모델 정의(table)대로 다시 생성 - 새 테이블 생성, 같은 이름 컬럼 복사,
+    기존 테이블 삭제, 이름 변경, 인덱스 재생성 (호출자의 트랜잭션 안에서 실행)
+
+    Args:
+        table: SQLAlchemy Table (예: Incident.__table__)
+
+    Returns:
+        복사한 행 수
+    """
+    metadata = MetaData()
+    for foreign_key in table.foreign_keys:  # FK 대상 테이블도 있어야 DDL 생성 가능
+        foreign_key.column.table.to_metadata(metadata)
+    temp = table.to_metadata(metadata, name=f"{table.name}__rebuild")
+    temp.indexes.clear()  # 인덱스 이름은 DB 전체에서 유일 - 이름 변경 후 원래 정의로 생성
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    columns = ', '.join(column.name for column in table.columns if column.name in existing)
+
+    connection.execute(CreateTable(temp))
+    copied = connection.execute(text(
+        f"INSERT INTO {temp.name} ({columns}) SELECT {columns} FROM {table.name}"
+    )).rowcount
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {temp.name} RENAME TO {table.name}"))
+    for index in table.indexes:
+        connection.execute(CreateIndex(index))
+    return copied
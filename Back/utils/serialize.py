@@ -0,0 +1,158 @@
+"""
+사고 목록 직렬화 (sparse fieldset + 행 단위 JSON 조각 캐시)
+
+목록 API는 행마다 선택된 필드만 한 번에 JSON 바이트로 만들고, (id, updated_at, 필드 구성)
+키로 캐시해 둔다. updated_at은 ORM 수정 시마다 바뀌므로 수정된 행은 자동으로 다시 직렬화된다.
+응답은 캐시된 조각을 이어 붙여 만들며, dict → jsonify 재인코딩을 거치지 않는다.
+
+orjson이 설치되어 있으면 사용하고 (datetime 직접 인코딩), 없으면 표준 json으로 동작한다.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+from config import Config
+from utils.metrics import registry
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+SERIALIZE_CACHE = registry.counter(
+    'safefall_serialize_cache_total',
+    'Incident JSON fragment cache lookups',
+    ('result',)
+)
+
+# 정규 필드 (Incident 컬럼 순서)
+INCIDENT_FIELDS = (
+    'id', 'user_id', 'incident_type', 'device_id', 'detected_at', 'video_path', 'thumbnail_path',
+    'duration', 'is_checked', 'checked_at', 'confidence', 'extra_data',
+    'created_at', 'updated_at',
+)
+DATETIME_FIELDS = {'detected_at', 'checked_at', 'created_at', 'updated_at'}
+
+# 프론트엔드 호환 별칭 (aliases=1일 때만) - 별칭: 원본 필드
+INCIDENT_ALIASES = {
+    'filename': 'video_path',
+    'createdAt': 'detected_at',
+    'isChecked': 'is_checked',
+    'processed': 'is_checked',
+    'type': 'incident_type',
+}
+
+
+if orjson is not None:
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+    def _datetime(value):
+        return value
+else:
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def _datetime(value):
+        return value.isoformat() if value is not None else None
+
+
+def parse_fields(value):
+    """
+    ?fields= 파라미터 → 필드 튜플 (None이면 전체)
+
+    Raises:
+        ValueError: 알 수 없는 필드
+    """
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in INCIDENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(INCIDENT_FIELDS)})")
+    # id는 항상 포함, 순서는 정규 필드 순서로 고정 (캐시 키 통일)
+    selected = set(fields) | {'id'}
+    return tuple(name for name in INCIDENT_FIELDS if name in selected)
+
+
+def parse_aliases(value):
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+
+class FragmentCache:
+    """LRU 캐시 {(id, updated_at, fields, aliases): JSON bytes}"""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            fragment = self.entries.get(key)
+            if fragment is not None:
+                self.entries.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self.lock:
+            self.entries[key] = fragment
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+fragment_cache = FragmentCache(Config.SERIALIZE_CACHE_SIZE)
+
+
+def incident_fragment(incident, fields=None, aliases=False):
+    """Incident 한 행의 JSON 바이트 (캐시 사용)"""
+    fields = fields or INCIDENT_FIELDS
+    key = None
+    if incident.updated_at is not None:
+        key = (incident.id, incident.updated_at, fields, aliases)
+        fragment = fragment_cache.get(key)
+        if fragment is not None:
+            SERIALIZE_CACHE.inc(result='hit')
+            return fragment
+    SERIALIZE_CACHE.inc(result='miss')
+
+    row = {}
+    for name in fields:
+        value = getattr(incident, name)
+        row[name] = _datetime(value) if name in DATETIME_FIELDS else value
+    if aliases:
+        for alias, source in INCIDENT_ALIASES.items():
+            if source in row:
+                row[alias] = row[source]
+
+    fragment = dumps(row)
+    if key is not None:
+        fragment_cache.put(key, fragment)
+    return fragment
+
+
+class RawJSON:
+    """이미 인코딩된 JSON 바이트 (json_response에서 그대로 삽입)"""
+
+    def __init__(self, data):
+        self.data = data
+
+
+def incident_array(incidents, fields=None, aliases=False):
+    return RawJSON(b'[' + b','.join(incident_fragment(incident, fields, aliases) for incident in incidents) + b']')
+
+
+def json_response(payload, status=200):
+    """최상위 dict 응답 - RawJSON 값은 다시 인코딩하지 않고 삽입"""
+    parts = []
+    for key, value in payload.items():
+        encoded = value.data if isinstance(value, RawJSON) else dumps(value)
+        parts.append(dumps(key) + b':' + encoded)
+    return Response(b'{' + b','.join(parts) + b'}', status=status, mimetype='application/json')
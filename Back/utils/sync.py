@@ -0,0 +1,237 @@
+"""
+사고 목록 델타 동기화 (변경 순번 + tombstone)
+
+Incident가 추가/수정되는 flush마다 change_sequences['incidents']에서 순번을 받아
+change_seq에 기록하고, 삭제되면 같은 순번 공간에서 IncidentTombstone을 남긴다.
+클라이언트는 마지막으로 받은 순번(version) 이후 변경만 가져오면 된다 (/api/incidents/changes).
+
+순번 행 UPDATE가 커밋까지 행 잠금을 잡으므로 순번 부여 순서 = 커밋 순서이며,
+동시 트랜잭션이 있어도 작은 순번이 나중에 커밋되어 건너뛰어지는 일이 없다.
+ORM을 거치지 않는 벌크 SQL은 bump_change_seq()/add_tombstones()로 직접 기록해야 한다.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, event, func, inspect
+from sqlalchemy.orm import Session, defer
+
+from config import Config
+from models import db, Incident, IncidentTombstone, ChangeSequence
+from utils.log import get_logger
+from utils.schema import add_missing_columns
+
+log = get_logger('sync')
+
+SEQUENCE = 'incidents'
+PRUNED_FLOOR = 'incident_tombstones_pruned'
+
+
+def _read_sequence(connection, name):
+    table = ChangeSequence.__table__
+    value = connection.execute(
+        db.select(table.c.value).where(table.c.name == name)
+    ).scalar()
+    return value or 0
+
+
+def allocate(connection, count, name=SEQUENCE):
+    """
+    순번 count개 할당 (같은 트랜잭션 안에서 호출)
+
+    Returns:
+        할당된 첫 순번 (first .. first + count - 1)
+    """
+    table = ChangeSequence.__table__
+    result = connection.execute(
+        table.update().where(table.c.name == name).values(value=table.c.value + count)
+    )
+    if result.rowcount == 0:
+        # 첫 사용: 기존 행의 최대 순번 이후부터 시작
+        start = max(
+            connection.execute(db.select(func.max(Incident.change_seq))).scalar() or 0,
+            connection.execute(db.select(func.max(IncidentTombstone.change_seq))).scalar() or 0,
+        )
+        connection.execute(table.insert().values(name=name, value=start + count))
+    return _read_sequence(connection, name) - count + 1
+
+
+def _set_floor(connection, value):
+    table = ChangeSequence.__table__
+    result = connection.execute(
+        table.update()
+        .where(table.c.name == PRUNED_FLOOR, table.c.value < value)
+        .values(value=value)
+    )
+    if result.rowcount == 0 and _read_sequence(connection, PRUNED_FLOOR) == 0:
+        connection.execute(table.insert().values(name=PRUNED_FLOOR, value=value))
+
+
+def _is_changed(obj):
+    """change_seq 외 컬럼이 실제로 바뀌었는지"""
+    attrs = inspect(obj).attrs
+    return any(
+        attr.key != 'change_seq' and attr.history.has_changes()
+        for attr in attrs
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _assign_change_seq(session, flush_context, instances):
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Incident) and obj not in session.deleted
+        and (obj in session.new or _is_changed(obj))
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Incident)]
+    if not changed and not deleted:
+        return
+
+    seq = allocate(session.connection(), len(changed) + len(deleted))
+    for obj in changed:
+        obj.change_seq = seq
+        seq += 1
+
+    now = datetime.now(timezone.utc)
+    for obj in deleted:
+        session.add(IncidentTombstone(
+            change_seq=seq, incident_id=obj.id, user_id=obj.user_id, deleted_at=now
+        ))
+        seq += 1
+    if deleted:
+        session.info['incident_tombstones_added'] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _prune_tombstones(session, flush_context):
+    # 삭제가 있을 때만 오래된 tombstone 정리 (인덱스 범위 조회라 비용이 작음)
+    if session.info.pop('incident_tombstones_added', False):
+        prune_tombstones(session.connection())
+
+
+def prune_tombstones(connection, retention_days=None):
+    """보관 기간이 지난 tombstone 삭제 후 재동기화 기준 순번 갱신"""
+    retention_days = Config.SYNC_TOMBSTONE_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    table = IncidentTombstone.__table__
+
+    floor = connection.execute(
+        db.select(func.max(table.c.change_seq)).where(table.c.deleted_at < cutoff)
+    ).scalar()
+    if floor is None:
+        return 0
+
+    deleted = connection.execute(table.delete().where(table.c.change_seq <= floor)).rowcount
+    _set_floor(connection, floor)
+    log.info("incident tombstones pruned", extra={'rows': deleted, 'floor': floor})
+    return deleted
+
+
+def bump_change_seq(connection, incident_ids):
+    """벌크 UPDATE 후 해당 사고들에 새 순번 부여"""
+    incident_ids = list(incident_ids)
+    if not incident_ids:
+        return
+    first = allocate(connection, len(incident_ids))
+    table = Incident.__table__
+    connection.execute(
+        table.update().where(table.c.id == bindparam('incident_id')).values(change_seq=bindparam('seq')),
+        [{'incident_id': incident_id, 'seq': first + offset} for offset, incident_id in enumerate(incident_ids)],
+    )
+
+
+def add_tombstones(connection, rows):
+    """벌크 DELETE 전후 tombstone 기록 - rows: [(incident_id, user_id)]"""
+    rows = list(rows)
+    if not rows:
+        return
+    first = allocate(connection, len(rows))
+    now = datetime.now(timezone.utc)
+    connection.execute(IncidentTombstone.__table__.insert(), [
+        {'change_seq': first + offset, 'incident_id': incident_id, 'user_id': user_id, 'deleted_at': now}
+        for offset, (incident_id, user_id) in enumerate(rows)
+    ])
+    prune_tombstones(connection)
+
+
+def current_version():
+    return _read_sequence(db.session.connection(), SEQUENCE)
+
+
+def changes_since(user_id, since, limit):
+    """
+    since 이후 변경 (순번 오름차순, 최대 limit개)
+
+    Returns:
+        {'version', 'has_more', 'reset', 'upserted': [Incident], 'deleted': [id]}
+        reset=True면 커서를 이어갈 수 없으므로 since=0부터 다시 동기화해야 한다.
+    """
+    connection = db.session.connection()
+    latest = _read_sequence(connection, SEQUENCE)
+    floor = _read_sequence(connection, PRUNED_FLOOR)
+
+    if since > latest or (since and since < floor):
+        # DB 초기화 이후의 커서이거나 tombstone이 이미 정리된 구간
+        return {'version': 0, 'has_more': True, 'reset': True, 'upserted': [], 'deleted': []}
+
+    upserted = (
+        Incident.query.options(defer(Incident.video_blob), defer(Incident.thumbnail_blob))
+        .filter(Incident.user_id == user_id, Incident.change_seq > since)
+        .order_by(Incident.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = (
+        db.session.query(IncidentTombstone.change_seq, IncidentTombstone.incident_id)
+        .filter(IncidentTombstone.user_id == user_id, IncidentTombstone.change_seq > since)
+        .order_by(IncidentTombstone.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+
+    merged = sorted(
+        [(incident.change_seq, incident) for incident in upserted]
+        + [(seq, incident_id) for seq, incident_id in tombstones],
+        key=lambda item: item[0],
+    )
+    page = merged[:limit]
+    has_more = len(merged) > limit
+
+    page_upserted = [item for _, item in page if isinstance(item, Incident)]
+    live_ids = {incident.id for incident in page_upserted}
+    # SQLite는 마지막 id를 재사용할 수 있음 - 같은 페이지에서 다시 생긴 id의 이전 삭제는 생략
+    page_deleted = [item for _, item in page if not isinstance(item, Incident) and item not in live_ids]
+
+    if has_more:
+        version = page[-1][0]
+    else:
+        # 다른 사용자의 변경까지 포함한 최신 순번 - 다음 요청이 빈 구간을 다시 훑지 않음
+        version = max(latest, since, page[-1][0] if page else 0)
+
+    return {
+        'version': version,
+        'has_more': has_more,
+        'reset': False,
+        'upserted': page_upserted,
+        'deleted': page_deleted,
+    }
+
+
+def ensure_change_tracking():
+    """
+    change_seq 컬럼/인덱스가 없는 기존 DB 보정 + 순번 없는 행 채우기 (앱 시작 시)
+
+    Returns:
+        순번을 새로 부여한 행 수
+    """
+    connection = db.session.connection()
+    add_missing_columns(
+        connection, 'incidents', {'change_seq': 'BIGINT'},
+        indexes=[('idx_user_change_seq', 'user_id, change_seq')],
+    )
+
+    missing = connection.execute(
+        db.select(Incident.id).where(Incident.change_seq.is_(None)).order_by(Incident.id)
+    ).scalars().all()
+    if missing:
+        bump_change_seq(connection, missing)
+    db.session.commit()
+    return len(missing)
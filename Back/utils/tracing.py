@@ -0,0 +1,105 @@
+"""
+사고 영상 파이프라인 트레이싱
+
+report_incident가 PipelineTrace를 만들고 utils/video.py 함수에 trace 인자로 전달한다.
+각 단계(span)는 시작 오프셋/소요 시간과 프레임 수·바이트 같은 속성을 기록하며,
+종료 시 safefall_incident_stage_duration_seconds 히스토그램에도 반영된다.
+완성된 트레이스는 Incident.extra_data['trace']에 저장된다.
+"""
+import time
+from contextlib import contextmanager
+
+from utils.metrics import registry, INCIDENT_STAGE_SECONDS
+from utils.log import get_logger
+
+log = get_logger('tracing')
+
+SLOW_STAGES = registry.counter(
+    'safefall_incident_slow_stages_total',
+    'Incident pipeline stages slower than TRACE_SLOW_STAGE_MS',
+    ('stage',)
+)
+
+
+class PipelineTrace:
+    """한 사고 처리 과정의 단계별 소요 시간 기록"""
+
+    def __init__(self, name='incident', slow_stage_ms=None):
+        """
+        Args:
+            name: 트레이스 이름
+            slow_stage_ms: 이 시간(ms)을 넘는 단계는 경고 로그 + 느린 단계 카운터
+        """
+        self.name = name
+        self.slow_stage_ms = slow_stage_ms
+        self.spans = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """
+        with 블록을 하나의 단계로 기록
+
+        블록 안에서 yield된 dict에 속성을 추가할 수 있다 (예: span['frames'] = n).
+        예외가 발생하면 error 속성과 함께 기록하고 다시 던진다.
+        """
+        started = time.perf_counter()
+        record = dict(attrs)
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            self.add(stage, time.perf_counter() - started, started=started, **record)
+
+    def add(self, stage, seconds, started=None, **attrs):
+        """
+        이미 측정한 소요 시간을 단계로 기록 (루프 안에서 누적한 decode/encode 등)
+
+        Args:
+            stage: 단계 이름
+            seconds: 소요 시간 (초)
+            started: 시작 시각 (perf_counter), None이면 기록 시점 - seconds
+        """
+        if started is None:
+            started = time.perf_counter() - seconds
+
+        duration_ms = round(seconds * 1000, 2)
+        self.spans.append({
+            'stage': stage,
+            'offset_ms': round((started - self._started) * 1000, 2),
+            'duration_ms': duration_ms,
+            **attrs
+        })
+        INCIDENT_STAGE_SECONDS.observe(seconds, stage=stage)
+
+        if self.slow_stage_ms is not None and duration_ms >= self.slow_stage_ms:
+            SLOW_STAGES.inc(stage=stage)
+            log.warning("slow incident stage", extra={
+                'trace': self.name, 'stage': stage, 'duration_ms': duration_ms
+            })
+
+    @property
+    def total_ms(self):
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+    def to_dict(self):
+        """extra_data 저장용 딕셔너리"""
+        slowest = max(self.spans, key=lambda span: span['duration_ms'], default=None)
+        return {
+            'name': self.name,
+            'total_ms': self.total_ms,
+            'slowest_stage': slowest['stage'] if slowest else None,
+            'spans': list(self.spans),
+        }
+
+
+@contextmanager
+def optional_span(trace, stage, **attrs):
+    """trace가 None이면 기록 없이 실행 (utils/video.py 함수의 trace 인자용)"""
+    if trace is None:
+        yield dict(attrs)
+    else:
+        with trace.span(stage, **attrs) as record:
+            yield record
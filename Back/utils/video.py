@@ -3,10 +3,14 @@ import numpy as np
 import os
 from datetime import datetime
 import subprocess
+import time
 from pathlib import Path
 
+from utils.metrics import FFMPEG_FAILURES
+from utils.tracing import PipelineTrace, optional_span
 
-def frames_to_video(frames, output_path, fps=None):
+
+def frames_to_video(frames, output_path, fps=None, trace=None):
     """
     프레임 리스트를 MP4 비디오로 저장 (웹 호환 H.264 코덱)
     
@@ -14,6 +18,7 @@ def frames_to_video(frames, output_path, fps=None):
         frames: 프레임 리스트 (각 프레임은 {'data': numpy_array, 'timestamp': datetime})
         output_path: 출력 비디오 경로
         fps: 초당 프레임 수 (None이면 자동 계산)
+        trace: PipelineTrace (decode/encode/ffmpeg 단계 기록, None이면 메트릭만 기록)
     
     Returns:
         bool: 성공 여부
@@ -21,6 +26,9 @@ def frames_to_video(frames, output_path, fps=None):
     if not frames:
         print("❌ 저장할 프레임이 없습니다")
         return False
+
+    if trace is None:
+        trace = PipelineTrace('frames_to_video')
     
     try:
         # 첫 프레임으로 크기 확인
@@ -56,28 +64,52 @@ def frames_to_video(frames, output_path, fps=None):
             print("❌ VideoWriter 초기화 실패")
             return False
         
-        # 프레임 쓰기
+        # 프레임 쓰기 (JPEG 디코드와 VideoWriter 인코딩 시간을 따로 집계)
+        writer_started = time.perf_counter()
+        decode_seconds = 0.0
+        encode_seconds = 0.0
+        decoded_frames = 0
+        jpeg_bytes = 0
         for frame_data in frames:
             frame = frame_data['data']
             
             # 바이트 데이터면 디코드
             if isinstance(frame, bytes):
+                started = time.perf_counter()
+                jpeg_bytes += len(frame)
                 nparr = np.frombuffer(frame, np.uint8)
                 frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                decode_seconds += time.perf_counter() - started
+                decoded_frames += 1
             
+            started = time.perf_counter()
             out.write(frame)
+            encode_seconds += time.perf_counter() - started
         
+        started = time.perf_counter()
         out.release()
+        encode_seconds += time.perf_counter() - started
+
+        temp_size = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+        trace.add('decode', decode_seconds, started=writer_started,
+                  frames=decoded_frames, bytes=jpeg_bytes)
+        trace.add('video_writer', encode_seconds, started=writer_started,
+                  frames=len(frames), width=width, height=height,
+                  fps=round(fps, 2), bytes=temp_size)
         
         # 임시 파일이 제대로 생성되었는지 확인
-        if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+        if temp_size == 0:
             print(f"❌ 임시 비디오 파일 생성 실패: {temp_path}")
             return False
         
         print(f"✅ 임시 파일 생성 완료: {temp_path} ({len(frames)} 프레임)")
         
         # ffmpeg으로 H.264 코덱으로 변환 (웹 호환)
-        success = convert_to_web_compatible(temp_path, output_path)
+        with trace.span('ffmpeg', input_bytes=temp_size) as span:
+            success = convert_to_web_compatible(temp_path, output_path)
+            span['success'] = success
+            if success:
+                span['bytes'] = os.path.getsize(output_path)
         
         # 임시 파일 삭제
         try:
@@ -153,21 +185,26 @@ def convert_to_web_compatible(input_path, output_path):
                 return True
             else:
                 print(f"❌ 변환된 파일이 유효하지 않음: {output_path}")
+                FFMPEG_FAILURES.inc(operation='transcode')
                 return False
         else:
+            FFMPEG_FAILURES.inc(operation='transcode')
             print(f"❌ ffmpeg 변환 실패:")
             print(f"   stdout: {result.stdout}")
             print(f"   stderr: {result.stderr}")
             return False
             
     except FileNotFoundError:
+        FFMPEG_FAILURES.inc(operation='transcode')
         print("❌ ffmpeg를 찾을 수 없습니다. ffmpeg가 설치되어 있고 PATH에 등록되어 있는지 확인하세요.")
         print("   설치: https://ffmpeg.org/download.html")
         return False
     except subprocess.TimeoutExpired:
+        FFMPEG_FAILURES.inc(operation='transcode')
         print("❌ ffmpeg 변환 시간 초과 (60초)")
         return False
     except Exception as e:
+        FFMPEG_FAILURES.inc(operation='transcode')
         print(f"❌ ffmpeg 변환 중 오류: {e}")
         import traceback
         traceback.print_exc()
@@ -263,7 +300,7 @@ def batch_convert_videos(directory):
     return stats
 
 
-def create_thumbnail(video_path, thumbnail_path, time_offset=0):
+def create_thumbnail(video_path, thumbnail_path, time_offset=0, trace=None):
     """
     비디오에서 썸네일 생성
     
@@ -271,10 +308,20 @@ def create_thumbnail(video_path, thumbnail_path, time_offset=0):
         video_path: 비디오 파일 경로
         thumbnail_path: 썸네일 저장 경로
         time_offset: 썸네일 추출 시간 (초)
+        trace: PipelineTrace (thumbnail 단계 기록, 선택)
     
     Returns:
         bool: 성공 여부
     """
+    with optional_span(trace, 'thumbnail') as span:
+        success = _create_thumbnail(video_path, thumbnail_path, time_offset)
+        span['success'] = success
+        if success:
+            span['bytes'] = os.path.getsize(thumbnail_path)
+        return success
+
+
+def _create_thumbnail(video_path, thumbnail_path, time_offset):
     try:
         # 비디오 파일 존재 확인
         if not os.path.exists(video_path):
@@ -332,16 +379,27 @@ def create_thumbnail(video_path, thumbnail_path, time_offset=0):
         return False
 
 
-def get_video_info(video_path):
+def get_video_info(video_path, trace=None):
     """
     비디오 정보 추출
     
     Args:
         video_path: 비디오 파일 경로
+        trace: PipelineTrace (probe 단계 기록, 선택)
     
     Returns:
         dict: 비디오 정보
     """
+    with optional_span(trace, 'probe') as span:
+        info = _get_video_info(video_path)
+        span['success'] = info is not None
+        if info:
+            span['frames'] = info['frame_count']
+            span['bytes'] = info['file_size']
+        return info
+
+
+def _get_video_info(video_path):
     try:
         if not os.path.exists(video_path):
             print(f"❌ 비디오 파일이 존재하지 않습니다: {video_path}")
@@ -6,7 +6,7 @@
  * - 실시간 스트림 정보 관리
  * - 영상 필터링, 검색, 통계 기능
  */
-import { createContext, useContext, useState, useEffect, useMemo } from 'react';
+import { createContext, useContext, useState, useEffect, useMemo, useRef } from 'react';
 import { MOCK_DATA, debugLog } from '../config/api.js';
 import apiService from '../services/api.js';
 import httpClient from '../services/httpClient.js';
@@ -19,6 +19,9 @@ import Dum001 from './Dum001';
 // 강제로 API 모드 활성화 (실제 저장된 영상 표시용)
 const FORCE_API_MODE = true;
 
+// 화면에 유지하는 사고 영상 최대 개수 (첫 조회 limit과 델타 동기화 병합 결과 공통)
+const VIDEO_LIST_LIMIT = 100;
+
 // DataContext 생성
 const DataContext = createContext();
 
@@ -54,6 +57,8 @@ export const DataProvider = ({ children }) => {
 
   // 2. 사고 영상 데이터 (API 또는 더미데이터)
   const [incidentVideos, setIncidentVideos] = useState([]);
+  // 델타 동기화 커서 (/api/incidents/changes의 version) - 첫 목록 조회 응답으로 설정
+  const syncVersionRef = useRef(0);
   
   // 3. 사용자 로그인 데이터 (API 또는 더미데이터)
   // Dum004 구조: { id, pw, name }
@@ -123,6 +128,7 @@ export const DataProvider = ({ children }) => {
 
       if (videosResponse.status === 'fulfilled') {
         setIncidentVideos(videosResponse.value.data || []);
+        syncVersionRef.current = videosResponse.value.version || 0;
         debugLog('Videos loaded successfully:', videosResponse.value.data?.length || 0);
       } else {
         console.warn('Failed to load videos:', videosResponse.reason?.message);
@@ -186,7 +192,7 @@ export const DataProvider = ({ children }) => {
       // 🔥 수정: 모든 트리거 타입의 영상을 가져오도록 변경
       const response = await apiService.getVideos({
         // trigger_type 파라미터 제거 - 모든 영상 가져오기
-        limit: queryParams.limit || 100,  // 더 많은 영상 가져오기
+        limit: queryParams.limit || VIDEO_LIST_LIMIT,  // 더 많은 영상 가져오기
         ...queryParams
       });
       
@@ -196,6 +202,7 @@ export const DataProvider = ({ children }) => {
       return {
         data: response.data || [],
         count: response.count || 0,
+        version: response.version,
         success: response.success || true
       };
 
@@ -740,13 +747,50 @@ export const DataProvider = ({ children }) => {
    * === 데이터 새로고침 함수들 ===
    */
 
+  /**
+   * 영상 목록 델타 동기화
+   * - 마지막 version 이후 변경분만 받아 로컬 목록에 반영 (커서는 initializeData의 목록 응답으로 시작)
+   * - 커서가 없으면(since=0) 전체 동기화, 화면 목록은 VIDEO_LIST_LIMIT개까지만 유지
+   * - reset 응답이면 커서를 0으로 돌리고 전체 다시 받기
+   */
+  const syncIncidentVideos = async () => {
+    let since = syncVersionRef.current;
+    let full = since === 0;
+    const upserts = new Map();
+    const deletes = new Set();
+
+    for (;;) {
+      const changes = await apiService.getIncidentChanges(since);
+      if (changes.reset) {
+        since = 0;
+        full = true;
+        upserts.clear();
+        deletes.clear();
+        continue;
+      }
+      changes.upserted.forEach(video => { upserts.set(video.id, video); deletes.delete(video.id); });
+      changes.deleted.forEach(id => { deletes.add(id); upserts.delete(id); });
+      since = changes.version;
+      if (!changes.hasMore) break;
+    }
+
+    syncVersionRef.current = since;
+    setIncidentVideos(prev => {
+      const byId = new Map(full ? [] : prev.map(video => [video.id, video]));
+      deletes.forEach(id => byId.delete(id));
+      upserts.forEach((video, id) => byId.set(id, video));
+      return [...byId.values()]
+        .sort((a, b) => new Date(b.createdAt) - new Date(a.createdAt))
+        .slice(0, VIDEO_LIST_LIMIT);
+    });
+  };
+
   const refreshIncidentVideos = async () => {
     if (MOCK_DATA) return;
 
     try {
       setLoading(true);
-      const response = await fetchIncidentVideos();
-      setIncidentVideos(response.data || []);
+      await syncIncidentVideos();
     } catch (error) {
       setError(error.message);
     } finally {
@@ -109,6 +109,7 @@ export const getVideosFromDashboard = async (limit = 50) => {
     return {
       data: videos,
       count: videos.length,
+      version: response.version,  // 델타 동기화 시작 커서
       success: response.success || true
     };
   } catch (error) {
@@ -215,6 +216,34 @@ export const handleApiError = (error, context = '') => {
   }
 };
 
+// 목록에서 요청할 필드 (/api/incidents/list, /changes의 ?fields=) - toVideo가 쓰는 것만
+const VIDEO_FIELDS = 'id,incident_type,video_path,detected_at,created_at,is_checked,confidence';
+
+// 사고 레코드 → 프론트엔드 영상 객체 변환 (getVideos / getIncidentChanges 공통)
+const toVideo = (video) => {
+  // 파일명 우선순위: filename > video_filename > name
+  const actualFilename = video.filename || video.video_filename || video.name || video.video_path;
+  debugLog(`Processing video: ${video.id}, filename: ${actualFilename}`);
+
+  return {
+    id: video.id,
+    filename: actualFilename,  // ✅ 주요 수정: 명시적 filename 설정
+    video_filename: actualFilename,  // 백업 필드
+    name: actualFilename,
+    title: video.title || `낙상 감지 #${video.id}`,
+    createdAt: video.created_at || video.createdAt,
+    created_at: video.created_at || video.createdAt,
+    isChecked: video.processed || video.isChecked || video.is_checked || false,
+    processed: video.processed || video.isChecked || video.is_checked || false,
+    confidence: video.confidence || 0.95,
+    device_id: video.device_id || 'manual_trigger',
+    trigger_type: video.trigger_type || 'manual',
+    path: `/api/incidents/${video.id}/video`,
+    url: `/api/incidents/${video.id}/video`,
+    type: 'fall'
+  };
+};
+
 // 비디오 관련 API 추가 (🔥 주요 수정)
 export const getVideos = async (params = {}) => {
   try {
@@ -225,6 +254,7 @@ export const getVideos = async (params = {}) => {
     const queryString = new URLSearchParams({
       ...(trigger_type ? { trigger_type } : {}),  // trigger_type이 있을 때만 추가
       limit: limit.toString(),
+      fields: VIDEO_FIELDS,
       ...otherParams
     }).toString();
 
@@ -232,34 +262,12 @@ export const getVideos = async (params = {}) => {
     const response = await httpClient.get(`/api/incidents/list?${queryString}`);
     debugLog('Raw API response:', response);
     
-    // 🔥 주요 버그 수정: response.videos 배열 사용
-    const videosArray = response.videos || [];
+    // 기본 응답은 incidents만 포함 (videos 키는 aliases=1일 때만)
+    const videosArray = response.incidents || response.videos || [];
     debugLog('Videos array from response:', videosArray);
     
     // 데이터 형식을 프론트엔드에 맞게 변환
-    const videos = videosArray.map(video => {
-      // 파일명 우선순위: filename > video_filename > name
-      const actualFilename = video.filename || video.video_filename || video.name;
-      debugLog(`Processing video: ${video.id}, filename: ${actualFilename}`);
-      
-      return {
-        id: video.id,
-        filename: actualFilename,  // ✅ 주요 수정: 명시적 filename 설정
-        video_filename: actualFilename,  // 백업 필드
-        name: actualFilename,
-        title: video.title || `낙상 감지 #${video.id}`,
-        createdAt: video.created_at || video.createdAt,
-        created_at: video.created_at || video.createdAt,
-        isChecked: video.processed || video.isChecked || false,
-        processed: video.processed || video.isChecked || false,
-        confidence: video.confidence || 0.95,
-        device_id: video.device_id || 'manual_trigger',
-        trigger_type: video.trigger_type || 'manual',
-        path: `/api/incidents/${video.id}/video`,
-        url: `/api/incidents/${video.id}/video`,
-        type: 'fall'
-      };
-    });
+    const videos = videosArray.map(toVideo);
     
     debugLog('Processed videos:', videos);
     
@@ -274,6 +282,23 @@ export const getVideos = async (params = {}) => {
   }
 };
 
+// 델타 동기화: since 이후 추가/수정/삭제된 사고만 조회
+export const getIncidentChanges = async (since = 0, limit = 500) => {
+  try {
+    const response = await httpClient.get(`/api/incidents/changes?since=${since}&limit=${limit}&fields=${VIDEO_FIELDS}`);
+    return {
+      version: response.version,
+      hasMore: response.has_more,
+      reset: response.reset,
+      upserted: (response.upserted || []).map(toVideo),
+      deleted: response.deleted || []
+    };
+  } catch (error) {
+    debugLog('Failed to fetch incident changes:', error.message);
+    throw error;
+  }
+};
+
 export const getVideoById = async (videoId) => {
   try {
     debugLog(`Fetching video by ID: ${videoId}`);
@@ -466,6 +491,7 @@ const apiService = {
   
   // 비디오 관련 (🔥 수정됨)
   getVideos,
+  getIncidentChanges,  // 델타 동기화
   getVideoById,
   updateVideoStatus,
   checkIncident,  // Alias for updateVideoStatus (alarm dismissal)
@@ -1,4 +1,7 @@
 import subprocess
+import time
+from pathlib import Path
+
 import numpy as np
 import cv2
 from config import Config
@@ -38,6 +41,10 @@ class RPiCamera:
         
         return self
     
+    def _read_chunk(self, size):
+        """MJPEG 바이트 스트림에서 size바이트까지 읽기"""
+        return self.process.stdout.read(size)
+
     def read_frame(self):
         """
         Read frame (최적화된 MJPEG 파싱)
@@ -45,14 +52,17 @@ class RPiCamera:
         """
         if not self.process:
             return None
-        
+        return self._read_jpeg_frame()
+
+    def _read_jpeg_frame(self):
+        """스트림에서 다음 JPEG 프레임을 찾아 디코딩 (스트림 종료 시 None)"""
         try:
             chunk_size = 4096  # 4KB씩 읽기
             
             # JPEG 시작 마커 찾기 (0xFFD8)
             while True:
                 if len(self.buffer) < 2:
-                    chunk = self.process.stdout.read(chunk_size)
+                    chunk = self._read_chunk(chunk_size)
                     if not chunk:
                         return None
                     self.buffer += chunk
@@ -85,7 +95,7 @@ class RPiCamera:
                         continue
                 else:
                     # 더 읽기
-                    chunk = self.process.stdout.read(chunk_size)
+                    chunk = self._read_chunk(chunk_size)
                     if not chunk:
                         return None
                     self.buffer += chunk
@@ -105,4 +115,187 @@ class RPiCamera:
         if self.process:
             self.process.terminate()
             self.process.wait()
-            print("Camera stopped")
\ No newline at end of file
+            print("Camera stopped")
+
+
+# ============================================================
+# 오프라인 재생용 프레임 소스 (RPiCamera와 같은 start/read_frame/stop 인터페이스)
+# ============================================================
+
+PACING_MODES = ('realtime', 'fast')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.h264', '.webm')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FramePacer:
+    """realtime: fps 간격으로 프레임 전달, fast: 대기 없이 전달"""
+
+    def __init__(self, fps, mode='realtime'):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {mode} (expected one of {PACING_MODES})")
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.mode = mode
+        self.next_due = None
+
+    def wait(self):
+        if self.mode == 'fast' or not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_due is None or now - self.next_due > self.interval:
+            # 처음이거나 소비자가 한 프레임 이상 밀렸으면 일정 재설정 (몰아서 보내지 않음)
+            self.next_due = now
+        elif self.next_due > now:
+            time.sleep(self.next_due - now)
+        self.next_due += self.interval
+
+
+class FileFrameSource:
+    """파일 기반 프레임 소스 공통 로직 (반복 재생 + 속도 조절)"""
+
+    def __init__(self, path, fps=None, pacing='realtime', loop=False):
+        self.path = Path(path)
+        self.fps = fps or Config.CAMERA_FPS
+        self.pacing = pacing
+        self.loop = loop
+        self.pacer = None
+        self.frames_read = 0
+        self.finished = False  # 반복 재생이 아니고 마지막 프레임까지 읽었으면 True
+
+    def start(self):
+        self._open()
+        self.pacer = FramePacer(self.fps, self.pacing)
+        print(f"📼 Replay source started: {self.path} @ {self.fps}fps ({self.pacing}{', loop' if self.loop else ''})")
+        return self
+
+    def read_frame(self):
+        if self.finished:
+            return None
+
+        frame = self._next_frame()
+        if frame is None and self.loop and self.frames_read:
+            self._rewind()
+            frame = self._next_frame()
+        if frame is None:
+            self.finished = True
+            return None
+
+        self.pacer.wait()
+        self.frames_read += 1
+        return frame
+
+    def stop(self):
+        self._close()
+        print(f"Replay source stopped ({self.frames_read} frames)")
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _next_frame(self):
+        raise NotImplementedError
+
+    def _rewind(self):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class MJPEGFileSource(FileFrameSource, RPiCamera):
+    """rpicam-vid 출력을 저장한 MJPEG 파일 재생 (RPiCamera와 같은 파서 사용)"""
+
+    def __init__(self, path, fps=None, pacing='realtime', loop=False):
+        FileFrameSource.__init__(self, path, fps, pacing, loop)
+        self.buffer = b''
+        self.file = None
+
+    def _open(self):
+        self.file = open(self.path, 'rb')
+
+    def _read_chunk(self, size):
+        return self.file.read(size)
+
+    def _next_frame(self):
+        return self._read_jpeg_frame()
+
+    def _rewind(self):
+        self.file.seek(0)
+        self.buffer = b''
+
+    def _close(self):
+        if self.file:
+            self.file.close()
+
+
+class VideoFileSource(FileFrameSource):
+    """cv2.VideoCapture로 영상 파일 재생 (fps 미지정 시 파일의 fps 사용)"""
+
+    def __init__(self, path, fps=None, pacing='realtime', loop=False):
+        super().__init__(path, fps, pacing, loop)
+        self.fixed_fps = fps
+        self.capture = None
+
+    def _open(self):
+        self.capture = cv2.VideoCapture(str(self.path))
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Cannot open video file: {self.path}")
+        file_fps = self.capture.get(cv2.CAP_PROP_FPS)
+        if not self.fixed_fps and file_fps and file_fps > 0:
+            self.fps = file_fps
+
+    def _next_frame(self):
+        ok, frame = self.capture.read()
+        return frame if ok else None
+
+    def _rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _close(self):
+        if self.capture:
+            self.capture.release()
+
+
+class ImageDirectorySource(FileFrameSource):
+    """디렉토리의 이미지를 파일 이름 순서로 재생 (프레임마다 디코딩)"""
+
+    def _open(self):
+        self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        if not self.files:
+            raise RuntimeError(f"No images found in {self.path}")
+        self.index = 0
+
+    def _next_frame(self):
+        while self.index < len(self.files):
+            frame = cv2.imread(str(self.files[self.index]), cv2.IMREAD_COLOR)
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self.index = 0
+
+
+def create_camera(source=None, fps=None, pacing=None, loop=None):
+    """
+    프레임 소스 생성 (기본값은 Config.FRAME_SOURCE*)
+
+    source가 비어 있으면 rpicam-vid 카메라, 디렉토리면 이미지 재생,
+    .mjpeg/.mjpg면 MJPEG 파일 재생, 그 외는 영상 파일 재생
+    """
+    source = Config.FRAME_SOURCE if source is None else source
+    if not source:
+        return RPiCamera()
+
+    pacing = pacing or Config.FRAME_SOURCE_PACING
+    loop = Config.FRAME_SOURCE_LOOP if loop is None else loop
+    path = Path(source)
+
+    if not path.exists():
+        raise FileNotFoundError(f"Frame source not found: {path}")
+    if path.is_dir():
+        return ImageDirectorySource(path, fps, pacing, loop)
+    if path.suffix.lower() in ('.mjpeg', '.mjpg'):
+        return MJPEGFileSource(path, fps, pacing, loop)
+    if path.suffix.lower() not in VIDEO_EXTENSIONS:
+        print(f"⚠️ Unknown frame source extension {path.suffix}, trying as a video file")
+    return VideoFileSource(path, fps, pacing, loop)
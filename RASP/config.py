@@ -49,10 +49,28 @@ class Config:
     CAMERA_HEIGHT = int(os.getenv("CAMERA_HEIGHT", "720"))
     CAMERA_FPS = int(os.getenv("CAMERA_FPS", "30"))
 
+    # Frame source (비어 있으면 rpicam-vid 카메라)
+    # 오프라인 재생: MJPEG 파일(.mjpeg/.mjpg), 영상 파일, 이미지 디렉토리 경로
+    FRAME_SOURCE = os.getenv("FRAME_SOURCE", "")
+    # realtime: 소스 fps로 전달, fast: 최대 속도로 전달 (처리량 측정용)
+    FRAME_SOURCE_PACING = os.getenv("FRAME_SOURCE_PACING", "realtime").lower()
+    FRAME_SOURCE_LOOP = os.getenv("FRAME_SOURCE_LOOP", "false").lower() in ("true", "1", "yes")
+
     # Detection settings
     CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.5"))
     ASPECT_RATIO_THRESHOLD = float(os.getenv("ASPECT_RATIO_THRESHOLD", "1.5"))
     
+    # Upload settings
+    # single: 프레임마다 multipart POST, raw: 프레임마다 JPEG 본문 그대로 POST
+    # batch: 여러 프레임을 하나의 바이너리 요청으로 전송
+    # stream: 하나의 장기 chunked POST 연결로 MJPEG 스트림 전송 (끊기면 자동 재연결)
+    UPLOAD_MODE = os.getenv("UPLOAD_MODE", "single").lower()
+    UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", "10"))
+    UPLOAD_BATCH_MAX_LATENCY_MS = int(os.getenv("UPLOAD_BATCH_MAX_LATENCY_MS", "200"))
+    UPLOAD_STREAM_RESEND_FRAMES = int(os.getenv("UPLOAD_STREAM_RESEND_FRAMES", "30"))
+    # single/raw 모드 동시 업로드 요청 수 (1 = 순차 전송, 서버가 시퀀스 번호로 재정렬)
+    UPLOAD_MAX_IN_FLIGHT = int(os.getenv("UPLOAD_MAX_IN_FLIGHT", "1"))
+
     # Display settings
     ENABLE_DISPLAY = os.getenv("ENABLE_DISPLAY", "false").lower() in ("true", "1", "yes")
 
@@ -68,4 +86,5 @@ class Config:
         print(f"✅ Initialization complete")
         print(f"   Backend: {Config.BACKEND_URL}")
         print(f"   Device: {Config.DEVICE_ID}")
+        print(f"   Upload: {Config.UPLOAD_MODE}")
         print(f"   Display: {'Enabled' if Config.ENABLE_DISPLAY else 'Disabled (Headless)'}")
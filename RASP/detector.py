@@ -1,4 +1,3 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
 from config import Config
@@ -8,6 +7,9 @@ class FallDetector:
     """YOLO11 Fall Detection with visualization"""
     
     def __init__(self):
+        # 지연 import: 모듈만 참조하는 도구(replay_harness --detector stub)는 ultralytics 없이 실행 가능
+        from ultralytics import YOLO
+
         print(f"🤖 Loading YOLO11 model: {Config.YOLO_MODEL_PATH}")
         self.model = YOLO(Config.YOLO_MODEL_PATH)
         self.confidence_threshold = Config.CONFIDENCE_THRESHOLD
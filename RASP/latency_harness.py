@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+SafeFall glass-to-glass latency harness
+============================================================
+프레임마다 시퀀스 번호를 픽셀 마커로 그려 넣고 pi_client의 업로드 경로
+(annotated_frame_queue → streaming_thread → BackendUploader)로 실제 백엔드에 보낸 뒤,
+대시보드와 같은 경로로 다시 읽어 지연을 측정한다.
+
+- live view: /api/stream/mjpeg, /api/stream/frame/latest에서 각 시퀀스가
+  처음 보인 시각 - 캡처 시각
+- incident-to-clip: 낙상 프레임 캡처 시각부터 /api/incidents/<id>/video가
+  재생 가능해질 때까지 + 클립 안의 마커로 확인한 실제 전/후 구간 길이
+
+하네스와 백엔드가 같은 시계를 쓰도록 한 대의 Linux 머신에서 실행한다.
+
+Usage:
+    python app.py                                   # Back/ (다른 터미널)
+    python latency_harness.py --backend-url http://localhost:5000 --duration 60 \\
+        --fps 15 --incident-interval 20 --poll-fps 10 [--upload-mode raw] [--json]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+import requests
+
+os.environ.setdefault('ENABLE_DISPLAY', 'false')
+
+from config import Config  # noqa: E402
+import pi_client  # noqa: E402
+from uploader import BackendUploader  # noqa: E402
+from replay_harness import UPLOAD_MODES, latency_summary  # noqa: E402
+
+# 마커: 32비트 시퀀스 + 8비트 체크섬을 프레임 상단에 흑/백 블록으로 기록
+MARKER_BLOCK = 16
+MARKER_BITS = 40
+MJPEG_BOUNDARY = b'--frame\r\n'
+
+
+def _checksum(seq):
+    # 상수를 더해 전부 검은(0) / 흰 줄이 유효한 마커로 읽히지 않게 함
+    return (sum(seq.to_bytes(4, 'big')) + 0xA5) & 0xFF
+
+
+def draw_marker(frame, seq):
+    """프레임 상단 MARKER_BLOCK 높이 줄에 시퀀스 마커 그리기 (JPEG 압축에도 유지됨)"""
+    value = (seq << 8) | _checksum(seq)
+    for bit in range(MARKER_BITS):
+        on = (value >> (MARKER_BITS - 1 - bit)) & 1
+        x = bit * MARKER_BLOCK
+        frame[:MARKER_BLOCK, x:x + MARKER_BLOCK] = 255 if on else 0
+    return frame
+
+
+def read_marker(frame):
+    """마커를 읽어 시퀀스 반환 (마커가 없거나 체크섬 불일치면 None)"""
+    if frame is None or frame.shape[0] < MARKER_BLOCK or frame.shape[1] < MARKER_BITS * MARKER_BLOCK:
+        return None
+    margin = MARKER_BLOCK // 4
+    # 블록 가장자리는 JPEG 링잉이 있으므로 중앙부 평균으로 판정
+    strip = frame[margin:MARKER_BLOCK - margin, :MARKER_BITS * MARKER_BLOCK]
+    if strip.ndim == 3:
+        strip = strip.mean(axis=2)
+    blocks = strip.reshape(strip.shape[0], MARKER_BITS, MARKER_BLOCK)[:, :, margin:MARKER_BLOCK - margin]
+    bits = blocks.mean(axis=(0, 2)) > 127
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    seq = value >> 8
+    return seq if (value & 0xFF) == _checksum(seq) else None
+
+
+def decode_marker(jpeg_bytes):
+    frame = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+    return read_marker(frame)
+
+
+class MarkerLog:
+    """시퀀스별 캡처 시각과 각 경로에서 처음 보인 시각"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.captured = {}    # seq → capture_ts
+        self.first_seen = {}  # path → {seq: seen_ts}
+        self.dropped = 0
+
+    def capture(self, seq, ts):
+        with self.lock:
+            self.captured[seq] = ts
+
+    def seen(self, path, seq, ts):
+        with self.lock:
+            seen = self.first_seen.setdefault(path, {})
+            if seq in self.captured and seq not in seen:
+                seen[seq] = ts
+
+    def latencies(self, path):
+        with self.lock:
+            return [ts - self.captured[seq] for seq, ts in self.first_seen.get(path, {}).items()]
+
+
+# ============================================================
+# 부하 스레드
+# ============================================================
+
+class MarkerInjector(threading.Thread):
+    """fps 간격으로 마커 프레임을 만들어 pi_client.annotated_frame_queue에 넣음 (detection 출력 위치)"""
+
+    def __init__(self, args, log, stop_event):
+        super().__init__(name='MarkerInjector', daemon=True)
+        self.args = args
+        self.log = log
+        self.stop_event = stop_event
+        self.seq = 0
+        # 실제 카메라 영상과 비슷한 JPEG 크기가 되도록 그라디언트 + 움직이는 사각형
+        gradient = np.linspace(0, 255, args.width, dtype=np.uint8)
+        self.background = np.dstack([np.tile(gradient, (args.height, 1))] * 3)
+
+    def _frame(self, seq):
+        frame = self.background.copy()
+        x = (seq * 8) % max(self.args.width - 120, 1)
+        cv2.rectangle(frame, (x, 80), (x + 120, 200), (0, 0, 255), -1)
+        cv2.putText(frame, f"#{seq}", (20, self.args.height - 30), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+        return draw_marker(frame, seq)
+
+    def run(self):
+        interval = 1.0 / self.args.fps
+        next_due = time.monotonic()
+        while not self.stop_event.is_set():
+            self.seq += 1
+            frame = self._frame(self.seq)
+            capture_ts = time.time()
+            self.log.capture(self.seq, capture_ts)
+
+            if pi_client.annotated_frame_queue.full():
+                with self.log.lock:
+                    self.log.dropped += 1
+            else:
+                pi_client.annotated_frame_queue.put((capture_ts, frame))
+
+            next_due += interval
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                self.stop_event.wait(delay)
+            else:
+                next_due = time.monotonic()
+
+
+class MJPEGWatcher(threading.Thread):
+    """/api/stream/mjpeg part를 디코딩해 시퀀스가 처음 보인 시각 기록"""
+
+    def __init__(self, args, log, stop_event):
+        super().__init__(name='MJPEGWatcher', daemon=True)
+        self.args = args
+        self.log = log
+        self.stop_event = stop_event
+
+    def _parts(self, response):
+        buffer = b''
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer += chunk
+            while True:
+                start = buffer.find(MJPEG_BOUNDARY)
+                header_end = buffer.find(b'\r\n\r\n', start) if start != -1 else -1
+                next_part = buffer.find(MJPEG_BOUNDARY, header_end + 4) if header_end != -1 else -1
+                if next_part == -1:
+                    break
+                yield buffer[header_end + 4:next_part - 2]
+                buffer = buffer[next_part:]
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                with requests.get(f'{self.args.backend_url}/api/stream/mjpeg', stream=True, timeout=10) as response:
+                    for jpeg in self._parts(response):
+                        received = time.time()
+                        if self.stop_event.is_set():
+                            return
+                        seq = decode_marker(jpeg)
+                        if seq is not None:
+                            self.log.seen('mjpeg', seq, received)
+            except requests.RequestException:
+                self.stop_event.wait(1.0)
+
+
+class LatestFramePoller(threading.Thread):
+    """/api/stream/frame/latest를 poll-fps로 폴링 (대시보드 폴링 모드)"""
+
+    def __init__(self, args, log, stop_event):
+        super().__init__(name='LatestFramePoller', daemon=True)
+        self.args = args
+        self.log = log
+        self.stop_event = stop_event
+
+    def run(self):
+        session = requests.Session()
+        interval = 1.0 / self.args.poll_fps
+        while not self.stop_event.is_set():
+            try:
+                response = session.get(f'{self.args.backend_url}/api/stream/frame/latest', timeout=5)
+                received = time.time()
+                if response.status_code == 200:
+                    seq = decode_marker(response.content)
+                    if seq is not None:
+                        self.log.seen('poll', seq, received)
+            except requests.RequestException:
+                pass
+            self.stop_event.wait(interval)
+
+
+class IncidentProbe(threading.Thread):
+    """
+    최근 주입한 프레임을 낙상 프레임으로 보고하고 클립이 재생 가능해질 때까지 측정
+
+    보고 형식은 BackendUploader.report_incident와 같다 (응답의 incident id가 필요해 직접 전송).
+    """
+
+    def __init__(self, args, log, stop_event):
+        super().__init__(name='IncidentProbe', daemon=True)
+        self.args = args
+        self.log = log
+        self.stop_event = stop_event
+        self.results = []
+        self.session = requests.Session()
+
+    def _clip_markers(self, incident_id):
+        """클립을 내려받아 프레임별 마커 시퀀스 목록 반환"""
+        response = self.session.get(f'{self.args.backend_url}/api/incidents/{incident_id}/video', timeout=30)
+        with tempfile.NamedTemporaryFile(suffix='.mp4') as clip:
+            clip.write(response.content)
+            clip.flush()
+            capture = cv2.VideoCapture(clip.name)
+            sequences = []
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                sequences.append(read_marker(frame))
+            capture.release()
+        return sequences
+
+    def probe(self):
+        with self.log.lock:
+            if not self.log.captured:
+                return
+            fall_seq = max(self.log.captured)
+            fall_ts = self.log.captured[fall_seq]
+
+        entry = {'fall_seq': fall_seq, 'status': None}
+        reported = time.time()
+        try:
+            response = self.session.post(
+                f'{self.args.backend_url}/api/incidents/report',
+                json={
+                    'device_id': Config.DEVICE_ID,
+                    'incident_type': 'fall',
+                    'detected_at': datetime.fromtimestamp(fall_ts, timezone.utc).isoformat(),
+                    'confidence': 0.9,
+                    'user_id': self.args.user_id,
+                },
+                timeout=self.args.clip_timeout,
+            )
+            entry['report_s'] = time.time() - reported
+            entry['status'] = response.status_code
+            if response.status_code != 201:
+                return
+            incident_id = response.json()['incident']['id']
+
+            deadline = reported + self.args.clip_timeout
+            while time.time() < deadline:
+                video = self.session.get(
+                    f'{self.args.backend_url}/api/incidents/{incident_id}/video',
+                    headers={'Range': 'bytes=0-1023'}, timeout=10
+                )
+                if video.status_code in (200, 206) and video.content:
+                    entry['clip_ready_s'] = time.time() - fall_ts
+                    break
+                time.sleep(0.05)
+            else:
+                entry['status'] = 'clip_timeout'
+                return
+
+            sequences = [seq for seq in self._clip_markers(incident_id) if seq is not None]
+            with self.log.lock:
+                captured = dict(self.log.captured)
+            if sequences:
+                first, last = min(sequences), max(sequences)
+                entry.update({
+                    'clip_frames': len(sequences),
+                    'contains_fall_frame': fall_seq in sequences,
+                    'pre_roll_s': round(fall_ts - captured[first], 2) if first in captured else None,
+                    'post_roll_s': round(captured[last] - fall_ts, 2) if last in captured else None,
+                    'missing_frames': (last - first + 1) - len(set(sequences)),
+                })
+            else:
+                entry['clip_frames'] = 0
+        except (requests.RequestException, KeyError, ValueError) as e:
+            entry['status'] = type(e).__name__
+        finally:
+            self.results.append(entry)
+
+    def run(self):
+        if self.stop_event.wait(self.args.warmup):
+            return
+        while not self.stop_event.is_set():
+            self.probe()
+            if self.stop_event.wait(self.args.incident_interval):
+                break
+
+
+# ============================================================
+# 실행 / 보고
+# ============================================================
+
+def run(args):
+    Config.BACKEND_URL = args.backend_url
+    Config.UPLOAD_MODE = args.upload_mode or Config.UPLOAD_MODE
+    if args.device_id:
+        Config.DEVICE_ID = args.device_id
+
+    uploader = BackendUploader()
+    if not uploader.check_connection():
+        raise SystemExit(f"❌ Backend not reachable at {args.backend_url}")
+
+    log = MarkerLog()
+    stop_event = threading.Event()
+    pi_client.running = True
+
+    streaming = threading.Thread(target=pi_client.streaming_thread, args=(uploader,), name='Streaming', daemon=True)
+    injector = MarkerInjector(args, log, stop_event)
+    watchers = [MJPEGWatcher(args, log, stop_event)]
+    if args.poll_fps > 0:
+        watchers.append(LatestFramePoller(args, log, stop_event))
+    probe = IncidentProbe(args, log, stop_event) if args.incident_interval > 0 else None
+
+    threads = [streaming, *watchers, injector] + ([probe] if probe else [])
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    try:
+        stop_event.wait(args.duration)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted")
+    stop_event.set()
+    elapsed = time.perf_counter() - started
+
+    if probe:
+        # 진행 중인 사고 측정은 끝까지 기다림
+        probe.join(timeout=args.clip_timeout)
+    pi_client.running = False
+    for thread in threads:
+        thread.join(timeout=2)
+    uploader.stop_session()
+
+    with log.lock:
+        captured = len(log.captured)
+        dropped = log.dropped
+        seen_counts = {path: len(seen) for path, seen in log.first_seen.items()}
+
+    incidents = probe.results if probe else []
+    ready = [entry['clip_ready_s'] for entry in incidents if entry.get('clip_ready_s') is not None]
+    return {
+        'config': {
+            'backend': args.backend_url,
+            'upload_mode': Config.UPLOAD_MODE,
+            'fps': args.fps,
+            'resolution': f'{args.width}x{args.height}',
+            'duration_s': round(elapsed, 1),
+        },
+        'frames': {'captured': captured, 'dropped_before_upload': dropped, 'seen': seen_counts},
+        'live_view': {
+            'mjpeg': latency_summary(log.latencies('mjpeg')),
+            'poll': latency_summary(log.latencies('poll')),
+        },
+        'incident_to_clip': {
+            'reported': len(incidents),
+            'clips_ready': len(ready),
+            'latency': latency_summary(ready),
+            'report_latency': latency_summary([e['report_s'] for e in incidents if e.get('report_s') is not None]),
+            'incidents': incidents,
+        },
+    }
+
+
+def print_report(result):
+    config = result['config']
+    print(f"\n{'='*60}")
+    print(f"⏱️  Glass-to-glass: {config['resolution']} @ {config['fps']} fps, upload={config['upload_mode']}, "
+          f"{config['duration_s']}s")
+    print(f"{'='*60}")
+    frames = result['frames']
+    print(f"🎞️  Frames: {frames['captured']} captured, {frames['dropped_before_upload']} dropped at queue, "
+          f"seen {frames['seen']}")
+    for path, latency in result['live_view'].items():
+        if latency['count']:
+            print(f"  {path:6s} p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  "
+                  f"p99 {latency['p99_ms']} ms  max {latency['max_ms']} ms  ({latency['count']} frames)")
+
+    clip = result['incident_to_clip']
+    latency = clip['latency']
+    print(f"🚨 Incident → playable clip: {clip['clips_ready']}/{clip['reported']}  "
+          f"p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  max {latency['max_ms']} ms")
+    for entry in clip['incidents']:
+        if 'clip_frames' in entry:
+            print(f"   seq {entry['fall_seq']}: {entry['clip_frames']} frames, "
+                  f"pre {entry.get('pre_roll_s')}s / post {entry.get('post_roll_s')}s, "
+                  f"fall frame {'✅' if entry.get('contains_fall_frame') else '❌'}, "
+                  f"missing {entry.get('missing_frames')}")
+        else:
+            print(f"   seq {entry['fall_seq']}: ⚠️ {entry['status']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SafeFall glass-to-glass latency harness')
+    parser.add_argument('--backend-url', default=Config.BACKEND_URL)
+    parser.add_argument('--fps', type=float, default=15.0, help='마커 프레임 주입 fps')
+    parser.add_argument('--width', type=int, default=Config.CAMERA_WIDTH)
+    parser.add_argument('--height', type=int, default=Config.CAMERA_HEIGHT)
+    parser.add_argument('--upload-mode', choices=UPLOAD_MODES, help='UPLOAD_MODE 재정의')
+    parser.add_argument('--device-id', help='DEVICE_ID 재정의')
+    parser.add_argument('--poll-fps', type=float, default=10.0, help='/frame/latest 폴링 빈도 (0이면 끔)')
+    parser.add_argument('--duration', type=float, default=60.0, help='측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=10.0, help='첫 사고 보고 전 대기 (버퍼 채우기, 초)')
+    parser.add_argument('--incident-interval', type=float, default=20.0, help='사고 보고 간격 (초, 0이면 끔)')
+    parser.add_argument('--clip-timeout', type=float, default=120.0, help='사고 보고~클립 재생 가능 최대 대기 (초)')
+    parser.add_argument('--user-id', default='1', help='사고를 기록할 사용자 ID')
+    parser.add_argument('--json', action='store_true', help='JSON 결과 출력')
+    parser.add_argument('--output', help='JSON 결과 저장 경로')
+    args = parser.parse_args()
+
+    if args.width < MARKER_BITS * MARKER_BLOCK:
+        parser.error(f'--width must be at least {MARKER_BITS * MARKER_BLOCK} to fit the sequence marker')
+    args.backend_url = args.backend_url.rstrip('/')
+
+    result = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == '__main__':
+    main()
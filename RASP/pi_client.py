@@ -10,12 +10,13 @@ import cv2
 from queue import Queue, Empty
 
 from config import Config
-from camera import RPiCamera
+from camera import create_camera
 from detector import FallDetector
 from uploader import BackendUploader
 
 
 # Global variables
+# 큐 항목은 (capture_ts, frame) - 캡처 시각이 업로드/사고 보고까지 전달됨
 frame_queue = Queue(maxsize=100)
 annotated_frame_queue = Queue(maxsize=30)  # 바운딩 박스 그려진 프레임
 running = True
@@ -31,13 +32,14 @@ def capture_thread(camera):
     try:
         while running:
             frame = camera.read_frame()
+            capture_ts = time.time()
             
             if frame is None:
                 time.sleep(0.001)  # 1ms만 대기
                 continue
             
             if not frame_queue.full():
-                frame_queue.put(frame)
+                frame_queue.put((capture_ts, frame))
                 frame_count += 1
                 
                 # 10초마다 실제 FPS 출력
@@ -66,7 +68,7 @@ def detection_thread(detector):
                 continue
             
             try:
-                frame = frame_queue.get(block=False)
+                capture_ts, frame = frame_queue.get(block=False)
             except Empty:
                 time.sleep(0.01)
                 continue
@@ -77,7 +79,7 @@ def detection_thread(detector):
                 
                 # 바운딩 박스 그려진 프레임을 업로드용 큐에 추가
                 if not annotated_frame_queue.full():
-                    annotated_frame_queue.put(annotated_frame)
+                    annotated_frame_queue.put((capture_ts, annotated_frame))
                 
                 # 낙상 감지 결과 저장
                 if result and result.get('detected'):
@@ -114,10 +116,10 @@ def streaming_thread(uploader):
             
             try:
                 # 바운딩 박스가 그려진 프레임 가져오기
-                annotated_frame = annotated_frame_queue.get(timeout=1)
+                capture_ts, annotated_frame = annotated_frame_queue.get(timeout=1)
                 
                 # 백엔드로 업로드 (프론트엔드에 바운딩 박스 표시됨)
-                if uploader.upload_frame(annotated_frame):
+                if uploader.upload_frame(annotated_frame, capture_ts):
                     frame_count += 1
                     if frame_count % 100 == 0:
                         elapsed = time.time() - start_time
@@ -167,7 +169,7 @@ def display_thread():
                 annotated_frame = None
                 while not annotated_frame_queue.empty():
                     try:
-                        annotated_frame = annotated_frame_queue.get(block=False)
+                        _, annotated_frame = annotated_frame_queue.get(block=False)
                     except Empty:
                         break
                 
@@ -209,9 +211,9 @@ def incident_reporting_thread(uploader):
             
             # 큐에서 최신 프레임 확인
             try:
-                frame = frame_queue.queue[-1] if len(frame_queue.queue) > 0 else None
+                capture_ts, frame = frame_queue.queue[-1] if len(frame_queue.queue) > 0 else (None, None)
             except:
-                frame = None
+                capture_ts, frame = None, None
             
             if frame is None:
                 time.sleep(0.1)
@@ -226,7 +228,7 @@ def incident_reporting_thread(uploader):
                     
                     if current_time - last_detection_time > cooldown:
                         # 백엔드에 사고 알림
-                        uploader.report_incident(result)
+                        uploader.report_incident(result, capture_ts)
                         last_detection_time = current_time
                         time.sleep(cooldown)
                         
@@ -252,7 +254,7 @@ def main():
     
     # Initialize components
     try:
-        camera = RPiCamera()
+        camera = create_camera()
         global detector
         detector = FallDetector()
         uploader = BackendUploader()
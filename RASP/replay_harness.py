@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+SafeFall Pi pipeline replay harness
+============================================================
+녹화된 MJPEG/영상/이미지 디렉토리를 카메라 대신 재생하면서 pi_client의
+capture / detection / streaming / incident 스레드를 그대로 실행하고
+단계별 처리량, 큐 깊이, 버려진 프레임, 캡처→백엔드 수신 지연을 측정한다.
+
+백엔드는 기본적으로 로컬 stand-in 서버(프레임 수신 시각만 기록)를 띄우며,
+--backend-url로 실제 백엔드를 지정할 수도 있다 (이 경우 수신 지연은 측정하지 않음).
+
+Usage:
+    python replay_harness.py recording.mjpeg --pacing fast --duration 60
+    python replay_harness.py clips/fall.mp4 --detector stub --stub-latency-ms 40 \\
+        --upload-mode batch --json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+
+os.environ.setdefault('ENABLE_DISPLAY', 'false')
+
+from config import Config  # noqa: E402
+import pi_client  # noqa: E402
+from camera import PACING_MODES, create_camera  # noqa: E402
+from uploader import BATCH_FRAME_HEADER, BackendUploader  # noqa: E402
+
+UPLOAD_MODES = ('single', 'raw', 'batch', 'stream')
+
+
+def percentile(values, pct):
+    """정렬 후 최근접 순위 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(seconds):
+    """지연 목록(초) → ms 단위 요약"""
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
+
+    return {
+        'count': len(seconds),
+        'p50_ms': ms(percentile(seconds, 50)),
+        'p95_ms': ms(percentile(seconds, 95)),
+        'p99_ms': ms(percentile(seconds, 99)),
+        'max_ms': ms(max(seconds) if seconds else None),
+    }
+
+
+# ============================================================
+# 로컬 stand-in 백엔드
+# ============================================================
+
+class StubBackend:
+    """pi_client가 사용하는 엔드포인트만 흉내 내고 프레임 수신 시각을 기록"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.bytes = 0
+        self.latencies = []   # 수신 시각 - capture_ts (초)
+        self.incidents = []
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='StubBackend', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def record_frame(self, size, capture_ts):
+        arrived = time.time()
+        with self.lock:
+            self.frames += 1
+            self.bytes += size
+            if capture_ts is not None:
+                self.latencies.append(arrived - capture_ts)
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더/본문을 따로 쓰므로 Nagle + delayed ACK로 응답마다 ~40ms 지연되는 것 방지
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, payload=None):
+                body = json.dumps(payload or {}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def _chunks(self):
+                """Transfer-Encoding: chunked 본문을 청크 단위로 반환"""
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return
+                    yield self.rfile.read(size)
+                    self.rfile.readline()
+
+            def do_GET(self):
+                if self.path == '/health':
+                    return self._reply(200, {'status': 'healthy'})
+                return self._reply(404, {'error': 'Not Found'})
+
+            def do_POST(self):
+                path = self.path.split('?')[0]
+                if path == '/api/stream/ingest':
+                    return self._ingest()
+
+                body = self._body()
+                if path in ('/api/stream/session/start', '/api/stream/session/stop'):
+                    return self._reply(200, {'status': 'ok'})
+
+                if path == '/api/stream/upload/raw':
+                    capture_ts = self.headers.get('X-Capture-Timestamp')
+                    backend.record_frame(len(body), float(capture_ts) if capture_ts else None)
+                    return self._reply(200, {'status': 'success'})
+
+                if path == '/api/stream/upload':
+                    message = BytesParser().parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+                    )
+                    fields, size = {}, 0
+                    for part in message.get_payload():
+                        name = part.get_param('name', header='content-disposition')
+                        if name == 'frame':
+                            size = len(part.get_payload(decode=True))
+                        else:
+                            fields[name] = part.get_payload()
+                    capture_ts = fields.get('capture_ts')
+                    backend.record_frame(size, float(capture_ts) if capture_ts else None)
+                    return self._reply(200, {'status': 'success'})
+
+                if path == '/api/stream/upload/batch':
+                    offset = 0
+                    while offset + BATCH_FRAME_HEADER.size <= len(body):
+                        _, capture_ts, length = BATCH_FRAME_HEADER.unpack_from(body, offset)
+                        offset += BATCH_FRAME_HEADER.size + length
+                        backend.record_frame(length, capture_ts)
+                    return self._reply(200, {'status': 'success'})
+
+                if path == '/api/incidents/report':
+                    with backend.lock:
+                        backend.incidents.append((time.time(), json.loads(body or b'{}')))
+                    return self._reply(201, {'status': 'success', 'incident': {'id': len(backend.incidents)}})
+
+                return self._reply(404, {'error': 'Not Found'})
+
+            def _ingest(self):
+                """chunked MJPEG 스트림에서 part 헤더(Content-Length, X-Capture-Timestamp) 파싱"""
+                buffer = b''
+                frames = 0
+                for chunk in self._chunks():
+                    buffer += chunk
+                    while True:
+                        header_end = buffer.find(b'\r\n\r\n')
+                        if header_end == -1:
+                            break
+                        headers = {}
+                        for line in buffer[:header_end].split(b'\r\n'):
+                            key, sep, value = line.partition(b':')
+                            if sep:
+                                headers[key.strip().lower()] = value.strip()
+                        length = int(headers.get(b'content-length', 0))
+                        if len(buffer) < header_end + 4 + length + 2:
+                            break
+                        capture_ts = headers.get(b'x-capture-timestamp')
+                        backend.record_frame(length, float(capture_ts) if capture_ts else None)
+                        frames += 1
+                        buffer = buffer[header_end + 4 + length + 2:]
+                return self._reply(200, {'stream': {'frames': frames}})
+
+        return Handler
+
+
+# ============================================================
+# 계측 래퍼 (pi_client 코드는 수정하지 않음)
+# ============================================================
+
+class CountingQueue(Queue):
+    """put 횟수를 세는 Queue (pi_client는 full()일 때 put하지 않고 프레임을 버림)"""
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self.puts = 0
+
+    def _put(self, item):
+        self.puts += 1
+        super()._put(item)
+
+
+class StageTimer:
+    """단계별 호출 수 / 소요 시간 기록"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.counts = {}
+
+    def record(self, stage, seconds, ok=True):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            self.counts.setdefault(stage, {'ok': 0, 'failed': 0})['ok' if ok else 'failed'] += 1
+
+
+class InstrumentedCamera:
+    def __init__(self, camera, timer):
+        self.camera = camera
+        self.timer = timer
+
+    def start(self):
+        self.camera.start()
+        return self
+
+    def read_frame(self):
+        started = time.perf_counter()
+        frame = self.camera.read_frame()
+        if frame is not None:
+            self.timer.record('capture', time.perf_counter() - started)
+        return frame
+
+    def stop(self):
+        self.camera.stop()
+
+    @property
+    def finished(self):
+        return getattr(self.camera, 'finished', False)
+
+
+class InstrumentedDetector:
+    """detect(draw_boxes=True)는 detection 스레드, False는 incident 스레드 호출"""
+
+    def __init__(self, detector, timer):
+        self.detector = detector
+        self.timer = timer
+
+    def detect(self, frame, draw_boxes=True):
+        started = time.perf_counter()
+        result = self.detector.detect(frame, draw_boxes=draw_boxes)
+        stage = 'detect' if draw_boxes else 'incident_detect'
+        self.timer.record(stage, time.perf_counter() - started)
+        return result
+
+
+class InstrumentedUploader:
+    def __init__(self, uploader, timer):
+        self.uploader = uploader
+        self.timer = timer
+
+    def upload_frame(self, frame, capture_ts=None):
+        started = time.perf_counter()
+        ok = self.uploader.upload_frame(frame, capture_ts)
+        self.timer.record('upload', time.perf_counter() - started, ok)
+        return ok
+
+    def report_incident(self, detection_result, capture_ts=None):
+        started = time.perf_counter()
+        ok = self.uploader.report_incident(detection_result, capture_ts)
+        self.timer.record('incident_report', time.perf_counter() - started, ok)
+        return ok
+
+    def __getattr__(self, name):
+        return getattr(self.uploader, name)
+
+
+class StubDetector:
+    """
+    YOLO 없이 고정 지연으로 detect를 흉내 냄 (업로드/큐 동작만 측정할 때)
+
+    fall_every > 0이면 호출 스레드별(draw_boxes 값별) N번째 호출마다 낙상을 보고한다.
+    """
+
+    def __init__(self, latency_ms=0.0, fall_every=0):
+        self.latency = latency_ms / 1000
+        self.fall_every = fall_every
+        self.calls = {True: 0, False: 0}
+        self.lock = threading.Lock()
+
+    def detect(self, frame, draw_boxes=True):
+        with self.lock:
+            self.calls[draw_boxes] += 1
+            calls = self.calls[draw_boxes]
+        if self.latency:
+            time.sleep(self.latency)
+        annotated = frame.copy() if draw_boxes else frame
+        if self.fall_every and calls % self.fall_every == 0:
+            return {'detected': True, 'confidence': 0.9, 'aspect_ratio': 2.0}, annotated
+        return None, annotated
+
+
+# ============================================================
+# 실행 / 보고
+# ============================================================
+
+def run(args):
+    Config.UPLOAD_MODE = args.upload_mode or Config.UPLOAD_MODE
+
+    backend = None
+    if args.backend_url:
+        Config.BACKEND_URL = args.backend_url.rstrip('/')
+    else:
+        backend = StubBackend().start()
+        Config.BACKEND_URL = backend.url
+
+    timer = StageTimer()
+    camera = InstrumentedCamera(create_camera(args.source, args.fps, args.pacing, args.loop), timer)
+    if args.detector == 'stub':
+        detector = StubDetector(args.stub_latency_ms, args.stub_fall_every)
+    else:
+        from detector import FallDetector
+        detector = FallDetector()
+    detector = InstrumentedDetector(detector, timer)
+    uploader = InstrumentedUploader(BackendUploader(), timer)
+
+    # pi_client 스레드가 참조하는 모듈 전역 교체
+    pi_client.frame_queue = CountingQueue(maxsize=pi_client.frame_queue.maxsize)
+    pi_client.annotated_frame_queue = CountingQueue(maxsize=pi_client.annotated_frame_queue.maxsize)
+    pi_client.detector = detector
+    pi_client.running = True
+
+    camera.start()
+    threads = [
+        threading.Thread(target=pi_client.capture_thread, args=(camera,), name='Capture', daemon=True),
+        threading.Thread(target=pi_client.detection_thread, args=(detector,), name='Detection', daemon=True),
+        threading.Thread(target=pi_client.streaming_thread, args=(uploader,), name='Streaming', daemon=True),
+    ]
+    if not args.no_incidents:
+        threads.append(threading.Thread(
+            target=pi_client.incident_reporting_thread, args=(uploader,), name='IncidentReport', daemon=True
+        ))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    depth_samples = {'frame_queue': [], 'annotated_frame_queue': []}
+    try:
+        while time.perf_counter() - started < args.duration:
+            depth_samples['frame_queue'].append(pi_client.frame_queue.qsize())
+            depth_samples['annotated_frame_queue'].append(pi_client.annotated_frame_queue.qsize())
+            # 소스가 끝나고 큐가 비면 종료
+            if camera.finished and pi_client.frame_queue.empty() and pi_client.annotated_frame_queue.empty():
+                break
+            time.sleep(args.sample_interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted")
+    elapsed = time.perf_counter() - started
+
+    pi_client.running = False
+    for thread in threads:
+        thread.join(timeout=2)
+    uploader.stop_session()
+    camera.stop()
+    # 진행 중이던 업로드가 백엔드에 도착할 시간
+    time.sleep(0.2)
+
+    result = summarize(args, elapsed, timer, depth_samples, backend)
+    if backend:
+        backend.stop()
+    return result
+
+
+def summarize(args, elapsed, timer, depth_samples, backend):
+    with timer.lock:
+        durations = {stage: list(values) for stage, values in timer.durations.items()}
+        counts = {stage: dict(value) for stage, value in timer.counts.items()}
+
+    stages = {}
+    for stage in ('capture', 'detect', 'upload', 'incident_detect', 'incident_report'):
+        values = durations.get(stage, [])
+        stage_counts = counts.get(stage, {'ok': 0, 'failed': 0})
+        stages[stage] = {
+            'calls': len(values),
+            'ok': stage_counts['ok'],
+            'failed': stage_counts['failed'],
+            'per_second': round(stage_counts['ok'] / elapsed, 2),
+            'latency': latency_summary(values),
+        }
+
+    captured = stages['capture']['calls']
+    detected = stages['detect']['calls']
+    queued = pi_client.frame_queue.puts
+    annotated = pi_client.annotated_frame_queue.puts
+
+    result = {
+        'config': {
+            'source': args.source,
+            'pacing': args.pacing,
+            'detector': args.detector,
+            'upload_mode': Config.UPLOAD_MODE,
+            'backend': args.backend_url or 'stub',
+            'duration_s': round(elapsed, 2),
+        },
+        'stages': stages,
+        'queues': {
+            name: {
+                'avg': round(sum(samples) / len(samples), 1) if samples else 0,
+                'max': max(samples, default=0),
+                'capacity': getattr(pi_client, name).maxsize,
+            }
+            for name, samples in depth_samples.items()
+        },
+        'dropped': {
+            'frame_queue_full': captured - queued,
+            'annotated_queue_full': detected - annotated,
+            'upload_failed': stages['upload']['failed'],
+            'not_processed': queued - detected,
+        },
+    }
+
+    if backend:
+        with backend.lock:
+            latencies = list(backend.latencies)
+            result['backend'] = {
+                'frames_received': backend.frames,
+                'fps': round(backend.frames / elapsed, 2),
+                'mbit_per_s': round(backend.bytes * 8 / elapsed / 1e6, 2),
+                'incidents': len(backend.incidents),
+                'end_to_end_latency': latency_summary(latencies),
+            }
+        result['dropped']['lost_end_to_end'] = captured - backend.frames
+    return result
+
+
+def print_report(result):
+    config = result['config']
+    print(f"\n{'='*60}")
+    print(f"📊 Replay: {config['source']} ({config['pacing']}), detector={config['detector']}, "
+          f"upload={config['upload_mode']}, {config['duration_s']}s")
+    print(f"{'='*60}")
+    for stage, stats in result['stages'].items():
+        if not stats['calls']:
+            continue
+        latency = stats['latency']
+        failed = f"  failed {stats['failed']}" if stats['failed'] else ''
+        print(f"  {stage:16s} {stats['per_second']:>8.2f}/s   p50 {latency['p50_ms']} ms"
+              f"  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms{failed}")
+
+    print("📦 Queues:")
+    for name, stats in result['queues'].items():
+        print(f"  {name:22s} avg {stats['avg']}  max {stats['max']}/{stats['capacity']}")
+
+    print(f"🗑️  Dropped: {result['dropped']}")
+
+    if 'backend' in result:
+        backend = result['backend']
+        latency = backend['end_to_end_latency']
+        print(f"📡 Backend: {backend['frames_received']} frames ({backend['fps']} fps, "
+              f"{backend['mbit_per_s']} Mbit/s), {backend['incidents']} incidents")
+        print(f"   capture → backend p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms"
+              f"  p99 {latency['p99_ms']} ms")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SafeFall Pi pipeline replay harness')
+    parser.add_argument('source', help='MJPEG 파일 / 영상 파일 / 이미지 디렉토리')
+    parser.add_argument('--pacing', choices=PACING_MODES, default='realtime')
+    parser.add_argument('--fps', type=float, help='재생 fps (기본: 영상 파일 fps 또는 CAMERA_FPS)')
+    parser.add_argument('--loop', action='store_true', help='소스 반복 재생 (--duration까지)')
+    parser.add_argument('--duration', type=float, default=60.0, help='최대 실행 시간 (초)')
+    parser.add_argument('--detector', choices=('yolo', 'stub'), default='yolo')
+    parser.add_argument('--stub-latency-ms', type=float, default=0.0, help='stub detector 추론 지연')
+    parser.add_argument('--stub-fall-every', type=int, default=0, help='stub detector가 스레드별 N번째 호출마다 낙상 보고')
+    parser.add_argument('--no-incidents', action='store_true', help='incident 스레드 실행 안 함')
+    parser.add_argument('--upload-mode', choices=UPLOAD_MODES, help='UPLOAD_MODE 재정의')
+    parser.add_argument('--backend-url', help='stand-in 대신 사용할 실제 백엔드 URL')
+    parser.add_argument('--sample-interval', type=float, default=0.1, help='큐 깊이 샘플링 주기 (초)')
+    parser.add_argument('--json', action='store_true', help='JSON 결과 출력')
+    parser.add_argument('--output', help='JSON 결과 저장 경로')
+    args = parser.parse_args()
+
+    # pi_client / uploader의 진행 로그가 JSON 출력과 섞이지 않도록
+    stdout = sys.stdout
+    if args.json:
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        result = run(args)
+    finally:
+        if args.json:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == '__main__':
+    main()
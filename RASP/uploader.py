@@ -1,15 +1,64 @@
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty, Full
 import requests
 import cv2
 from datetime import datetime, timezone  # ← timezone 추가
 from config import Config
 
 
+# Batch upload format (big-endian): per frame [seq:u32][capture_ts:f64][length:u32] + JPEG bytes
+BATCH_FRAME_HEADER = struct.Struct('>IdI')
+
+
 class BackendUploader:
     """Backend server communication"""
     
     def __init__(self):
         self.backend_url = Config.BACKEND_URL
         self.device_id = Config.DEVICE_ID
+
+        # Keep-alive connection for frame uploads
+        self.http = requests.Session()
+
+        # Batch mode state
+        self.upload_mode = Config.UPLOAD_MODE
+        self.batch_size = max(1, Config.UPLOAD_BATCH_SIZE)
+        self.batch_max_latency = Config.UPLOAD_BATCH_MAX_LATENCY_MS / 1000
+        self._batch = []
+        self._batch_started = None
+        self._batch_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._seq = 0
+
+        if self.upload_mode == 'batch':
+            # Flush partially filled batches when frames stop arriving
+            flusher = threading.Thread(target=self._flush_loop, name="BatchFlusher", daemon=True)
+            flusher.start()
+
+        # Stream mode state: one long-lived chunked POST carrying an MJPEG stream
+        self.stream_id = f"{self.device_id}-{uuid.uuid4().hex[:8]}"
+        self._stream_queue = Queue(maxsize=Config.CAMERA_FPS * 2)
+        # Last parts sent, replayed after a reconnect (the backend drops duplicate sequences)
+        self._stream_recent = deque(maxlen=Config.UPLOAD_STREAM_RESEND_FRAMES)
+        self._stream_stop = threading.Event()
+        self._stream_thread = None
+
+        if self.upload_mode == 'stream':
+            self._stream_thread = threading.Thread(target=self._stream_loop, name="StreamSender", daemon=True)
+            self._stream_thread.start()
+
+        # Pipelined single/raw uploads: up to UPLOAD_MAX_IN_FLIGHT requests at once.
+        # The backend reorders frames by sequence number, so completion order does not matter.
+        self.max_in_flight = max(1, Config.UPLOAD_MAX_IN_FLIGHT)
+        self._executor = None
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        if self.max_in_flight > 1 and self.upload_mode in ('single', 'raw'):
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="FrameUpload")
         
     def check_connection(self):
         """Check backend connection"""
@@ -45,36 +94,234 @@ class BackendUploader:
             print(f"❌ Session start error: {e}")
             return False
     
-    def upload_frame(self, frame):
-        """Upload frame"""
+    def upload_frame(self, frame, capture_ts=None):
+        """
+        Upload frame (queued into the current batch in batch mode)
+
+        capture_ts is the camera capture time (epoch seconds); defaults to now.
+        With UPLOAD_MAX_IN_FLIGHT > 1 the request is sent in the background and
+        True means "queued"; frames are dropped while all slots are busy.
+        """
         try:
+            if capture_ts is None:
+                capture_ts = time.time()
+
             # JPEG encoding
             _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
             frame_bytes = buffer.tobytes()
-            
+
+            if self.upload_mode == 'batch':
+                return self._enqueue_batch_frame(frame_bytes, capture_ts)
+
+            if self.upload_mode == 'stream':
+                return self._enqueue_stream_frame(frame_bytes, capture_ts)
+
+            seq = self._next_seq()
+
+            if self._executor is None:
+                return self._post_frame(frame_bytes, capture_ts, seq)
+
+            # Backpressure: never queue more than max_in_flight requests
+            if not self._in_flight.acquire(blocking=False):
+                return False
+            future = self._executor.submit(self._post_frame, frame_bytes, capture_ts, seq)
+            future.add_done_callback(lambda _f: self._in_flight.release())
+            return True
+
+        except Exception:
+            return False
+
+    def _next_seq(self):
+        """Next 32-bit frame sequence number (shared by all upload modes)"""
+        with self._batch_lock:
+            self._seq = (self._seq + 1) & 0xFFFFFFFF
+            return self._seq
+
+    def _post_frame(self, frame_bytes, capture_ts, seq):
+        """Send one frame with its capture timestamp and sequence number"""
+        try:
+            if self.upload_mode == 'raw':
+                # Raw body upload: no multipart encoding/parsing on either side
+                response = self.http.post(
+                    f"{self.backend_url}/api/stream/upload/raw",
+                    data=frame_bytes,
+                    headers={
+                        'Content-Type': 'image/jpeg',
+                        'X-Device-Id': self.device_id,
+                        'X-Capture-Timestamp': f"{capture_ts:.6f}",
+                        'X-Sequence': str(seq)
+                    },
+                    timeout=2
+                )
+                return response.status_code == 200
+
             # Send frame
             files = {'frame': ('frame.jpg', frame_bytes, 'image/jpeg')}
-            data = {'device_id': self.device_id}
-            
-            response = requests.post(
+            data = {
+                'device_id': self.device_id,
+                'capture_ts': f"{capture_ts:.6f}",
+                'seq': str(seq)
+            }
+
+            response = self.http.post(
                 f"{self.backend_url}/api/stream/upload",
                 files=files,
                 data=data,
                 timeout=2
             )
-            
+
             return response.status_code == 200
-            
+
         except Exception:
             return False
+
+    def _enqueue_batch_frame(self, frame_bytes, capture_ts):
+        """Add an encoded frame to the pending batch, flushing when full or stale"""
+        with self._batch_lock:
+            self._seq = (self._seq + 1) & 0xFFFFFFFF
+            if not self._batch:
+                self._batch_started = time.monotonic()
+            self._batch.append((self._seq, capture_ts, frame_bytes))
+
+            should_flush = (
+                len(self._batch) >= self.batch_size
+                or time.monotonic() - self._batch_started >= self.batch_max_latency
+            )
+
+        if should_flush:
+            return self.flush()
+        return True
+
+    def _flush_loop(self):
+        """Max-latency flush for batches that did not fill up"""
+        interval = max(self.batch_max_latency / 2, 0.01)
+        while True:
+            time.sleep(interval)
+            with self._batch_lock:
+                stale = (
+                    self._batch
+                    and time.monotonic() - self._batch_started >= self.batch_max_latency
+                )
+            if stale:
+                self.flush()
+
+    def flush(self):
+        """Send all pending batch frames in one request"""
+        # _send_lock keeps batches in capture order on the wire
+        with self._send_lock:
+            with self._batch_lock:
+                batch = self._batch
+                self._batch = []
+                self._batch_started = None
+
+            if not batch:
+                return True
+
+            parts = []
+            for seq, capture_ts, frame_bytes in batch:
+                parts.append(BATCH_FRAME_HEADER.pack(seq, capture_ts, len(frame_bytes)))
+                parts.append(frame_bytes)
+
+            try:
+                response = self.http.post(
+                    f"{self.backend_url}/api/stream/upload/batch",
+                    data=b''.join(parts),
+                    headers={
+                        'Content-Type': 'application/octet-stream',
+                        'X-Device-Id': self.device_id
+                    },
+                    timeout=2 + self.batch_max_latency
+                )
+                return response.status_code == 200
+            except Exception:
+                return False
     
-    def report_incident(self, detection_result):
-        """Send fall incident signal"""
+    def _enqueue_stream_frame(self, frame_bytes, capture_ts):
+        """Queue an encoded frame for the streaming connection (drops the oldest when full)"""
+        seq = self._next_seq()
+
+        item = (seq, capture_ts, frame_bytes)
+        try:
+            self._stream_queue.put_nowait(item)
+        except Full:
+            # Live view prefers fresh frames: discard the oldest queued one
+            try:
+                self._stream_queue.get_nowait()
+            except Empty:
+                pass
+            try:
+                self._stream_queue.put_nowait(item)
+            except Full:
+                return False
+        return True
+
+    def _stream_parts(self):
+        """Generator feeding the chunked request body with multipart frames"""
+        # Resume: replay recently sent parts, the backend skips sequences it already has
+        for part in list(self._stream_recent):
+            yield part
+
+        while not self._stream_stop.is_set():
+            try:
+                seq, capture_ts, frame_bytes = self._stream_queue.get(timeout=1)
+            except Empty:
+                continue
+
+            part = (
+                b'--frame\r\n'
+                b'Content-Type: image/jpeg\r\n'
+                + f"Content-Length: {len(frame_bytes)}\r\n"
+                  f"X-Sequence: {seq}\r\n"
+                  f"X-Capture-Timestamp: {capture_ts:.6f}\r\n\r\n".encode('ascii')
+                + frame_bytes
+                + b'\r\n'
+            )
+            self._stream_recent.append(part)
+            yield part
+
+        yield b'--frame--\r\n'
+
+    def _stream_loop(self):
+        """Keep the streaming connection open, reconnecting with backoff"""
+        backoff = 1
+        while not self._stream_stop.is_set():
+            try:
+                response = self.http.post(
+                    f"{self.backend_url}/api/stream/ingest",
+                    data=self._stream_parts(),
+                    headers={
+                        'Content-Type': 'multipart/x-mixed-replace; boundary=frame',
+                        'X-Device-Id': self.device_id,
+                        'X-Stream-Id': self.stream_id
+                    },
+                    timeout=(5, None)
+                )
+                if response.status_code == 200:
+                    stats = response.json().get('stream', {})
+                    print(f"📡 Stream connection closed: {stats.get('frames', 0)} frames total, "
+                          f"{stats.get('connection', {}).get('fps', 0)} fps on last connection")
+                    backoff = 1
+                else:
+                    print(f"⚠️ Stream connection rejected: {response.status_code}")
+            except Exception as e:
+                print(f"⚠️ Stream connection lost: {e}")
+
+            if self._stream_stop.is_set():
+                break
+            print(f"🔄 Reconnecting stream in {backoff}s...")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def report_incident(self, detection_result, capture_ts=None):
+        """Send fall incident signal (detected_at = capture time of the detected frame)"""
         try:
+            if capture_ts is None:
+                capture_ts = time.time()
+
             incident_data = {
                 'device_id': self.device_id,
                 'incident_type': 'fall',
-                'detected_at': datetime.now(timezone.utc).isoformat(),  # ← 수정
+                'detected_at': datetime.fromtimestamp(capture_ts, timezone.utc).isoformat(),
                 'confidence': float(detection_result['confidence']),
                 # CRITICAL FIX: User.id is String(50), not Integer
                 'user_id': '1'  # Use the correct user ID
@@ -99,6 +346,13 @@ class BackendUploader:
     
     def stop_session(self):
         """Stop streaming session"""
+        if self.upload_mode == 'batch':
+            self.flush()
+        if self._stream_thread:
+            self._stream_stop.set()
+            self._stream_thread.join(timeout=3)
+        if self._executor:
+            self._executor.shutdown(wait=True)
         try:
             requests.post(f"{self.backend_url}/api/stream/session/stop", timeout=5)
             print("✅ Streaming session stopped")